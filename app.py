@@ -1,107 +1,303 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, g, request, jsonify, render_template
 from flask_cors import CORS
-from career_predictor import CareerPredictor
+from binary_protocol import REQUEST_CONTENT_TYPE, RESPONSE_CONTENT_TYPE, decode_answers, encode_top5
+from career_predictor import SCORE_SCALE, CareerPredictor, validate_answers_matrix
+from metrics import REGISTRY, render_gauges
+from prediction_log import PredictionLogger
+from questions import QUESTIONS
+from request_coalescer import PredictionCoalescer
+from static_responses import StaticResponse, encode_object
+import questions
+import atexit
+import hmac
 import os
+import signal
 import subprocess
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process training lock
+    fcntl = None
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend requests
+CORS(app, expose_headers=['X-Classes-ETag'])  # Enable CORS for frontend requests
 
-# Initialize predictor once when server starts
-def initialize_model():
-    """Initialize the model, train if not exists"""
-    # Check if model exists
-    if not os.path.exists('model/career_model.pkl'):
-        print("⚠️  Model not found! Training new model...")
-        print("⏳ This may take 30-60 seconds...")
-        
+FOREST_PATH = 'model/career_forest.bin'
+PICKLE_PATH = 'model/career_model.pkl'
+TRAIN_LOCK_PATH = 'model/.train.lock'
+
+# The active predictor. Routes read it once per request; loaders build a
+# complete new CareerPredictor and then replace this reference, so
+# requests never see a half-loaded model.
+predictor = None
+model_status = 'starting'  # starting -> training -> ready | failed
+model_ready = threading.Event()
+model_load_seconds = None  # how long the last create_predictor took
+_reload_lock = threading.Lock()
+
+# Model info serialized once per loaded model: the /api/model-info response
+# and the JSON fragment embedded in prediction responses. Replaced together
+# with (and just before) the predictor.
+model_info_response = None
+model_info_json = None
+classes_response = None
+
+# The questions only change with the code, so their response is built once
+QUESTIONS_RESPONSE = StaticResponse({'success': True, 'questions': QUESTIONS},
+                                    last_modified=os.path.getmtime(questions.__file__))
+
+
+def model_files_exist():
+    """Check whether a trained model is on disk"""
+    return os.path.exists(FOREST_PATH) or os.path.exists(PICKLE_PATH)
+
+
+def train_model_once():
+    """
+    Train the model unless another process already did
+    
+    An exclusive file lock makes sure only one worker runs train_model.py;
+    the others wait on the lock and then find the finished model.
+    """
+    global model_status
+    
+    os.makedirs('model', exist_ok=True)
+    with open(TRAIN_LOCK_PATH, 'w') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
         try:
-            result = subprocess.run(['python', 'train_model.py'], 
-                                  capture_output=True, text=True)
+            if model_files_exist():
+                return True
+            
+            model_status = 'training'
+            print("⚠️  Model not found! Training new model...")
+            print("⏳ This may take 30-60 seconds...")
+            
+            result = subprocess.run([sys.executable, 'train_model.py'],
+                                    capture_output=True, text=True)
             
             if result.returncode == 0:
                 print("✅ Model trained successfully!")
-            else:
-                print(f"❌ Training failed: {result.stderr}")
-                return None
-        except Exception as e:
-            print(f"❌ Error training model: {e}")
-            return None
+                return True
+            
+            print(f"❌ Training failed: {result.stderr}")
+            return False
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def create_predictor():
+    """Build a new CareerPredictor from the files on disk"""
+    global model_load_seconds
+    
+    start = time.perf_counter()
+    new_predictor = CareerPredictor.from_env()
+    model_load_seconds = time.perf_counter() - start
+    return new_predictor
+
+
+def install_predictor(new_predictor):
+    """Serialize the model info of a freshly loaded predictor and make it active"""
+    global predictor, model_status, model_info_response, model_info_json, classes_response
+    
+    info = new_predictor.get_model_info()
+    # The full cross-validation summary is only served here, not with every prediction
+    cross_validation = (new_predictor.metadata or {}).get('cross_validation')
+    model_info_response = StaticResponse({'success': True, 'model_info': info,
+                                          'cross_validation': cross_validation})
+    model_info_json = encode_object(info)
+    classes_response = StaticResponse({
+        'success': True,
+        'classes': [str(c) for c in new_predictor.model.classes_],
+        'score_scale': SCORE_SCALE
+    })
+    predictor = new_predictor
+    model_status = 'ready'
+    model_ready.set()
+
+
+def initialize_model():
+    """Initialize the model, train if not exists (runs in the background)"""
+    global model_status
     
-    # Load the model
     try:
-        predictor = CareerPredictor()
-        print("✅ Model loaded successfully!")
-        return predictor
+        if not model_files_exist() and not train_model_once():
+            model_status = 'failed'
+            return
+        
+        with _reload_lock:
+            install_predictor(create_predictor())
+        print(f"✅ Model loaded successfully! ({model_load_seconds * 1000:.1f} ms)")
+    
     except Exception as e:
+        model_status = 'failed'
         print(f"❌ Error loading model: {e}")
-        return None
 
-predictor = initialize_model()
 
-# Questions for the survey
-QUESTIONS = [
-    {
-        "id": 1,
-        "question": "Gaano ka kahilig sa Math at Problem Solving?",
-        "description": "Problem-solving skills and mathematical aptitude"
-    },
-    {
-        "id": 2,
-        "question": "Gaano ka ka-tech savvy?",
-        "description": "Comfort with technology and digital tools"
-    },
-    {
-        "id": 3,
-        "question": "Gusto mo ba magtrabaho sa computer kaysa physical work?",
-        "description": "Preference for computer-based vs hands-on work"
-    },
-    {
-        "id": 4,
-        "question": "Gaano ka ka-creative (design, art, content creation)?",
-        "description": "Creative and artistic abilities"
-    },
-    {
-        "id": 5,
-        "question": "Gaano mo gusto ang pakikipag-socialize / pag-handle ng tao?",
-        "description": "Social and people management skills"
-    },
-    {
-        "id": 6,
-        "question": "Gaano ka ka-detail-oriented?",
-        "description": "Attention to detail and precision"
-    },
-    {
-        "id": 7,
-        "question": "Gusto mo ba research, analysis, or investigation type work?",
-        "description": "Interest in research and analytical work"
-    },
-    {
-        "id": 8,
-        "question": "Gaano ka ka-comfortable sa fast-paced environments?",
-        "description": "Ability to thrive in dynamic settings"
-    },
-    {
-        "id": 9,
-        "question": "Mahilig ka ba magturo, magpaliwanag, or mag-guide ng ibang tao?",
-        "description": "Teaching and mentoring abilities"
-    },
-    {
-        "id": 10,
-        "question": "Gusto mo ba outdoor or field work kaysa office work?",
-        "description": "Preference for outdoor vs indoor work"
-    },
-    {
-        "id": 11,
-        "question": "Interested ka ba sa technical/hands-on tasks?",
-        "description": "Technical and practical skills"
-    },
-    {
-        "id": 12,
-        "question": "Gaano ka ka-interesado sa business, finance, or entrepreneurship?",
-        "description": "Business and financial interests"
-    }
-]
+def reload_model():
+    """
+    Load the model files again and swap the new predictor in
+    
+    The old predictor keeps serving requests while the new one loads.
+    
+    Returns:
+        The new CareerPredictor
+    """
+    with _reload_lock:
+        new_predictor = create_predictor()
+        install_predictor(new_predictor)
+    
+    print("🔄 Model reloaded")
+    return new_predictor
+
+
+def _reload_in_background(signum, frame):
+    """SIGUSR2 handler: reload without blocking the interrupted thread"""
+    def run():
+        try:
+            reload_model()
+        except Exception as e:
+            print(f"❌ Model reload failed: {e}")
+    
+    threading.Thread(target=run, name='model-reload', daemon=True).start()
+
+
+def start_model_bootstrap():
+    """Load (or train) the model without blocking server startup"""
+    threading.Thread(target=initialize_model, name='model-bootstrap', daemon=True).start()
+
+
+# SIGUSR2 reloads the model in this process. SIGHUP is left alone because
+# gunicorn's master uses it to restart workers.
+if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGUSR2, _reload_in_background)
+
+start_model_bootstrap()
+
+
+def model_unavailable():
+    """Error response for requests that arrive before the model is ready"""
+    if model_status == 'failed':
+        return jsonify({
+            'success': False,
+            'error': 'Model not loaded. Please train the model first.'
+        }), 500
+    
+    return jsonify({
+        'success': False,
+        'error': f'Model is not ready yet ({model_status}). Please retry shortly.'
+    }), 503
+
+
+def static_json(cached):
+    """Serve a StaticResponse, answering conditional GETs with 304 Not Modified"""
+    if cached.is_not_modified(request.headers.get('If-None-Match'),
+                              request.headers.get('If-Modified-Since')):
+        return Response(status=304, headers=cached.headers)
+    
+    return Response(cached.body, mimetype='application/json', headers=cached.headers)
+
+
+def binary_prediction(current_predictor, single):
+    """
+    Score a packed-bytes request (see binary_protocol) and return packed
+    top 5 indices and scores
+    
+    Args:
+        current_predictor: predictor to score with
+        single: accept exactly one row (/api/predict) instead of a batch
+    """
+    body = request.get_data(cache=False)
+    
+    if single and len(body) != 12:
+        return jsonify({
+            'success': False,
+            'error': 'Expected 12 answers'
+        }), 400
+    
+    # Shape and range are checked in one vectorized pass each
+    try:
+        answers_matrix = decode_answers(body)
+        if len(answers_matrix) > MAX_BATCH_SIZE:
+            raise ValueError(f'Batch too large (max {MAX_BATCH_SIZE} rows)')
+        
+        with REGISTRY.stage('predict'):
+            indices, percentages = current_predictor.predict_top5_indices(answers_matrix)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    if prediction_logger:
+        prediction_logger.log(current_predictor.model_version, current_predictor.model.classes_,
+                              answers_matrix, indices, percentages)
+    
+    with REGISTRY.stage('serialize_response'):
+        body = encode_top5(indices, percentages, len(current_predictor.model.classes_))
+    
+    return Response(body, mimetype=RESPONSE_CONTENT_TYPE,
+                    headers={'X-Classes-ETag': classes_response.etag})
+
+# Upper bound on rows accepted by /api/predict/batch in one request
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
+# Optional micro-batching for /api/predict: requests arriving within
+# PREDICT_COALESCE_WINDOW_MS of each other are scored together
+# (disabled when unset or 0)
+COALESCE_WINDOW_MS = float(os.environ.get('PREDICT_COALESCE_WINDOW_MS', 0))
+COALESCE_MAX_BATCH = int(os.environ.get('PREDICT_COALESCE_MAX_BATCH', 64))
+
+coalescer = None
+if COALESCE_WINDOW_MS > 0:
+    coalescer = PredictionCoalescer(lambda: predictor,
+                                    window_ms=COALESCE_WINDOW_MS,
+                                    max_batch_size=COALESCE_MAX_BATCH)
+
+# Optional log of every served prediction for analytics and retraining:
+# rows are queued per request and written in batches by a background thread
+# (disabled when PREDICTION_LOG_DIR is unset)
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR')
+
+prediction_logger = None
+if PREDICTION_LOG_DIR:
+    prediction_logger = PredictionLogger(
+        PREDICTION_LOG_DIR,
+        flush_interval=float(os.environ.get('PREDICTION_LOG_FLUSH_MS', 1000)) / 1000,
+        max_pending_rows=int(os.environ.get('PREDICTION_LOG_MAX_PENDING', 100000)),
+        segment_bytes=int(float(os.environ.get('PREDICTION_LOG_SEGMENT_MB', 64)) * 1024 * 1024)
+    )
+    atexit.register(prediction_logger.close)
+
+
+def log_predictions(current_predictor, answers_matrix, results):
+    """Queue top 5 result lists for the prediction log (no-op when logging is off)"""
+    if prediction_logger is None:
+        return
+    
+    class_index = current_predictor.class_index
+    prediction_logger.log(current_predictor.model_version, current_predictor.model.classes_, answers_matrix,
+                          [[class_index[result['career']] for result in row] for row in results],
+                          [[result['percentage'] for result in row] for row in results])
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started for /metrics"""
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency and status of every request for /metrics"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REGISTRY.observe_request(route, request.method, response.status_code,
+                                 time.perf_counter() - start)
+    return response
 
 @app.route('/')
 def home():
@@ -110,11 +306,8 @@ def home():
 
 @app.route('/api/questions', methods=['GET'])
 def get_questions():
-    """Return all survey questions"""
-    return jsonify({
-        'success': True,
-        'questions': QUESTIONS
-    })
+    """Return all survey questions (prebuilt, supports ETag/If-Modified-Since)"""
+    return static_json(QUESTIONS_RESPONSE)
 
 @app.route('/api/predict', methods=['POST'])
 def predict_career():
@@ -123,7 +316,8 @@ def predict_career():
     
     Expected JSON:
     {
-        "answers": [5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]
+        "answers": [5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3],
+        "explain": false
     }
     
     Returns:
@@ -134,15 +328,132 @@ def predict_career():
             ...
         ]
     }
+    
+    With "explain": true every prediction also has "baseline" and
+    "contributions" (percentage points per question, see
+    CareerPredictor.explain_top5).
+    
+    With Content-Type application/x-career-answers the body is the 12
+    answers as bytes and the response is binary (see binary_protocol).
     """
     try:
-        if not predictor:
+        current_predictor = predictor
+        if not current_predictor:
+            return model_unavailable()
+        
+        if request.mimetype == REQUEST_CONTENT_TYPE:
+            return binary_prediction(current_predictor, single=True)
+        
+        # Get answers from request
+        with REGISTRY.stage('parse_json'):
+            data = request.get_json()
+        
+        if not data or 'answers' not in data:
             return jsonify({
                 'success': False,
-                'error': 'Model not loaded. Please train the model first.'
-            }), 500
+                'error': 'Missing "answers" in request body'
+            }), 400
+        
+        answers = data['answers']
+        explain = data.get('explain', False)
+        
+        # Validate answers
+        with REGISTRY.stage('validate_request'):
+            if not isinstance(explain, bool):
+                return jsonify({
+                    'success': False,
+                    'error': '"explain" must be true or false'
+                }), 400
+            
+            if len(answers) != 12:
+                return jsonify({
+                    'success': False,
+                    'error': 'Expected 12 answers'
+                }), 400
+            
+            # type() rather than isinstance: JSON true/false are bools, a subclass of int
+            if not all(type(ans) is int and 1 <= ans <= 5 for ans in answers):
+                return jsonify({
+                    'success': False,
+                    'error': 'All answers must be integers between 1 and 5'
+                }), 400
+            
+            if explain and current_predictor.explainer is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Explanations are not available for this model'
+                }), 400
+        
+        # Get predictions; a coalesced batch may have been scored by a model
+        # loaded after this request started, so it is logged against that one
+        scored_by = current_predictor
+        with REGISTRY.stage('predict'):
+            if explain:
+                predictions = current_predictor.explain_top5(answers)
+            elif coalescer:
+                scored_by, predictions = coalescer.submit(answers)
+            else:
+                predictions = current_predictor.predict_top5(answers)
+        
+        log_predictions(scored_by, [answers], [predictions])
+        
+        # The model info is embedded as JSON serialized when the model loaded
+        with REGISTRY.stage('serialize_response'):
+            body = encode_object({
+                'success': True,
+                'predictions': predictions,
+                'model_info': model_info_json,
+                'answers': answers
+            })
+            return Response(body, mimetype='application/json')
+    
+    except RuntimeError as e:
+        # The model was swapped for one without the needed artifact mid-request
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_career_batch():
+    """
+    Predict careers for many users in one request
+    
+    Expected JSON:
+    {
+        "answers": [
+            [5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3],
+            [1, 2, 3, 4, 5, 1, 2, 3, 4, 5, 1, 2]
+        ]
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "count": 2,
+        "predictions": [
+            [{"rank": 1, "career": "Software Developer", "percentage": 45.32}, ...],
+            ...
+        ]
+    }
+    
+    With Content-Type application/x-career-answers the body is N x 12
+    answer bytes and the response is binary (see binary_protocol).
+    """
+    try:
+        current_predictor = predictor
+        if not current_predictor:
+            return model_unavailable()
+        
+        if request.mimetype == REQUEST_CONTENT_TYPE:
+            return binary_prediction(current_predictor, single=False)
         
-        # Get answers from request
         data = request.get_json()
         
         if not data or 'answers' not in data:
@@ -153,30 +464,121 @@ def predict_career():
         
         answers = data['answers']
         
-        # Validate answers
-        if len(answers) != 12:
+        if not isinstance(answers, list) or not answers:
+            return jsonify({
+                'success': False,
+                'error': '"answers" must be a non-empty list of answer lists'
+            }), 400
+        
+        if len(answers) > MAX_BATCH_SIZE:
             return jsonify({
                 'success': False,
-                'error': 'Expected 12 answers'
+                'error': f'Batch too large (max {MAX_BATCH_SIZE} rows)'
             }), 400
         
-        if not all(isinstance(ans, int) and 1 <= ans <= 5 for ans in answers):
+        # type() rather than isinstance: JSON true/false are bools, a subclass of
+        # int, and numpy would turn a row mixing them with numbers into integers
+        if not all(isinstance(row, list) and all(type(ans) is int for ans in row) for row in answers):
             return jsonify({
                 'success': False,
                 'error': 'All answers must be integers between 1 and 5'
             }), 400
         
-        # Get predictions
-        predictions = predictor.predict_top5(answers)
+        # Validate the whole payload in one pass
+        try:
+            answers_matrix = validate_answers_matrix(answers)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        # Get model info
-        model_info = predictor.get_model_info()
+        predictions = current_predictor.predict_top5_batch(answers_matrix)
+        log_predictions(current_predictor, answers_matrix, predictions)
         
-        return jsonify({
+        return Response(encode_object({
             'success': True,
+            'count': len(predictions),
             'predictions': predictions,
-            'model_info': model_info,
-            'answers': answers
+            'model_info': model_info_json
+        }), mimetype='application/json')
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/similar', methods=['POST'])
+def find_similar():
+    """
+    Training respondents whose answers are closest to the user's
+    
+    Expected JSON:
+    {
+        "answers": [5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3],
+        "k": 10
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "similar": [
+            {"career": "Software Developer", "distance": 0.0, "respondents": 12},
+            ...
+        ]
+    }
+    """
+    try:
+        current_predictor = predictor
+        if not current_predictor:
+            return model_unavailable()
+        
+        data = request.get_json()
+        
+        if not data or 'answers' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing "answers" in request body'
+            }), 400
+        
+        answers = data['answers']
+        if not isinstance(answers, list) or not all(type(ans) is int for ans in answers):
+            return jsonify({
+                'success': False,
+                'error': 'All answers must be integers between 1 and 5'
+            }), 400
+        
+        k = data.get('k', 10)
+        if type(k) is not int or not 1 <= k <= 100:
+            return jsonify({
+                'success': False,
+                'error': '"k" must be an integer between 1 and 100'
+            }), 400
+        
+        if current_predictor.neighbors is None:
+            return jsonify({
+                'success': False,
+                'error': 'Similar respondents are not available for this model'
+            }), 503
+        
+        try:
+            similar = current_predictor.find_similar(answers, k=k)
+        except RuntimeError as e:
+            # The model was swapped for one without an index mid-request
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 503
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'similar': similar
         })
     
     except Exception as e:
@@ -187,18 +589,38 @@ def predict_career():
 
 @app.route('/api/model-info', methods=['GET'])
 def get_model_info():
-    """Get model information"""
+    """Get model information (prebuilt per model, supports ETag/If-Modified-Since)"""
+    if not predictor:
+        return model_unavailable()
+    
+    return static_json(model_info_response)
+
+@app.route('/api/classes', methods=['GET'])
+def get_classes():
+    """
+    Career names indexed like binary prediction responses
+    
+    Cacheable: the ETag changes only when a reload brings different careers.
+    """
+    if not predictor:
+        return model_unavailable()
+    
+    return static_json(classes_response)
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get runtime statistics (prediction cache, fast tier, coalescer and prediction log counters)"""
     try:
-        if not predictor:
-            return jsonify({
-                'success': False,
-                'error': 'Model not loaded'
-            }), 500
+        current_predictor = predictor
+        if not current_predictor:
+            return model_unavailable()
         
-        info = predictor.get_model_info()
         return jsonify({
             'success': True,
-            'model_info': info
+            'cache': current_predictor.get_cache_stats(),
+            'tier': current_predictor.get_tier_stats(),
+            'coalescer': coalescer.stats() if coalescer else {'enabled': False},
+            'prediction_log': prediction_logger.stats() if prediction_logger else {'enabled': False}
         })
     
     except Exception as e:
@@ -207,22 +629,72 @@ def get_model_info():
             'error': str(e)
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus-style metrics: stage/request latency histograms and counters"""
+    body = REGISTRY.render()
+    body += render_gauges('career_model', {
+        'ready': int(predictor is not None),
+        'load_seconds': model_load_seconds or 0
+    }, 'Model status')
+    
+    current_predictor = predictor
+    if current_predictor:
+        body += render_gauges('career_prediction_cache', current_predictor.get_cache_stats(),
+                              'Prediction cache')
+        body += render_gauges('career_tier', current_predictor.get_tier_stats(), 'Fast tier')
+    if coalescer:
+        body += render_gauges('career_coalescer', coalescer.stats(), 'Prediction coalescer')
+    if prediction_logger:
+        body += render_gauges('career_prediction_log', prediction_logger.stats(), 'Prediction log')
+    
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload_model():
+    """
+    Reload the model from disk without dropping requests
+    
+    Requires the ADMIN_TOKEN environment variable to be set and sent back
+    in the X-Admin-Token header. Reloads this worker only; send SIGUSR2
+    to each worker process to reload all of them.
+    """
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    # Constant-time comparison, so response timing doesn't leak the token
+    provided = request.headers.get('X-Admin-Token', '')
+    if not admin_token or not hmac.compare_digest(provided.encode('utf-8'), admin_token.encode('utf-8')):
+        return jsonify({
+            'success': False,
+            'error': 'Forbidden'
+        }), 403
+    
+    try:
+        new_predictor = reload_model()
+        return jsonify({
+            'success': True,
+            'model_info': new_predictor.get_model_info()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Reload failed, previous model still active: {e}'
+        }), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (503 until the model is ready)"""
+    ready = predictor is not None
     return jsonify({
-        'status': 'healthy',
-        'model_loaded': predictor is not None
-    })
+        'status': 'healthy' if ready else model_status,
+        'model_loaded': ready
+    }), 200 if ready else 503
 
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("🚀 CAREER ANALYSIS - Flask Server")
     print("="*60)
-    print(f"📊 Model Status: {'✓ Loaded' if predictor else '✗ Not Loaded'}")
-    
-    if not predictor:
-        print("⚠️  WARNING: Model not loaded. Server may not work properly.")
+    print(f"📊 Model Status: {'✓ Loaded' if predictor else f'⏳ {model_status} (loading in background)'}")
     
     # Get port from environment variable (for deployment)
     port = int(os.environ.get('PORT', 5000))
@@ -232,7 +704,13 @@ if __name__ == '__main__':
     print("   GET  /                 - Main page")
     print("   GET  /api/questions    - Get survey questions")
     print("   POST /api/predict      - Get career predictions")
+    print("   POST /api/predict/batch - Get predictions for many users")
+    print("   POST /api/similar      - Find respondents with similar answers")
     print("   GET  /api/model-info   - Get model information")
+    print("   GET  /api/classes      - Career names for binary responses")
+    print("   GET  /api/stats        - Get cache/coalescer statistics")
+    print("   POST /api/admin/reload - Reload model (X-Admin-Token)")
+    print("   GET  /metrics          - Prometheus metrics")
     print("   GET  /health           - Health check")
     print("="*60 + "\n")
     
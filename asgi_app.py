@@ -0,0 +1,630 @@
+"""
+Async (ASGI) entry point with a process-pool prediction backend
+
+Serves /api/questions, /api/predict and /api/predict/batch (JSON or
+binary), /api/model-info, /api/classes and /health like app.py, but the
+event loop only parses and validates requests: inference runs in a pool of
+worker processes that each load the model once (the native forest file is
+memory-mapped, so its pages are shared between them). One server process
+can keep every core busy.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+    python asgi_app.py
+
+Settings (environment variables):
+    ASGI_PREDICT_WORKERS      worker processes (default: all cores)
+    ASGI_MAX_PENDING          predictions queued or running before new ones
+                              get 503 (default: 32 per worker)
+    ASGI_PREDICT_TIMEOUT_MS   per-request prediction timeout (default: 5000)
+    MAX_BATCH_SIZE            rows per /api/predict/batch request (default: 10000)
+    PREDICTION_*              model settings, see CareerPredictor.from_env
+"""
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from binary_protocol import REQUEST_CONTENT_TYPE, RESPONSE_CONTENT_TYPE, decode_answers, encode_top5
+from career_predictor import SCORE_SCALE, CareerPredictor, validate_answers_matrix
+from metrics import REGISTRY
+from questions import QUESTIONS
+from static_responses import StaticResponse, encode_object
+import questions
+
+FOREST_PATH = 'model/career_forest.bin'
+PICKLE_PATH = 'model/career_model.pkl'
+
+# Request bodies are a dozen small integers; anything much larger is abuse
+MAX_BODY_BYTES = 64 * 1024
+
+# Upper bound on rows accepted by /api/predict/batch in one request (as in app.py),
+# and room for that many rows of JSON
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+MAX_BATCH_BODY_BYTES = MAX_BODY_BYTES + MAX_BATCH_SIZE * 64
+
+# Seconds a new pool may take for every worker to load the model
+WARM_TIMEOUT = 120.0
+
+# Set in each worker process by _init_worker
+_predictor = None
+_warm_barrier = None
+
+
+def _init_worker(warm_barrier):
+    global _predictor, _warm_barrier
+    _predictor = CareerPredictor.from_env()
+    _warm_barrier = warm_barrier
+
+
+def _worker_model_info():
+    # Each warm-up call holds its worker until every worker has one, so the
+    # pool has to start (and load the model in) all of its processes;
+    # otherwise one process could answer them all and the others would load
+    # the model on their first real request
+    _warm_barrier.wait(WARM_TIMEOUT)
+    return (_predictor.get_model_info(), [str(c) for c in _predictor.model.classes_],
+            (_predictor.metadata or {}).get('cross_validation'))
+
+
+def _worker_predict_top5(answers):
+    return _predictor.predict_top5(answers)
+
+
+def _worker_predict_batch(answers_matrix):
+    return _predictor.predict_top5_batch(answers_matrix)
+
+
+def _worker_predict_binary(body):
+    indices, percentages = _predictor.predict_top5_indices(decode_answers(body))
+    return encode_top5(indices, percentages, len(_predictor.model.classes_))
+
+
+class Overloaded(Exception):
+    """Raised when too many predictions are already pending"""
+
+
+class PredictionBackend:
+    """
+    Pool of worker processes that each hold one CareerPredictor
+
+    Usage:
+        backend = PredictionBackend(workers=4, max_pending=128, timeout=5.0)
+        await backend.start()
+        predictions = await backend.predict_top5([5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3])
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=5.0):
+        """
+        Args:
+            workers: worker processes (default: all cores)
+            max_pending: predictions allowed in flight before rejecting new
+                ones with Overloaded (default: 32 per worker)
+            timeout: seconds a request waits for its prediction
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 32 * self.workers
+        self.timeout = timeout
+        self.status = 'starting'  # starting -> ready | failed; ready -> recovering -> ready
+        self.model_info = None
+        self.model_info_response = None
+        self.model_info_json = None
+        self.classes_response = None
+        self._pool = None
+        self._tasks = set()
+        self._pending = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    async def _warm_pool(self):
+        """Start a pool and wait until every worker has loaded the model"""
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(multiprocessing.Barrier(self.workers),))
+        try:
+            infos = await asyncio.gather(*[loop.run_in_executor(pool, _worker_model_info)
+                                           for _ in range(self.workers)])
+        except Exception:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        return pool, infos[0]
+
+    def _set_model_info(self, model_info):
+        """Serialize the model info and class list once per loaded model"""
+        self.model_info, classes, cross_validation = model_info
+        self.model_info_response = StaticResponse({'success': True, 'model_info': self.model_info,
+                                                   'cross_validation': cross_validation})
+        self.model_info_json = encode_object(self.model_info)
+        self.classes_response = StaticResponse({'success': True, 'classes': classes,
+                                                'score_scale': SCORE_SCALE})
+
+    async def start(self):
+        """Load the model in every worker"""
+        if not (os.path.exists(FOREST_PATH) or os.path.exists(PICKLE_PATH)):
+            self.status = 'failed'
+            print("❌ Model not found. Run: python train_model.py")
+            return
+
+        try:
+            self._pool, model_info = await self._warm_pool()
+            self._set_model_info(model_info)
+            self.status = 'ready'
+            print(f"✅ Model loaded in {self.workers} worker processes")
+        except Exception as e:
+            self.status = 'failed'
+            print(f"❌ Error loading model: {e}")
+
+    async def reload(self):
+        """
+        Swap in a fresh pool that loaded the model files again
+
+        The old pool keeps serving until the new one is warm, then finishes
+        its queued work in the background.
+        """
+        pool, model_info = await self._warm_pool()
+        self._set_model_info(model_info)
+        old_pool, self._pool = self._pool, pool
+        self.status = 'ready'
+        if old_pool:
+            old_pool.shutdown(wait=False)
+        print("🔄 Model reloaded")
+
+    async def reload_logged(self):
+        """reload() for callers nobody awaits (SIGUSR2): report failures instead of raising"""
+        try:
+            await self.reload()
+        except Exception as e:
+            print(f"❌ Error reloading model (still serving the previous one): {e}")
+
+    async def _replace_broken_pool(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            self.status = 'failed'
+            print(f"❌ Error restarting the prediction workers: {e}")
+
+    def _recover(self, broken_pool):
+        """Replace a pool that lost a worker process (it rejects all further work)"""
+        if broken_pool is not self._pool or self.status == 'recovering':
+            return
+        self.status = 'recovering'
+        print("⚠️  A prediction worker died; starting a new pool")
+        self.run_in_background(self._replace_broken_pool())
+
+    def run_in_background(self, coro):
+        """Schedule coro on the running loop, keeping a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Background task {task.get_coro().__qualname__} failed: {task.exception()!r}")
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def predict_top5(self, answers):
+        """Score one answer list in a worker process (see _run)"""
+        return await self._run(_worker_predict_top5, answers)
+
+    async def predict_top5_batch(self, answers_matrix):
+        """Score a validated N x 12 answer matrix in a worker process (see _run)"""
+        return await self._run(_worker_predict_batch, answers_matrix)
+
+    async def predict_binary(self, body):
+        """Score a binary request body in a worker process (see _run)"""
+        return await self._run(_worker_predict_binary, body)
+
+    async def _run(self, fn, *args):
+        """
+        Run fn in a worker process
+
+        Raises:
+            Overloaded: max_pending predictions are already in flight
+            asyncio.TimeoutError: no result within the timeout (a task that
+                already started still finishes, but nobody waits for it)
+            BrokenProcessPool: a worker process died; a new pool is started
+                in the background
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise Overloaded()
+
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._recover(pool)
+            raise
+
+        # A task counts as pending until the worker is done with it (or it is
+        # cancelled before starting), not just until its caller stops waiting
+        self._pending += 1
+        future.add_done_callback(functools.partial(self._release_soon, loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise
+        except BrokenProcessPool:
+            self._recover(pool)
+            raise
+
+    def _release_soon(self, loop, future):
+        # Runs in the pool's management thread, so the counter is updated on the loop
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release)
+
+    def _release(self):
+        self._pending -= 1
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            'rejected': self._rejected,
+            'timeouts': self._timeouts
+        }
+
+
+backend = PredictionBackend(
+    workers=int(os.environ.get('ASGI_PREDICT_WORKERS', 0)) or None,
+    max_pending=int(os.environ.get('ASGI_MAX_PENDING', 0)) or None,
+    timeout=float(os.environ.get('ASGI_PREDICT_TIMEOUT_MS', 5000)) / 1000.0
+)
+
+# Same permissive policy as flask_cors.CORS(app) in app.py
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+]
+
+
+# The questions only change with the code, so their response is built once
+QUESTIONS_RESPONSE = StaticResponse({'success': True, 'questions': QUESTIONS},
+                                    last_modified=os.path.getmtime(questions.__file__))
+
+
+async def send_json(send, status, payload, extra_headers=()):
+    """Send a JSON response (payload is a dict, or bytes already serialized)"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())] + CORS_HEADERS + list(extra_headers)
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_static(scope, send, cached):
+    """Send a StaticResponse, answering conditional GETs with 304 Not Modified"""
+    headers = dict(scope['headers'])
+    validators = [(name.lower().encode(), value.encode()) for name, value in cached.headers.items()]
+
+    if cached.is_not_modified(headers.get(b'if-none-match', b'').decode('latin-1'),
+                              headers.get(b'if-modified-since', b'').decode('latin-1')):
+        await send({'type': 'http.response.start', 'status': 304,
+                    'headers': CORS_HEADERS + validators})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    await send_json(send, 200, cached.body, extra_headers=validators)
+
+
+async def read_body(receive, limit=MAX_BODY_BYTES):
+    """Read the whole request body, or return None if it is larger than limit"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def model_unavailable():
+    """(status, payload) for requests that arrive before the model is ready"""
+    if backend.status == 'failed':
+        return 500, {'success': False, 'error': 'Model not loaded. Please train the model first.'}
+    return 503, {'success': False,
+                 'error': f'Model is not ready yet ({backend.status}). Please retry shortly.'}
+
+
+async def get_questions(scope, receive, send):
+    """Return all survey questions (prebuilt, supports ETag/If-Modified-Since)"""
+    await send_static(scope, send, QUESTIONS_RESPONSE)
+
+
+async def run_prediction(send, prediction):
+    """
+    Await a backend prediction, answering the request here if it fails
+
+    Returns:
+        The prediction, or None when an error response was sent
+    """
+    try:
+        return await prediction
+    except Overloaded:
+        await send_json(send, 503, {'success': False, 'error': 'Server busy. Please retry shortly.'},
+                        extra_headers=[(b'retry-after', b'1')])
+    except asyncio.TimeoutError:
+        await send_json(send, 504, {'success': False, 'error': 'Prediction timed out'})
+    except BrokenProcessPool:
+        # The worker died with the request; a new pool is on its way
+        await send_json(send, 503, {'success': False,
+                                    'error': 'Prediction workers are restarting. Please retry shortly.'},
+                        extra_headers=[(b'retry-after', b'1')])
+    except ValueError as e:
+        await send_json(send, 400, {'success': False, 'error': str(e)})
+    except Exception as e:
+        await send_json(send, 500, {'success': False, 'error': str(e)})
+    return None
+
+
+def is_binary_request(scope):
+    content_type = dict(scope['headers']).get(b'content-type', b'')
+    return content_type.split(b';')[0].strip() == REQUEST_CONTENT_TYPE.encode()
+
+
+def parse_answers_body(body):
+    """The "answers" value of a JSON body, or None if there is none"""
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or 'answers' not in data:
+        return None
+    return data['answers']
+
+
+async def predict_career(scope, receive, send):
+    """Predict careers based on user answers (same contract as app.py)"""
+    if backend.status != 'ready':
+        await send_json(send, *model_unavailable())
+        return
+
+    body = await read_body(receive)
+    if body is None:
+        await send_json(send, 413, {'success': False, 'error': 'Request body too large'})
+        return
+
+    if is_binary_request(scope):
+        await predict_binary(send, body, single=True)
+        return
+
+    answers = parse_answers_body(body)
+    if answers is None:
+        await send_json(send, 400, {'success': False, 'error': 'Missing "answers" in request body'})
+        return
+
+    if not isinstance(answers, list) or len(answers) != 12:
+        await send_json(send, 400, {'success': False, 'error': 'Expected 12 answers'})
+        return
+
+    # type() rather than isinstance: JSON true/false are bools, a subclass of int
+    if not all(type(ans) is int and 1 <= ans <= 5 for ans in answers):
+        await send_json(send, 400, {'success': False,
+                                    'error': 'All answers must be integers between 1 and 5'})
+        return
+
+    predictions = await run_prediction(send, backend.predict_top5(answers))
+    if predictions is None:
+        return
+
+    # The model info is embedded as JSON serialized when the model loaded
+    await send_json(send, 200, encode_object({
+        'success': True,
+        'predictions': predictions,
+        'model_info': backend.model_info_json,
+        'answers': answers
+    }))
+
+
+async def predict_career_batch(scope, receive, send):
+    """Predict careers for many users in one request (same contract as app.py)"""
+    if backend.status != 'ready':
+        await send_json(send, *model_unavailable())
+        return
+
+    body = await read_body(receive, MAX_BATCH_BODY_BYTES)
+    if body is None:
+        await send_json(send, 413, {'success': False, 'error': 'Request body too large'})
+        return
+
+    if is_binary_request(scope):
+        await predict_binary(send, body, single=False)
+        return
+
+    answers = parse_answers_body(body)
+    if answers is None:
+        await send_json(send, 400, {'success': False, 'error': 'Missing "answers" in request body'})
+        return
+
+    if not isinstance(answers, list) or not answers:
+        await send_json(send, 400, {'success': False,
+                                    'error': '"answers" must be a non-empty list of answer lists'})
+        return
+
+    if len(answers) > MAX_BATCH_SIZE:
+        await send_json(send, 400, {'success': False, 'error': f'Batch too large (max {MAX_BATCH_SIZE} rows)'})
+        return
+
+    # Same checks as app.py: no bools, then shape and range in one vectorized pass
+    if not all(isinstance(row, list) and all(type(ans) is int for ans in row) for row in answers):
+        await send_json(send, 400, {'success': False,
+                                    'error': 'All answers must be integers between 1 and 5'})
+        return
+    try:
+        answers_matrix = validate_answers_matrix(answers)
+    except ValueError as e:
+        await send_json(send, 400, {'success': False, 'error': str(e)})
+        return
+
+    predictions = await run_prediction(send, backend.predict_top5_batch(answers_matrix.astype(np.uint8)))
+    if predictions is None:
+        return
+
+    await send_json(send, 200, encode_object({
+        'success': True,
+        'count': len(predictions),
+        'predictions': predictions,
+        'model_info': backend.model_info_json
+    }))
+
+
+async def predict_binary(send, body, single):
+    """
+    Binary /api/predict and /api/predict/batch: 12 answer bytes per row in,
+    packed top 5 out (see binary_protocol)
+    """
+    if single and len(body) != 12:
+        await send_json(send, 400, {'success': False, 'error': 'Expected 12 answers'})
+        return
+
+    if len(body) // 12 > MAX_BATCH_SIZE:
+        await send_json(send, 400, {'success': False, 'error': f'Batch too large (max {MAX_BATCH_SIZE} rows)'})
+        return
+
+    # decode_answers in the worker rejects partial rows and bad answers with ValueError (400)
+    packed = await run_prediction(send, backend.predict_binary(body))
+    if packed is None:
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', RESPONSE_CONTENT_TYPE.encode()),
+                    (b'content-length', str(len(packed)).encode()),
+                    (b'x-classes-etag', backend.classes_response.etag.encode()),
+                    (b'access-control-expose-headers', b'X-Classes-ETag')] + CORS_HEADERS
+    })
+    await send({'type': 'http.response.body', 'body': packed})
+
+
+async def get_classes(scope, receive, send):
+    """Career names indexed like binary prediction responses"""
+    if backend.status != 'ready':
+        await send_json(send, *model_unavailable())
+        return
+
+    await send_static(scope, send, backend.classes_response)
+
+
+async def get_model_info(scope, receive, send):
+    """Get model information (prebuilt per model, supports ETag/If-Modified-Since)"""
+    if backend.status != 'ready':
+        await send_json(send, *model_unavailable())
+        return
+
+    await send_static(scope, send, backend.model_info_response)
+
+
+async def health_check(scope, receive, send):
+    """Health check endpoint (503 until the workers have loaded the model)"""
+    await send_json(send, 200 if backend.status == 'ready' else 503, {
+        'status': 'healthy' if backend.status == 'ready' else backend.status,
+        'model_loaded': backend.status == 'ready',
+        'backend': backend.stats()
+    })
+
+
+ROUTES = {
+    '/api/questions': ('GET', get_questions),
+    '/api/predict': ('POST', predict_career),
+    '/api/predict/batch': ('POST', predict_career_batch),
+    '/api/model-info': ('GET', get_model_info),
+    '/api/classes': ('GET', get_classes),
+    '/health': ('GET', health_check),
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Load in the background so the server accepts /health right away
+            backend.run_in_background(backend.start())
+            if hasattr(signal, 'SIGUSR2'):
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGUSR2, lambda: backend.run_in_background(backend.reload_logged()))
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            backend.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    start = time.perf_counter()
+    route = ROUTES.get(scope['path'])
+    status_holder = {}
+
+    async def send_and_record(message):
+        if message['type'] == 'http.response.start':
+            status_holder['status'] = message['status']
+        await send(message)
+
+    if route is None:
+        await send_json(send_and_record, 404, {'success': False, 'error': 'Endpoint not found'})
+    elif scope['method'] == 'OPTIONS':
+        # CORS preflight
+        requested = dict(scope['headers']).get(b'access-control-request-headers', b'*')
+        await send_and_record({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': CORS_HEADERS + [(b'access-control-allow-methods', route[0].encode()),
+                                       (b'access-control-allow-headers', requested),
+                                       (b'content-length', b'0')]
+        })
+        await send_and_record({'type': 'http.response.body', 'body': b''})
+    elif scope['method'] != route[0]:
+        await send_json(send_and_record, 405, {'success': False, 'error': 'Method not allowed'})
+    else:
+        await route[1](scope, receive, send_and_record)
+
+    REGISTRY.observe_request(scope['path'] if route else 'unmatched', scope['method'],
+                             status_holder.get('status', 500), time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+
+    print("\n" + "="*60)
+    print("🚀 CAREER PREDICTION API (ASGI)")
+    print("="*60)
+    print(f"\n📍 Server running on: http://localhost:{port}")
+    print(f"⚙️  Prediction workers: {backend.workers}")
+    print("\n📡 API Endpoints:")
+    print("   GET  /api/questions    - Get all questions")
+    print("   POST /api/predict      - Get career predictions")
+    print("   GET  /api/model-info   - Get model information")
+    print("   GET  /api/classes      - Career names for binary responses")
+    print("   GET  /health           - Health check")
+    print("="*60 + "\n")
+
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,376 @@
+"""
+Performance benchmarks for the career predictor
+
+Measures model load time and memory, predict_top5 latency, batch
+throughput, and /api/predict throughput through Flask's test client and
+a local gunicorn server. Results are written as JSON so runs from
+different commits can be compared:
+
+    python benchmark.py --output bench_results/before.json
+    python benchmark.py --compare bench_results/before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from career_predictor import CareerPredictor
+
+# Metrics where a lower value is better (used by --compare)
+LOWER_IS_BETTER = ('seconds', 'ms', 'rss_mb')
+
+# Run in a fresh interpreter so import time and memory are not shared
+# with the benchmark process
+_LOAD_SCRIPT = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from career_predictor import CareerPredictor
+predictor = CareerPredictor(engine=sys.argv[1], cache_size=0)
+load_seconds = time.perf_counter() - t0
+predictor.predict_top5([5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3])
+with open('/proc/self/status') as f:
+    status = {line.split(':')[0]: int(line.split()[1])
+              for line in f if line.startswith(('VmRSS', 'RssAnon', 'RssFile'))}
+print(json.dumps({
+    'engine': predictor.engine,
+    'load_seconds': load_seconds,
+    'rss_mb': status['VmRSS'] / 1024,
+    'private_rss_mb': status.get('RssAnon', 0) / 1024,
+    'shared_file_rss_mb': status.get('RssFile', 0) / 1024,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'sklearn_imported': 'sklearn' in sys.modules
+}))
+"""
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def random_answers(n, seed=42):
+    return np.random.default_rng(seed).integers(1, 6, size=(n, 12))
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_load(engine):
+    """Load time and RSS of a fresh process holding one predictor"""
+    result = subprocess.run([sys.executable, '-c', _LOAD_SCRIPT, engine],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_latency(predictor, iterations):
+    """predict_top5 latency for single rows (cache disabled)"""
+    rows = random_answers(iterations).tolist()
+    predictor.predict_top5(rows[0])  # warm up
+
+    samples = []
+    for answers in rows:
+        start = time.perf_counter()
+        predictor.predict_top5(answers)
+        samples.append(time.perf_counter() - start)
+
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile_ms(samples, 50),
+        'p90_ms': percentile_ms(samples, 90),
+        'p99_ms': percentile_ms(samples, 99),
+        'mean_ms': float(np.mean(samples) * 1000)
+    }
+
+
+def bench_batch(predictor, batch_sizes, min_seconds=0.5):
+    """predict_top5_batch throughput as the batch size grows"""
+    results = []
+    for batch_size in batch_sizes:
+        batch = random_answers(batch_size, seed=batch_size)
+        predictor.predict_top5_batch(batch)  # warm up
+
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            predictor.predict_top5_batch(batch)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+
+        results.append({
+            'batch_size': batch_size,
+            'batch_ms': elapsed / runs * 1000,
+            'rows_per_second': batch_size * runs / elapsed
+        })
+    return results
+
+
+def bench_flask(requests_count):
+    """End-to-end /api/predict through Flask's test client"""
+    import app as flask_app
+
+    if not flask_app.model_ready.wait(120):
+        return {'error': 'model did not become ready'}
+
+    client = flask_app.app.test_client()
+    rows = random_answers(requests_count, seed=7).tolist()
+    client.post('/api/predict', json={'answers': rows[0]})  # warm up
+
+    samples = []
+    start = time.perf_counter()
+    for answers in rows:
+        t0 = time.perf_counter()
+        response = client.post('/api/predict', json={'answers': answers})
+        samples.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            return {'error': f'HTTP {response.status_code}'}
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': requests_count,
+        'requests_per_second': requests_count / elapsed,
+        'p50_ms': percentile_ms(samples, 50),
+        'p99_ms': percentile_ms(samples, 99)
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_health(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def bench_gunicorn(workers, threads, clients, duration):
+    """/api/predict throughput against a local gunicorn server"""
+    if not shutil.which('gunicorn'):
+        return {'error': 'gunicorn not installed'}
+
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        ['gunicorn', '-w', str(workers), '--threads', str(threads),
+         '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    try:
+        started = time.perf_counter()
+        if not _wait_for_health(f'{base_url}/health', timeout=120):
+            return {'error': 'server did not become healthy'}
+        ready_seconds = time.perf_counter() - started
+
+        samples = []
+        errors = []
+        lock = threading.Lock()
+        stop_at = time.monotonic() + duration
+
+        def client(seed):
+            rows = random_answers(1000, seed=seed).tolist()
+            local_samples, local_errors, i = [], 0, 0
+            while time.monotonic() < stop_at:
+                body = json.dumps({'answers': rows[i % len(rows)]}).encode()
+                request = urllib.request.Request(f'{base_url}/api/predict', data=body,
+                                                 headers={'Content-Type': 'application/json'})
+                t0 = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=10) as response:
+                        response.read()
+                    local_samples.append(time.perf_counter() - t0)
+                except OSError:
+                    local_errors += 1
+                i += 1
+            with lock:
+                samples.extend(local_samples)
+                errors.append(local_errors)
+
+        threads_list = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+        for t in threads_list:
+            t.start()
+        for t in threads_list:
+            t.join()
+
+        return {
+            'workers': workers,
+            'threads': threads,
+            'clients': clients,
+            'ready_seconds': ready_seconds,
+            'requests': len(samples),
+            'errors': sum(errors),
+            'requests_per_second': len(samples) / duration,
+            'p50_ms': percentile_ms(samples, 50) if samples else None,
+            'p99_ms': percentile_ms(samples, 99) if samples else None
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _flatten(value, prefix=''):
+    """Flatten nested results into {'a.b.c': number} for comparisons"""
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(_flatten(item, f'{prefix}{key}.'))
+    elif isinstance(value, list):
+        for item in value:
+            label = item.get('batch_size', len(flat)) if isinstance(item, dict) else len(flat)
+            flat.update(_flatten(item, f'{prefix}{label}.'))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix.rstrip('.')] = value
+    return flat
+
+
+def compare(current, baseline_path):
+    """Print the relative change of every metric against a saved run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\n📈 Comparison with {baseline_path} ({baseline.get('git_revision', '?')})")
+    print("-" * 60)
+
+    old = _flatten(baseline['results'])
+    new = _flatten(current['results'])
+    for key in sorted(old.keys() & new.keys()):
+        if old[key] == 0 or key.endswith(('iterations', 'requests', 'batch_size', 'workers',
+                                          'threads', 'clients', 'errors')):
+            continue
+        change = (new[key] - old[key]) / old[key] * 100
+        better = change < 0 if key.endswith(LOWER_IS_BETTER) else change > 0
+        marker = "✓" if better else "✗"
+        print(f"   {marker} {key:45s} {old[key]:12.3f} -> {new[key]:12.3f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the career predictor")
+    parser.add_argument('--engines', default='native,sklearn',
+                        help="comma-separated CareerPredictor engines to benchmark")
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help="single-row predictions for the latency test")
+    parser.add_argument('--batch-sizes', default='1,8,64,512,4096',
+                        help="comma-separated batch sizes for the throughput test")
+    parser.add_argument('--http-requests', type=int, default=1000,
+                        help="requests sent through Flask's test client")
+    parser.add_argument('--skip-http', action='store_true',
+                        help="skip the Flask and gunicorn benchmarks")
+    parser.add_argument('--skip-gunicorn', action='store_true',
+                        help="skip the gunicorn benchmark")
+    parser.add_argument('--gunicorn-workers', type=int, default=2)
+    parser.add_argument('--gunicorn-threads', type=int, default=4)
+    parser.add_argument('--gunicorn-clients', type=int, default=8)
+    parser.add_argument('--gunicorn-duration', type=float, default=10.0,
+                        help="seconds of load against gunicorn")
+    parser.add_argument('--output', default=None,
+                        help="results file (default: bench_results/<git revision>.json)")
+    parser.add_argument('--compare', default=None,
+                        help="previous results file to compare against")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CAREER PREDICTOR BENCHMARK")
+    print("=" * 60)
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    results = {'load': {}, 'latency': {}, 'batch': {}}
+
+    for engine in engines:
+        print(f"\n⏱️  Engine: {engine}")
+
+        load = bench_load(engine)
+        results['load'][engine] = load
+        if 'error' in load:
+            print(f"   ✗ Could not load: {load['error']}")
+            continue
+        print(f"   Load: {load['load_seconds']*1000:.1f} ms, RSS {load['rss_mb']:.1f} MB "
+              f"({load['private_rss_mb']:.1f} MB private, {load['shared_file_rss_mb']:.1f} MB shared file pages)")
+
+        predictor = CareerPredictor(engine=engine, cache_size=0)
+
+        latency = bench_latency(predictor, args.iterations)
+        results['latency'][engine] = latency
+        print(f"   predict_top5: p50 {latency['p50_ms']:.3f} ms, p99 {latency['p99_ms']:.3f} ms")
+
+        batch = bench_batch(predictor, batch_sizes)
+        results['batch'][engine] = batch
+        for row in batch:
+            print(f"   batch {row['batch_size']:>6}: {row['rows_per_second']:>12,.0f} rows/s")
+
+        del predictor
+
+    if not args.skip_http:
+        print("\n🌐 Flask test client")
+        flask_result = bench_flask(args.http_requests)
+        results['flask'] = flask_result
+        if 'error' in flask_result:
+            print(f"   ✗ {flask_result['error']}")
+        else:
+            print(f"   {flask_result['requests_per_second']:,.0f} req/s, "
+                  f"p50 {flask_result['p50_ms']:.2f} ms, p99 {flask_result['p99_ms']:.2f} ms")
+
+        if not args.skip_gunicorn:
+            print("\n🦄 gunicorn")
+            gunicorn_result = bench_gunicorn(args.gunicorn_workers, args.gunicorn_threads,
+                                             args.gunicorn_clients, args.gunicorn_duration)
+            results['gunicorn'] = gunicorn_result
+            if 'error' in gunicorn_result:
+                print(f"   ✗ {gunicorn_result['error']}")
+            else:
+                print(f"   {gunicorn_result['requests_per_second']:,.0f} req/s, "
+                      f"p50 {gunicorn_result['p50_ms']:.2f} ms, p99 {gunicorn_result['p99_ms']:.2f} ms, "
+                      f"{gunicorn_result['errors']} errors")
+
+    report = {
+        'git_revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+    output = args.output or os.path.join('bench_results', f"{report['git_revision']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    print("\n" + "=" * 60)
+    print("✨ BENCHMARK COMPLETE!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compact binary format for /api/predict and /api/predict/batch
+
+Request (Content-Type: application/x-career-answers):
+    N x 12 bytes, one uint8 answer (1-5) per question, row after row.
+    /api/predict takes exactly one row.
+
+Response (Content-Type: application/x-career-top5), little-endian:
+    8-byte header: b'CT', version (uint8), index width in bytes (uint8),
+                   row count (uint32)
+    N x 5 career indices (uint8, or uint16 with more than 256 careers)
+    N x 5 scores as uint16 hundredths of a percent (9101 = 91.01%)
+
+Indices point into the list from GET /api/classes; its ETag is sent with
+every binary response in X-Classes-ETag, so clients know when to refetch.
+"""
+import struct
+
+import numpy as np
+
+from career_predictor import SCORE_SCALE
+from dataset import N_QUESTIONS
+
+REQUEST_CONTENT_TYPE = 'application/x-career-answers'
+RESPONSE_CONTENT_TYPE = 'application/x-career-top5'
+
+MAGIC = b'CT'
+VERSION = 1
+_HEADER = struct.Struct('<2sBBI')
+
+
+def index_width(n_classes):
+    """Bytes per career index for a model with n_classes careers"""
+    return 1 if n_classes <= 256 else 2
+
+
+def decode_answers(body):
+    """
+    Unpack a request body into an N x 12 uint8 array
+
+    Only the length is checked here; the range check happens in the same
+    vectorized pass the predictor runs on every batch.
+
+    Raises:
+        ValueError: if the body is empty or not a whole number of rows
+    """
+    if not body or len(body) % N_QUESTIONS:
+        raise ValueError(f"Body must be a non-empty multiple of {N_QUESTIONS} bytes (one uint8 answer per question)")
+    return np.frombuffer(body, dtype=np.uint8).reshape(-1, N_QUESTIONS)
+
+
+def encode_answers(answers_matrix):
+    """Pack an N x 12 array of answers into a request body"""
+    return np.asarray(answers_matrix, dtype=np.uint8).tobytes()
+
+
+def encode_top5(indices, percentages, n_classes):
+    """
+    Pack top 5 indices and percentages (as returned by
+    CareerPredictor.predict_top5_indices) into a response body
+    """
+    width = index_width(n_classes)
+    index_dtype = np.uint8 if width == 1 else np.dtype('<u2')
+    scores = np.round(np.asarray(percentages) * SCORE_SCALE)
+
+    return b''.join((_HEADER.pack(MAGIC, VERSION, width, len(indices)),
+                     np.asarray(indices).astype(index_dtype).tobytes(),
+                     scores.astype('<u2').tobytes()))
+
+
+def decode_top5(body):
+    """
+    Unpack a response body
+
+    Returns:
+        (indices, percentages): N x 5 arrays, highest first
+    """
+    magic, version, width, n_rows = _HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a career top 5 response")
+
+    index_dtype = np.uint8 if width == 1 else np.dtype('<u2')
+    index_bytes = n_rows * 5 * width
+    indices = np.frombuffer(body, dtype=index_dtype, count=n_rows * 5, offset=_HEADER.size)
+    scores = np.frombuffer(body, dtype='<u2', count=n_rows * 5, offset=_HEADER.size + index_bytes)
+
+    return (indices.reshape(n_rows, 5).astype(np.int64),
+            scores.reshape(n_rows, 5) / SCORE_SCALE)
@@ -0,0 +1,194 @@
+"""
+Precompute the top 5 careers for all 5^12 answer vectors
+
+Enumerates the whole answer space in blocks on a pool of worker processes
+and writes model/career_lookup.bin (top 5 class indices as uint8 plus
+percentages as uint16 hundredths, ~3.7 GB), which CareerPredictor serves
+with engine='lookup'. Every finished block is checkpointed, so the build
+can be stopped and resumed:
+
+    python build_lookup_table.py --workers 16
+    python build_lookup_table.py --workers 16 --resume   # after an interruption
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from career_predictor import CareerPredictor
+from career_predictor import SCORE_SCALE
+from dataset import decode_answer_codes
+from lookup_table import N_ANSWER_VECTORS
+from model_artifact import allocate_artifact, open_array, read_header
+
+# Set in each worker process by _init_worker
+_predictor = None
+
+
+def _init_worker(model_path, engine):
+    global _predictor
+    _predictor = CareerPredictor(model_path=model_path, engine=engine, cache_size=0)
+
+
+def _build_block(partial_path, layout, block, block_size, batch_size):
+    """Predict one block of table rows and write it into the partial file"""
+    first = block * block_size
+    last = min(first + block_size, N_ANSWER_VECTORS)
+
+    top5_index = open_array(partial_path, layout['top5_index'])
+    top5_score = open_array(partial_path, layout['top5_score'])
+    for start in range(first, last, batch_size):
+        rows = np.arange(start, min(start + batch_size, last))
+        indices, percentages = _predictor.predict_top5_indices(decode_answer_codes(rows))
+        top5_index[rows[0]:rows[-1] + 1] = indices
+        top5_score[rows[0]:rows[-1] + 1] = np.round(percentages * SCORE_SCALE)
+
+    # The block only counts as done once it is on disk
+    top5_index.flush()
+    top5_score.flush()
+    return block
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_progress(progress_path):
+    if not os.path.exists(progress_path):
+        return None
+    with open(progress_path) as f:
+        return json.load(f)
+
+
+def save_progress(progress_path, progress):
+    """Write the checkpoint atomically"""
+    with open(progress_path + '.tmp', 'w') as f:
+        json.dump(progress, f)
+    os.replace(progress_path + '.tmp', progress_path)
+
+
+def build_lookup_table(output_path, model_path="model/career_model.pkl", engine='auto', workers=None,
+                       block_size=1 << 20, batch_size=16384, resume=False, max_blocks=None):
+    """
+    Build (or continue building) the lookup table
+
+    The table is filled in <output>.partial and renamed to output_path
+    once every block is done.
+
+    Returns:
+        True when the table is complete
+    """
+    workers = workers or os.cpu_count() or 1
+    partial_path = output_path + '.partial'
+    progress_path = output_path + '.progress'
+
+    # Workers load the same model; its file decides whether a checkpoint is reusable
+    probe = CareerPredictor(model_path=model_path, engine=engine, cache_size=0)
+    source_path = {'native': probe.forest_path, 'compact': probe.compact_path}.get(probe.engine, model_path)
+    source = _source_stamp(source_path)
+    classes = [str(c) for c in probe.model.classes_]
+    metadata = probe.metadata or {}
+    del probe
+
+    n_blocks = -(-N_ANSWER_VECTORS // block_size)
+    progress = load_progress(progress_path) if resume else None
+
+    if progress and os.path.exists(partial_path):
+        if progress['source'] != source or progress['block_size'] != block_size:
+            raise SystemExit(f"✗ The model or block size changed since the last run; remove "
+                             f"{partial_path} and {progress_path} to start over")
+        layout = read_header(partial_path)['arrays']
+        print(f"↩️  Resuming with {len(progress['done'])}/{n_blocks} blocks done")
+    else:
+        index_dtype = np.uint8 if len(classes) <= 256 else np.uint16
+        layout = allocate_artifact(partial_path, {
+            'top5_index': (index_dtype, (N_ANSWER_VECTORS, 5)),
+            'top5_score': (np.uint16, (N_ANSWER_VECTORS, 5))
+        }, kind='lookup_table', classes=classes, score_scale=SCORE_SCALE,
+            metadata=metadata, source=source)
+        progress = {'source': source, 'block_size': block_size, 'done': []}
+        save_progress(progress_path, progress)
+
+    done = set(progress['done'])
+    todo = [block for block in range(n_blocks) if block not in done]
+    if max_blocks is not None:
+        todo = todo[:max_blocks]
+
+    started = time.perf_counter()
+    built = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, engine)) as pool:
+        pending = deque()
+
+        def finish_oldest():
+            nonlocal built
+            done.add(pending.popleft().result())
+            built += 1
+            progress['done'] = sorted(done)
+            save_progress(progress_path, progress)
+
+            rate = built * block_size / (time.perf_counter() - started)
+            remaining = (n_blocks - len(done)) * block_size / rate
+            print(f"\r⚙️  {len(done)}/{n_blocks} blocks ({rate:,.0f} rows/s, "
+                  f"~{remaining / 3600:.1f} h left)", end='', flush=True)
+
+        for block in todo:
+            pending.append(pool.submit(_build_block, partial_path, layout, block, block_size, batch_size))
+            if len(pending) >= workers * 2:
+                finish_oldest()
+        while pending:
+            finish_oldest()
+
+    print()
+    if len(done) < n_blocks:
+        return False
+
+    os.replace(partial_path, output_path)
+    os.remove(progress_path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top 5 careers for every answer vector")
+    parser.add_argument('--output', default="model/career_lookup.bin")
+    parser.add_argument('--model', default="model/career_model.pkl",
+                        help="model path (the native artifact next to it is used when present)")
+    parser.add_argument('--engine', default='auto', choices=('auto', 'native', 'compact', 'sklearn'))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--block-size', type=int, default=1 << 20, help="table rows per checkpointed block")
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted build")
+    parser.add_argument('--max-blocks', type=int, default=None,
+                        help="stop after this many blocks (spread the build over several runs)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TOP 5 LOOKUP TABLE BUILDER")
+    print("=" * 60)
+    print(f"\n📋 {N_ANSWER_VECTORS:,} answer vectors")
+
+    started = time.perf_counter()
+    try:
+        complete = build_lookup_table(args.output, model_path=args.model, engine=args.engine,
+                                      workers=args.workers, block_size=args.block_size,
+                                      resume=args.resume, max_blocks=args.max_blocks)
+    except KeyboardInterrupt:
+        print("\n\n⏸️  Interrupted. Run again with --resume to continue.")
+        sys.exit(130)
+
+    print(f"✓ Ran for {time.perf_counter() - started:.1f}s")
+    if complete:
+        print(f"📁 Lookup table: {args.output}")
+        print("💡 Serve it with PREDICTION_ENGINE=lookup")
+    else:
+        print("⏸️  Table not complete yet. Run again with --resume to continue.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Score large survey CSV files with the trained model
+
+Reads Q1..Q12 in chunks, scores each chunk with batched predictions on a
+pool of worker processes and streams the top 5 careers to an output CSV.
+Memory stays flat because only a bounded number of chunks are in flight.
+
+    python bulk_score.py surveys.csv scored.csv --workers 8
+    python bulk_score.py surveys.csv scored.csv --resume   # after an interruption
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from career_predictor import CareerPredictor
+
+QUESTION_COLUMNS = [f"Q{i}" for i in range(1, 13)]
+
+# Set in each worker process by _init_worker
+_predictor = None
+
+
+def _init_worker(model_path, engine):
+    """Load one predictor per worker (the native artifact is memory-mapped and shared)"""
+    global _predictor
+    _predictor = CareerPredictor(model_path=model_path, engine=engine, cache_size=0)
+
+
+def _score_chunk(first_row, answers, ids):
+    """Score one chunk and return it formatted as CSV text"""
+    indices, percentages = _predictor.predict_top5_indices(answers)
+    careers = _predictor.model.classes_[indices]
+
+    output = pd.DataFrame({'row': np.arange(first_row, first_row + len(answers))})
+    if ids is not None:
+        output['id'] = ids
+    for rank in range(5):
+        output[f'Career_{rank + 1}'] = careers[:, rank]
+        output[f'Percentage_{rank + 1}'] = np.round(percentages[:, rank], 2)
+
+    return output.to_csv(index=False, header=False, float_format='%.2f')
+
+
+def output_header(id_column):
+    columns = ['row'] + (['id'] if id_column else [])
+    for rank in range(1, 6):
+        columns += [f'Career_{rank}', f'Percentage_{rank}']
+    return ','.join(columns) + '\n'
+
+
+def _progress_path(output_path):
+    return output_path + '.progress'
+
+
+def load_progress(input_path, output_path):
+    """Return (rows_done, output_bytes) from a previous run, or (0, 0)"""
+    progress_path = _progress_path(output_path)
+    if not os.path.exists(progress_path) or not os.path.exists(output_path):
+        return 0, 0
+
+    with open(progress_path) as f:
+        progress = json.load(f)
+
+    stat = os.stat(input_path)
+    if progress.get('input_size') != stat.st_size or progress.get('input_mtime') != stat.st_mtime:
+        raise SystemExit("✗ Input file changed since the last run; remove the "
+                         f"{progress_path} file to start over")
+
+    return progress['rows_done'], progress['output_bytes']
+
+
+def save_progress(input_path, output_path, rows_done, output_bytes):
+    """Record how far the output is complete (written atomically)"""
+    stat = os.stat(input_path)
+    progress_path = _progress_path(output_path)
+    with open(progress_path + '.tmp', 'w') as f:
+        json.dump({
+            'input': os.path.abspath(input_path),
+            'input_size': stat.st_size,
+            'input_mtime': stat.st_mtime,
+            'rows_done': rows_done,
+            'output_bytes': output_bytes
+        }, f)
+    os.replace(progress_path + '.tmp', progress_path)
+
+
+def iter_chunks(input_path, chunk_size, skip_rows, id_column):
+    """
+    Yield (first_row, answers, ids) chunks from the input CSV
+
+    Rows already scored are skipped chunk by chunk as they are read, so
+    memory stays flat however far a resumed run has got (a skiprows range
+    would be turned into a set of every skipped row number).
+    """
+    columns = QUESTION_COLUMNS + ([id_column] if id_column else [])
+    reader = pd.read_csv(
+        input_path,
+        usecols=columns,
+        dtype={column: np.uint8 for column in QUESTION_COLUMNS},
+        chunksize=chunk_size
+    )
+
+    first_row = 0
+    for chunk in reader:
+        if first_row + len(chunk) <= skip_rows:
+            first_row += len(chunk)
+            continue
+        if first_row < skip_rows:
+            chunk = chunk.iloc[skip_rows - first_row:]
+            first_row = skip_rows
+
+        answers = chunk[QUESTION_COLUMNS].to_numpy()
+        ids = chunk[id_column].to_numpy() if id_column else None
+        yield first_row, answers, ids
+        first_row += len(chunk)
+
+
+def bulk_score(input_path, output_path, model_path="model/career_model.pkl", engine='auto',
+               workers=None, chunk_size=50000, resume=False, id_column=None):
+    """
+    Score every row of input_path into output_path
+
+    Returns:
+        Number of rows scored in this run
+    """
+    workers = workers or os.cpu_count() or 1
+
+    rows_done, output_bytes = load_progress(input_path, output_path) if resume else (0, 0)
+    if rows_done:
+        print(f"↩️  Resuming after {rows_done:,} rows")
+        output = open(output_path, 'r+b')
+        output.truncate(output_bytes)
+        output.seek(output_bytes)
+    else:
+        output = open(output_path, 'wb')
+        output.write(output_header(id_column).encode())
+        output_bytes = output.tell()
+
+    started = time.perf_counter()
+    scored = 0
+    max_in_flight = workers * 2
+
+    with output, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, engine)) as pool:
+        pending = deque()
+
+        def write_oldest():
+            nonlocal rows_done, output_bytes, scored
+            n_rows, future = pending.popleft()
+            output.write(future.result().encode())
+            output.flush()
+            output_bytes = output.tell()
+            rows_done += n_rows
+            scored += n_rows
+            save_progress(input_path, output_path, rows_done, output_bytes)
+
+            elapsed = time.perf_counter() - started
+            print(f"\r⚙️  {rows_done:,} rows scored ({scored / elapsed:,.0f} rows/s)",
+                  end='', flush=True)
+
+        for first_row, answers, ids in iter_chunks(input_path, chunk_size, rows_done, id_column):
+            pending.append((len(answers), pool.submit(_score_chunk, first_row, answers, ids)))
+            if len(pending) >= max_in_flight:
+                write_oldest()
+
+        while pending:
+            write_oldest()
+
+    print()
+    if os.path.exists(_progress_path(output_path)):
+        os.remove(_progress_path(output_path))
+    return scored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a survey CSV (Q1..Q12 columns) in bulk")
+    parser.add_argument('input', help="CSV file with Q1..Q12 columns")
+    parser.add_argument('output', help="CSV file to write top 5 careers to")
+    parser.add_argument('--model', default="model/career_model.pkl",
+                        help="model path (the native artifact next to it is used when present)")
+    parser.add_argument('--engine', default='auto', choices=CareerPredictor.ENGINES)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="rows per chunk")
+    parser.add_argument('--id-column', default=None, help="input column copied to the output as 'id'")
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted run")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BULK CAREER SCORING")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    try:
+        scored = bulk_score(args.input, args.output, model_path=args.model, engine=args.engine,
+                            workers=args.workers, chunk_size=args.chunk_size,
+                            resume=args.resume, id_column=args.id_column)
+    except KeyboardInterrupt:
+        print("\n\n⏸️  Interrupted. Run again with --resume to continue.")
+        sys.exit(130)
+    except ValueError as e:
+        print(f"\n✗ Invalid input: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(f"✓ Scored {scored:,} rows in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"📁 Output file: {args.output}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,67 @@
-import pickle
+import hashlib
+import json
 import numpy as np
 import os
+import threading
+from dataset import encode_answers, encode_answers_batch
+from metrics import REGISTRY
+from prediction_cache import PredictionCache
+
+# Engine modules, pickle and (through unpickling) scikit-learn are imported
+# in load_model, only for the engine actually used, to keep startup fast
+
+
+# Percentages leave the predictor rounded to hundredths; the binary protocol,
+# lookup table and prediction log store them as integers at this scale
+SCORE_SCALE = 100
+
+
+def model_version(classes, metadata):
+    """
+    Short hash identifying a trained model (prediction logs, model/versions/)
+    
+    The same training run gives the same version whichever engine serves it.
+    """
+    fingerprint = json.dumps({'classes': [str(c) for c in classes], 'metadata': metadata},
+                             sort_keys=True, default=str)
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:12]
+
+
+def validate_answers_matrix(answers_matrix):
+    """
+    Validate a batch of survey answers in one vectorized pass
+    
+    Args:
+        answers_matrix: N x 12 array-like of integers (1-5)
+        
+    Returns:
+        numpy array of shape (N, 12)
+        
+    Raises:
+        ValueError: if the shape, type or range of any answer is invalid
+    """
+    try:
+        matrix = np.asarray(answers_matrix)
+    except ValueError:
+        raise ValueError("Each row must contain exactly 12 answers (Q1-Q12)")
+    
+    # Only an empty batch is empty; an empty row is still a wrong-length row
+    if matrix.ndim == 1 and len(matrix) == 0:
+        return matrix.reshape(0, 12).astype(np.int64)
+    
+    if matrix.ndim != 2 or matrix.shape[1] != 12:
+        raise ValueError("Each row must contain exactly 12 answers (Q1-Q12)")
+    
+    if matrix.dtype.kind not in 'iu':
+        raise ValueError("All answers must be integers between 1 and 5")
+    
+    invalid = (matrix < 1) | (matrix > 5)
+    if invalid.any():
+        row = int(np.flatnonzero(invalid.any(axis=1))[0])
+        raise ValueError(f"All answers must be between 1 and 5 (row {row})")
+    
+    return matrix
+
 
 class CareerPredictor:
     """
@@ -9,31 +70,141 @@ class CareerPredictor:
     Usage:
         predictor = CareerPredictor()
         results = predictor.predict_top5([5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3])
+    
+    Engines:
+        'native'  - memory-mapped flat-array forest (forest_engine.py), no
+                    scikit-learn or pickle needed
+        'compact' - the compressed forest from compress_model.py (top classes
+                    per leaf, quantized; slightly lossy, much smaller)
+        'lookup'  - the precomputed top 5 table from build_lookup_table.py;
+                    answers by index, no model in memory
+        'sklearn' - the pickled RandomForestClassifier
+        'auto'    - native when the exported forest exists, else sklearn
+    
+    Tiers:
+        'full' - every prediction comes from the engine above
+        'fast' - the distilled student model (train_model.py --distill)
+                 answers first; rows where its top probability is below
+                 fallback_threshold are re-scored by the full model
     """
     
-    def __init__(self, model_path="model/career_model.pkl"):
+    ENGINES = ('auto', 'native', 'compact', 'lookup', 'sklearn')
+    TIERS = ('full', 'fast')
+    
+    def __init__(self, model_path="model/career_model.pkl", cache_size=10000, cache_policy='lru',
+                 engine='auto', tier='full', fallback_threshold=0.5):
         """Load the trained model"""
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}' (expected one of {self.ENGINES})")
+        if tier not in self.TIERS:
+            raise ValueError(f"Unknown tier '{tier}' (expected one of {self.TIERS})")
+        
         self.model_path = model_path
+        self.forest_path = model_path.replace('career_model.pkl', 'career_forest.bin')
+        self.compact_path = model_path.replace('career_model.pkl', 'career_forest_compact.bin')
+        self.student_path = model_path.replace('career_model.pkl', 'career_student.bin')
+        self.lookup_path = model_path.replace('career_model.pkl', 'career_lookup.bin')
+        self.neighbors_path = model_path.replace('career_model.pkl', 'career_neighbors.bin')
+        self.explainer_path = model_path.replace('career_model.pkl', 'career_explainer.bin')
+        self.requested_engine = engine
+        self.engine = None
         self.model = None
         self.metadata = None
+        self.model_version = None
+        self.class_index = {}
+        self._model_info = None
+        self.tier = tier
+        self.fallback_threshold = float(fallback_threshold)
+        self.student = None
+        self.neighbors = None
+        self.explainer = None
+        self._tier_lock = threading.Lock()
+        self.student_rows = 0
+        self.fallback_rows = 0
+        self.cache = PredictionCache(max_size=cache_size, policy=cache_policy)
         self.load_model()
     
+    @classmethod
+    def from_env(cls, model_path="model/career_model.pkl"):
+        """
+        Build a predictor configured by environment variables
+        
+        PREDICTION_ENGINE, PREDICTION_TIER, PREDICTION_FALLBACK_THRESHOLD,
+        PREDICTION_CACHE_SIZE and PREDICTION_CACHE_POLICY map to the
+        constructor arguments of the same name.
+        """
+        return cls(
+            model_path=model_path,
+            engine=os.environ.get('PREDICTION_ENGINE', 'auto'),
+            tier=os.environ.get('PREDICTION_TIER', 'full'),
+            fallback_threshold=float(os.environ.get('PREDICTION_FALLBACK_THRESHOLD', 0.5)),
+            cache_size=int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+            cache_policy=os.environ.get('PREDICTION_CACHE_POLICY', 'lru')
+        )
+    
     def load_model(self):
         """Load the saved model from disk"""
         try:
-            # Load model
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            # Load model (ForestEngine mirrors the sklearn predict API)
+            use_native = (self.requested_engine == 'native' or
+                          (self.requested_engine == 'auto' and os.path.exists(self.forest_path)))
+            
+            if self.requested_engine == 'compact':
+                from forest_engine import CompactForestEngine, load_compact_forest
+                self.model = CompactForestEngine(load_compact_forest(self.compact_path))
+                self.engine = 'compact'
+            elif self.requested_engine == 'lookup':
+                from lookup_table import load_lookup_table
+                self.model = load_lookup_table(self.lookup_path)
+                self.engine = 'lookup'
+            elif use_native:
+                from forest_engine import ForestEngine, load_forest
+                self.model = ForestEngine(load_forest(self.forest_path))
+                self.engine = 'native'
+            else:
+                import pickle
+                with open(self.model_path, 'rb') as f:
+                    self.model = pickle.load(f)
+                self.engine = 'sklearn'
             
-            # Load metadata
+            # Load metadata (the native artifact carries its own)
             metadata_path = self.model_path.replace('career_model.pkl', 'model_metadata.pkl')
-            if os.path.exists(metadata_path):
+            if self.engine in ('native', 'compact', 'lookup') and self.model.metadata:
+                self.metadata = self.model.metadata
+            elif os.path.exists(metadata_path):
+                import pickle
                 with open(metadata_path, 'rb') as f:
                     self.metadata = pickle.load(f)
             
-            print(f"✓ Model loaded successfully from {self.model_path}")
+            # The fast tier needs a student distilled from this model (the
+            # lookup table is already faster, so it doesn't use one)
+            if self.tier == 'fast' and self.engine != 'lookup':
+                from student_model import load_student
+                student = load_student(self.student_path)
+                if list(student.classes_) != list(self.model.classes_):
+                    raise ValueError(f"{self.student_path} was distilled for different careers")
+                self.student = student
+            
+            # Optional similar-respondent index built by train_model.py
+            self.neighbors = self._load_optional(self.neighbors_path, self._load_neighbors)
+            
+            # Optional path contributions for explain_top5, built by train_model.py
+            self.explainer = self._load_optional(self.explainer_path, self._load_explainer)
+            
+            self.model_version = model_version(self.model.classes_, self.metadata)
+            self.class_index = {str(career): i for i, career in enumerate(self.model.classes_)}
+            
+            # Cached predictions belong to the previous model
+            self.cache.clear()
+            
+            loaded_path = {'native': self.forest_path,
+                           'compact': self.compact_path,
+                           'lookup': self.lookup_path}.get(self.engine, self.model_path)
+            print(f"✓ Model loaded successfully from {loaded_path} ({self.engine} engine)")
             if self.metadata:
                 print(f"✓ Model accuracy: {self.metadata['accuracy']*100:.2f}%")
+            if self.student is not None:
+                print(f"✓ Fast tier: {self.student_path} (fallback below {self.fallback_threshold:.0%})")
         
         except Exception as e:
             raise Exception(f"Error loading model: {e}")
@@ -53,33 +224,239 @@ class CareerPredictor:
                 ...
             ]
         """
-        # Validate input
-        if len(answers) != 12:
-            raise ValueError("Expected 12 answers (Q1-Q12)")
-        
-        if not all(1 <= ans <= 5 for ans in answers):
-            raise ValueError("All answers must be between 1 and 5")
+        # Validate input; non-integer answers would share a cache key with
+        # their truncated value
+        with REGISTRY.stage('validate_answers'):
+            user_input = validate_answers_matrix([answers])
         
-        # Prepare input
-        user_input = np.array(answers).reshape(1, -1)
+        # Repeated answer vectors are served from the cache
+        with REGISTRY.stage('cache_lookup'):
+            cache_key = encode_answers(user_input[0])
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            return [dict(result) for result in cached]
         
-        # Get probabilities for all careers
-        probabilities = self.model.predict_proba(user_input)[0]
+        results = self._build_top5(user_input)[0]
+        self.cache.put(cache_key, results)
         
-        # Get top 5 indices
-        top5_indices = np.argsort(probabilities)[-5:][::-1]
+        return [dict(result) for result in results]
+    
+    def find_similar(self, answers, k=10):
+        """
+        Find the training respondents whose answers are closest to these
         
-        # Build results
-        results = []
-        for i, idx in enumerate(top5_indices):
-            career = self.model.classes_[idx]
-            percentage = probabilities[idx] * 100
+        Args:
+            answers: List of 12 integers (1-5) representing Q1-Q12
+            k: number of (answers, career) groups to return
             
-            results.append({
-                'rank': i + 1,
+        Returns:
+            List of dictionaries, closest first
+            [
+                {'career': 'Software Developer', 'distance': 0.0, 'respondents': 12},
+                {'career': 'Cloud Engineer', 'distance': 1.0, 'respondents': 3},
+                ...
+            ]
+        """
+        if self.neighbors is None:
+            raise RuntimeError(f"No similar-respondent index ({self.neighbors_path}). Run: python train_model.py")
+        
+        with REGISTRY.stage('validate_answers'):
+            user_input = validate_answers_matrix([answers])
+        
+        with REGISTRY.stage('neighbor_search'):
+            distances, careers, counts = self.neighbors.kneighbors(user_input[0], k=k)
+        
+        return [
+            {
                 'career': career,
-                'percentage': round(percentage, 2)
-            })
+                'distance': round(distance, 3),
+                'respondents': count
+            }
+            for career, distance, count in zip(self.neighbors.classes_[careers].tolist(),
+                                               distances.tolist(), counts.tolist())
+        ]
+    
+    def explain_top5(self, answers):
+        """
+        Predict top 5 careers and how much each answer moved each of them
+        
+        Contributions are in percentage points: for every career, baseline
+        plus the 12 contributions adds up to the forest's percentage (with the
+        compact, lookup and fast tier engines, to the full forest's, which the
+        served percentage approximates).
+        
+        Args:
+            answers: List of 12 integers (1-5) representing Q1-Q12
+            
+        Returns:
+            The predict_top5 list, with two more keys per career
+            [
+                {'rank': 1, 'career': 'Software Developer', 'percentage': 45.32,
+                 'baseline': 2.1, 'contributions': {'Q1': 8.4, 'Q2': 11.02, ...}},
+                ...
+            ]
+        """
+        return self.explain_top5_batch([answers])[0]
+    
+    def explain_top5_batch(self, answers_matrix):
+        """
+        explain_top5 for many users at once (one walk down the trees for all rows)
+        
+        Args:
+            answers_matrix: N x 12 array-like of integers (1-5)
+            
+        Returns:
+            List of N result lists, each in the explain_top5 format
+        """
+        if self.explainer is None:
+            raise RuntimeError(f"No explanation data ({self.explainer_path}). Run: python train_model.py")
+        
+        with REGISTRY.stage('validate_answers'):
+            user_input = validate_answers_matrix(answers_matrix)
+        
+        if len(user_input) == 0:
+            return []
+        
+        top5_indices, top5_percentages = self._predict_top5_arrays(user_input)
+        
+        with REGISTRY.stage('explain'):
+            baselines, contributions = self.explainer.explain(user_input, top5_indices)
+        
+        with REGISTRY.stage('build_results'):
+            careers = self.model.classes_[top5_indices]
+            question_ids = [f"Q{i + 1}" for i in range(user_input.shape[1])]
+            
+            results = []
+            for row in zip(careers.tolist(), top5_percentages.tolist(),
+                           (baselines * 100).tolist(), (contributions * 100).round(2).tolist()):
+                results.append([
+                    {
+                        'rank': i + 1,
+                        'career': career,
+                        'percentage': round(percentage, 2),
+                        'baseline': round(baseline, 2),
+                        'contributions': dict(zip(question_ids, career_contributions))
+                    }
+                    for i, (career, percentage, baseline, career_contributions) in enumerate(zip(*row))
+                ])
+        
+        return results
+    
+    def predict_top5_batch(self, answers_matrix, use_cache=False):
+        """
+        Predict top 5 careers for many users at once
+        
+        All rows are scored with a single model call, so this is
+        much faster than calling predict_top5 in a loop.
+        
+        Args:
+            answers_matrix: N x 12 array-like of integers (1-5)
+            use_cache: serve repeated rows from the prediction cache. Off by
+                default so bulk imports don't flush interactive entries.
+            
+        Returns:
+            List of N result lists, each in the predict_top5 format
+        """
+        with REGISTRY.stage('validate_answers'):
+            user_input = validate_answers_matrix(answers_matrix)
+        
+        if len(user_input) == 0:
+            return []
+        
+        if not use_cache:
+            return self._build_top5(user_input)
+        
+        with REGISTRY.stage('cache_lookup'):
+            cache_keys = encode_answers_batch(user_input).tolist()
+            results = [self.cache.get(key) for key in cache_keys]
+            misses = [i for i, cached in enumerate(results) if cached is None]
+        
+        if misses:
+            for i, row_results in zip(misses, self._build_top5(user_input[misses])):
+                self.cache.put(cache_keys[i], row_results)
+                results[i] = row_results
+        
+        return [[dict(result) for result in row_results] for row_results in results]
+    
+    def _predict_proba(self, user_input):
+        """Class probabilities for an N x 12 array, timed as a metrics stage"""
+        if self.student is None:
+            with REGISTRY.stage('predict_proba'):
+                return self.model.predict_proba(user_input)
+        
+        with REGISTRY.stage('student_proba'):
+            probabilities = self.student.predict_proba(user_input)
+            unsure = probabilities.max(axis=1) < self.fallback_threshold
+            n_unsure = int(unsure.sum())
+        
+        with self._tier_lock:
+            self.student_rows += len(user_input) - n_unsure
+            self.fallback_rows += n_unsure
+        
+        if n_unsure:
+            with REGISTRY.stage('predict_proba'):
+                probabilities[unsure] = self.model.predict_proba(user_input[unsure])
+        
+        return probabilities
+    
+    def predict_top5_indices(self, answers_matrix):
+        """
+        Predict top 5 careers for many users as plain arrays
+        
+        Cheaper than predict_top5_batch when the caller doesn't need one dict
+        per career (bulk scoring, binary responses).
+        
+        Args:
+            answers_matrix: N x 12 array-like of integers (1-5)
+            
+        Returns:
+            (indices, percentages): N x 5 arrays, highest first. Career names
+            are self.model.classes_[indices].
+        """
+        with REGISTRY.stage('validate_answers'):
+            user_input = validate_answers_matrix(answers_matrix)
+        
+        if len(user_input) == 0:
+            return np.empty((0, 5), dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+        
+        return self._predict_top5_arrays(user_input)
+    
+    def _predict_top5_arrays(self, user_input):
+        """Top 5 class indices and percentages for a validated N x 12 array"""
+        if self.engine == 'lookup':
+            with REGISTRY.stage('table_lookup'):
+                return self.model.top5(user_input)
+        
+        probabilities = self._predict_proba(user_input)
+        
+        with REGISTRY.stage('rank_top5'):
+            return self._top5_arrays(probabilities)
+    
+    @staticmethod
+    def _top5_arrays(probabilities):
+        """Top 5 class indices and percentages per row, highest first"""
+        top5_indices = np.argsort(probabilities, axis=1)[:, -5:][:, ::-1]
+        top5_percentages = np.take_along_axis(probabilities, top5_indices, axis=1) * 100
+        return top5_indices, top5_percentages
+    
+    def _build_top5(self, user_input):
+        """Predict a validated N x 12 array and build top 5 result lists"""
+        top5_indices, top5_percentages = self._predict_top5_arrays(user_input)
+        
+        with REGISTRY.stage('build_results'):
+            careers = self.model.classes_[top5_indices]
+            
+            # Build results
+            results = []
+            for row_careers, row_percentages in zip(careers.tolist(), top5_percentages.tolist()):
+                results.append([
+                    {
+                        'rank': i + 1,
+                        'career': career,
+                        'percentage': round(percentage, 2)
+                    }
+                    for i, (career, percentage) in enumerate(zip(row_careers, row_percentages))
+                ])
         
         return results
     
@@ -97,16 +474,78 @@ class CareerPredictor:
         prediction = self.model.predict(user_input)[0]
         return prediction
     
+    def _load_optional(self, path, loader):
+        """
+        Load an optional artifact; a missing, stale or unreadable one only
+        disables the feature that uses it
+        
+        Returns:
+            The loaded object, or None
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return loader(path)
+        except Exception as e:
+            print(f"⚠️  Ignoring {path}: {e}")
+            return None
+    
+    def _load_explainer(self, path):
+        from tree_explainer import load_explainer
+        explainer = load_explainer(path)
+        if list(explainer.classes_) != list(self.model.classes_):
+            raise ValueError("built for different careers than the model")
+        return explainer
+    
+    def _load_neighbors(self, path):
+        from neighbor_index import load_neighbor_index
+        neighbors = load_neighbor_index(path)
+        if list(neighbors.classes_) != list(self.model.classes_):
+            raise ValueError("built for different careers than the model")
+        if (len(neighbors.pair_start) != len(neighbors.vector_code) + 1
+                or neighbors.pair_start[-1] != len(neighbors.career)
+                or len(neighbors.count) != len(neighbors.career)
+                or (len(neighbors.career) and int(neighbors.career.max()) >= len(neighbors.classes_))):
+            raise ValueError("inconsistent index arrays")
+        return neighbors
+    
     def get_model_info(self):
-        """Get model information"""
-        if self.metadata:
+        """
+        Get model information
+        
+        Built once per predictor (the model never changes after loading);
+        treat the returned dict as read-only.
+        """
+        if self._model_info is None:
+            if self.metadata:
+                self._model_info = {
+                    'accuracy': f"{self.metadata['accuracy']*100:.2f}%",
+                    'total_careers': self.metadata['n_careers'],
+                    'model_type': self.metadata['model_type'],
+                    'n_estimators': self.metadata.get('n_estimators', 'N/A'),
+                    'model_version': self.model_version,
+                    'engine': self.engine,
+                    'tier': self.tier
+                }
+            else:
+                self._model_info = {'status': 'No metadata available', 'engine': self.engine, 'tier': self.tier}
+        return self._model_info
+    
+    def get_cache_stats(self):
+        """Get prediction cache counters"""
+        return self.cache.stats()
+    
+    def get_tier_stats(self):
+        """Get how many rows the fast tier answered vs. sent to the full model"""
+        with self._tier_lock:
+            total = self.student_rows + self.fallback_rows
             return {
-                'accuracy': f"{self.metadata['accuracy']*100:.2f}%",
-                'total_careers': self.metadata['n_careers'],
-                'model_type': self.metadata['model_type'],
-                'n_estimators': self.metadata.get('n_estimators', 'N/A')
+                'tier': self.tier,
+                'fallback_threshold': self.fallback_threshold,
+                'student_rows': self.student_rows,
+                'fallback_rows': self.fallback_rows,
+                'fallback_rate': round(self.fallback_rows / total, 4) if total else 0.0
             }
-        return {'status': 'No metadata available'}
 
 
 # Example usage and testing
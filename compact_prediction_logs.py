@@ -0,0 +1,192 @@
+"""
+Compact prediction log segments into a training dataset
+
+Reads the segments written by the app's prediction log (PREDICTION_LOG_DIR)
+and writes one row per logged prediction: the 12 answers and the top
+career. The output is a columnar dataset (.bin) or a CSV in the survey
+format, either of which train_model.py reads with --data:
+
+    python compact_prediction_logs.py --log-dir prediction_logs --output logged.columns.bin
+    python compact_prediction_logs.py --min-confidence 60 --output logged.csv
+    python train_model.py --data logged.columns.bin
+
+The career of every row is the model's own top prediction, not a
+confirmed outcome; --min-confidence keeps only the rows the model was
+sure about.
+"""
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+from career_predictor import SCORE_SCALE
+from dataset import QUESTION_COLUMNS, decode_answer_codes
+from model_artifact import write_artifact
+from prediction_log import list_segments, read_segment
+
+
+def collect_rows(paths, min_confidence=0.0, model_versions=None, min_career_rows=2):
+    """
+    Read the top prediction of every logged row
+
+    Args:
+        paths: segment files
+        min_confidence: drop rows whose top score is below this percentage
+        model_versions: only keep rows logged by these model versions
+        min_career_rows: drop careers predicted fewer times than this
+            (train_model.py's stratified split needs at least 2 rows each)
+
+    Returns:
+        (answers, career_codes, careers, confidences, summary): N x 12 uint8
+        answers, N codes into the sorted careers list, N top percentages
+        and a dictionary of counts for the report; summary['complete_segments']
+        lists the paths whose every row is in the output
+    """
+    parts = []
+    summary = {'segments': 0, 'logged_rows': 0, 'kept_rows': 0, 'models': {}}
+    # Segments that lost no rows to a filter; careers dropped below are checked later
+    complete = []
+
+    for path in paths:
+        header, records = read_segment(path)
+        summary['segments'] += 1
+        summary['logged_rows'] += len(records)
+
+        if model_versions and header['model_version'] not in model_versions:
+            if not len(records):
+                complete.append(path)
+            continue
+
+        confidences = records['scores'][:, 0] / header.get('score_scale', SCORE_SCALE)
+        confident = confidences >= min_confidence
+        if confident.all():
+            complete.append(path)
+        records = records[confident]
+        if not len(records):
+            continue
+
+        parts.append((records['answers'], records['careers'][:, 0], np.asarray(header['classes']),
+                      confidences[confident], path))
+        models = summary['models']
+        models[header['model_version']] = models.get(header['model_version'], 0) + len(records)
+
+    if not parts:
+        summary['complete_segments'] = complete
+        return np.empty((0, 12), dtype=np.uint8), np.empty(0, dtype=np.int64), [], np.empty(0), summary
+
+    careers = sorted(set().union(*(classes[np.unique(top)].tolist() for _, top, classes, _, _ in parts)))
+    answer_codes, career_codes, confidences = [], [], []
+    for codes, top, classes, part_confidences, _ in parts:
+        # Each segment's indices point into its own model's career list
+        remap = np.searchsorted(careers, classes)
+        answer_codes.append(codes)
+        career_codes.append(remap[top])
+        confidences.append(part_confidences)
+
+    career_codes = np.concatenate(career_codes)
+    counts = np.bincount(career_codes, minlength=len(careers))
+    keep_careers = counts >= min_career_rows
+    keep_rows = keep_careers[career_codes]
+    summary['dropped_careers'] = int((~keep_careers & (counts > 0)).sum())
+    summary['kept_rows'] = int(keep_rows.sum())
+
+    # A segment with a row of a dropped career was not fully compacted
+    part_ends = np.cumsum([len(part[0]) for part in parts])
+    partial = {parts[i][4] for i in np.unique(np.searchsorted(part_ends, np.flatnonzero(~keep_rows), side='right'))}
+    summary['complete_segments'] = [path for path in complete if path not in partial]
+
+    new_codes = np.cumsum(keep_careers) - 1
+    return (decode_answer_codes(np.concatenate(answer_codes)[keep_rows]), new_codes[career_codes[keep_rows]],
+            [career for career, keep in zip(careers, keep_careers) if keep],
+            np.concatenate(confidences)[keep_rows], summary)
+
+
+def write_columnar(path, answers, career_codes, careers, summary):
+    """Write a standalone columnar dataset (dataset.read_columnar format)"""
+    arrays = {column: answers[:, i] for i, column in enumerate(QUESTION_COLUMNS)}
+    arrays['Career'] = career_codes.astype(np.uint8 if len(careers) <= 256 else np.uint16)
+    write_artifact(path, arrays,
+                   kind='dataset',
+                   careers=careers,
+                   prediction_log=summary)
+
+
+def write_csv(path, answers, career_codes, careers, confidences, chunk_rows=100_000):
+    """Write the survey CSV format plus a Confidence column (ignored by train_model.py)"""
+    names = np.asarray(careers, dtype=object)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(QUESTION_COLUMNS + ['Career', 'Confidence'])
+        for start in range(0, len(answers), chunk_rows):
+            stop = start + chunk_rows
+            writer.writerows(zip(*answers[start:stop].T.tolist(),
+                                 names[career_codes[start:stop]].tolist(),
+                                 np.round(confidences[start:stop], 2).tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact prediction log segments into a training dataset")
+    parser.add_argument('--log-dir', default=os.environ.get('PREDICTION_LOG_DIR', 'prediction_logs'),
+                        help="segment directory (default: $PREDICTION_LOG_DIR or prediction_logs)")
+    parser.add_argument('--output', default='logged_predictions.columns.bin',
+                        help="output dataset; a .csv path writes the survey CSV format")
+    parser.add_argument('--include-open', action='store_true',
+                        help="also read segments still being written (or left open by a crash)")
+    parser.add_argument('--min-confidence', type=float, default=0.0,
+                        help="minimum top-career percentage for a row to be kept")
+    parser.add_argument('--min-career-rows', type=int, default=2,
+                        help="drop careers predicted fewer times than this")
+    parser.add_argument('--model-version', action='append', default=None,
+                        help="only keep rows from this model version (repeatable)")
+    parser.add_argument('--remove', action='store_true',
+                        help="delete the segments whose rows were all written to the dataset")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗃️  PREDICTION LOG COMPACTION")
+    print("=" * 60)
+
+    paths = list_segments(args.log_dir, include_open=args.include_open)
+    if not paths:
+        print(f"✗ No segments in {args.log_dir}")
+        exit(1)
+
+    start = time.perf_counter()
+    answers, career_codes, careers, confidences, summary = collect_rows(
+        paths, args.min_confidence, args.model_version, args.min_career_rows)
+    complete = summary.pop('complete_segments')
+    print(f"✓ Read {summary['logged_rows']} rows from {summary['segments']} segments "
+          f"in {time.perf_counter() - start:.2f}s")
+    for version, rows in sorted(summary['models'].items()):
+        print(f"  model {version}: {rows} rows")
+    if summary.get('dropped_careers'):
+        print(f"  dropped {summary['dropped_careers']} careers with fewer than {args.min_career_rows} rows")
+
+    if not len(answers):
+        print("✗ No rows left after filtering")
+        exit(1)
+
+    if args.output.endswith('.csv'):
+        write_csv(args.output, answers, career_codes, careers, confidences)
+    else:
+        write_columnar(args.output, answers, career_codes, careers, summary)
+    print(f"✓ {len(answers)} rows, {len(careers)} careers written to {args.output}")
+
+    if args.remove:
+        # Segments that lost rows to a filter are kept, so nothing is deleted uncompacted;
+        # open segments may still be written
+        completed = [path for path in paths if path.endswith('.seg')]
+        removable = [path for path in complete if path.endswith('.seg')]
+        for path in removable:
+            os.remove(path)
+        print(f"✓ Removed {len(removable)} compacted segments")
+        if len(removable) < len(completed):
+            print(f"  kept {len(completed) - len(removable)} segments with rows left out by the filters")
+
+    print(f"\n💡 Train on it with: python train_model.py --data {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compress the trained forest and report how much predictions change
+
+Keeps each leaf's top classes with quantized probabilities, collapses
+redundant nodes and writes model/career_forest_compact.bin, which
+CareerPredictor loads with engine='compact':
+
+    python compress_model.py
+    python compress_model.py --top-k 6 --dtype float16
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from dataset import load_dataset
+from forest_engine import (CompactForestEngine, ForestEngine, compress_forest, load_compact_forest,
+                           load_forest, save_compact_forest)
+
+
+def validation_rows(data_path, n_random, seed=42):
+    """Survey rows from the dataset plus uniformly random answer vectors"""
+    answers, _, _ = load_dataset(data_path)
+    random_answers = np.random.default_rng(seed).integers(1, 6, size=(n_random, 12), dtype=np.uint8)
+    return np.concatenate([answers, random_answers])
+
+
+def compare_top5(reference, candidate):
+    """
+    Compare the top 5 rankings and percentages of two probability matrices
+
+    Returns:
+        Dictionary of agreement rates and percentage differences
+    """
+    ref_top5 = np.argsort(reference, axis=1)[:, -5:][:, ::-1]
+    cand_top5 = np.argsort(candidate, axis=1)[:, -5:][:, ::-1]
+
+    # Percentage error for the reference's top 5 careers, whatever rank the
+    # candidate gives them
+    diff = np.abs(np.take_along_axis(reference, ref_top5, axis=1) -
+                  np.take_along_axis(candidate, ref_top5, axis=1)) * 100
+
+    return {
+        'rows': int(len(reference)),
+        'top1_agreement': float((ref_top5[:, 0] == cand_top5[:, 0]).mean()),
+        'top5_same_order': float((ref_top5 == cand_top5).all(axis=1).mean()),
+        'top5_same_set': float((np.sort(ref_top5, axis=1) == np.sort(cand_top5, axis=1)).all(axis=1).mean()),
+        'percentage_diff_mean': float(diff.mean()),
+        'percentage_diff_max': float(diff.max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress the trained forest into a compact artifact")
+    parser.add_argument('--forest', default="model/career_forest.bin", help="native forest to compress")
+    parser.add_argument('--output', default="model/career_forest_compact.bin")
+    parser.add_argument('--top-k', type=int, default=4, help="classes kept per leaf")
+    parser.add_argument('--dtype', choices=('uint8', 'float16'), default='uint8',
+                        help="storage type of the kept leaf probabilities")
+    parser.add_argument('--data', default="career_dataset.csv", help="dataset rows used for validation")
+    parser.add_argument('--random-rows', type=int, default=20000,
+                        help="random answer vectors added to the validation rows")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FOREST COMPRESSION")
+    print("=" * 60)
+
+    if not os.path.exists(args.forest):
+        print(f"✗ {args.forest} not found. Run: python train_model.py")
+        exit(1)
+
+    arrays = load_forest(args.forest)
+
+    print(f"\n🗜️  Compressing (top {args.top_k} classes per leaf, {args.dtype})...")
+    start = time.perf_counter()
+    compact = compress_forest(arrays, top_k=args.top_k, value_dtype=args.dtype)
+    print(f"✓ Compressed in {time.perf_counter() - start:.1f}s")
+
+    print("\n🧪 Validating against the uncompressed forest...")
+    X = validation_rows(args.data, args.random_rows)
+    reference = ForestEngine(arrays).predict_proba(X)
+    candidate = CompactForestEngine(compact).predict_proba(X)
+    report = compare_top5(reference, candidate)
+
+    report.update({
+        'top_k': args.top_k,
+        'dtype': args.dtype,
+        'nodes': [int(len(arrays['feature'])), int(len(compact['feature']))],
+        'leaves': [int(len(arrays['leaf_value'])), int(len(compact['leaf_value']))],
+        'max_depth': [int(arrays['max_depth']), int(compact['max_depth'])]
+    })
+
+    save_compact_forest(compact, args.output, metadata=arrays['metadata'], validation=report)
+
+    # Load both files the way the app does
+    timings = []
+    for path, load, engine in ((args.forest, load_forest, ForestEngine),
+                               (args.output, load_compact_forest, CompactForestEngine)):
+        start = time.perf_counter()
+        engine(load(path))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    original_size = os.path.getsize(args.forest)
+    compact_size = os.path.getsize(args.output)
+
+    print("\n📋 Compression report:")
+    print(f"  {'':<20}{'Original':>14}{'Compact':>14}")
+    print(f"  {'File size':<20}{original_size / 1024 / 1024:>12.1f}MB{compact_size / 1024 / 1024:>12.1f}MB")
+    print(f"  {'Nodes':<20}{report['nodes'][0]:>14,}{report['nodes'][1]:>14,}")
+    print(f"  {'Leaf distributions':<20}{report['leaves'][0]:>14,}{report['leaves'][1]:>14,}")
+    print(f"  {'Max depth':<20}{report['max_depth'][0]:>14}{report['max_depth'][1]:>14}")
+    print(f"  {'Load time':<20}{timings[0]:>12.1f}ms{timings[1]:>12.1f}ms")
+    print(f"\n  Validated on {report['rows']:,} answer vectors:")
+    print(f"  Top-1 agreement:        {report['top1_agreement'] * 100:.2f}%")
+    print(f"  Top-5 same order:       {report['top5_same_order'] * 100:.2f}%")
+    print(f"  Top-5 same careers:     {report['top5_same_set'] * 100:.2f}%")
+    print(f"  Percentage difference:  mean {report['percentage_diff_mean']:.3f}, "
+          f"max {report['percentage_diff_max']:.3f} points")
+
+    print(f"\n✓ {original_size / compact_size:.1f}x smaller")
+    print(f"📁 Compact forest: {args.output}")
+    print("💡 Serve it with PREDICTION_ENGINE=compact")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
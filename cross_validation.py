@@ -0,0 +1,268 @@
+"""
+Stratified k-fold cross-validation of the career forest
+
+Folds are fitted in parallel (one process per fold), each with the same
+hyperparameters train_model.py uses, then scored one at a time with the
+native engine: top-1 and top-5 accuracy, recall per career, and single-row
+and batch inference latency.
+
+Fold assignments and fitted fold forests are cached under
+cv_cache/<dataset fingerprint>/, so a repeated run on unchanged data only
+refits what changed (e.g. a new forest size) and otherwise just rescores:
+
+    python cross_validation.py --folds 5
+    python cross_validation.py --data big_dataset.columns.bin --folds 10 --dedup
+    python train_model.py --cv-folds 5      # also stores the summary in the model metadata
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset import collapse_duplicates, load_dataset
+from forest_engine import ForestEngine, export_forest, load_forest, save_forest
+from model_artifact import read_artifact, write_artifact
+from train_model import config_name, fit_forest, top5_hit_rate
+
+# Set in each worker process by _init_worker
+_cv_data = None
+
+
+def dataset_fingerprint(X, y):
+    """Hash of the answers and labels; cached folds and models are keyed by it"""
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fold_assignments(y, n_folds, seed, cache_dir):
+    """
+    Stratified fold number of every row, from the cache when possible
+
+    Returns:
+        (folds, cached): N fold numbers (uint8), and whether they were cached
+    """
+    path = os.path.join(cache_dir, f"folds-k{n_folds}-s{seed}.bin")
+    if os.path.exists(path):
+        header, arrays = read_artifact(path)
+        if header.get('kind') == 'cv_folds' and len(arrays['fold']) == len(y):
+            return np.array(arrays['fold']), True
+
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = np.empty(len(y), dtype=np.uint8)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for fold, (_, test_index) in enumerate(splitter.split(np.zeros((len(y), 1)), y)):
+        folds[test_index] = fold
+
+    write_artifact(path, {'fold': folds}, kind='cv_folds', n_folds=n_folds, seed=seed)
+    return folds, False
+
+
+def fold_model_path(cache_dir, n_folds, seed, fold, n_estimators, max_depth, dedup):
+    name = config_name(n_estimators, max_depth) + ('_dedup' if dedup else '')
+    return os.path.join(cache_dir, f"k{n_folds}-s{seed}", f"fold{fold}-{name}.bin")
+
+
+def _init_worker(data):
+    global _cv_data
+    _cv_data = data
+
+
+def _fit_fold(fold, path, n_estimators, max_depth, dedup):
+    """Fit the forest for one fold in a worker process and cache it as a native forest"""
+    X, y, folds = _cv_data['X'], _cv_data['y'], _cv_data['folds']
+    train = folds != fold
+
+    if dedup:
+        X_fit, y_fit, sample_weight = collapse_duplicates(X[train], y[train])
+    else:
+        X_fit, y_fit, sample_weight = X[train], y[train], None
+
+    model, fit_seconds = fit_forest(X_fit, y_fit, sample_weight=sample_weight,
+                                    n_estimators=n_estimators, max_depth=max_depth, n_jobs=1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    save_forest(export_forest(model), path, metadata={'fold': fold, 'fit_seconds': fit_seconds})
+    return fit_seconds
+
+
+def score_fold(engine, X_test, y_test, n_careers, latency_rows=200):
+    """
+    Accuracy, per-career recall and latency of one fold's forest
+
+    Args:
+        engine: ForestEngine fitted on the other folds (classes are career codes)
+        X_test, y_test: the fold's rows and career codes
+        n_careers: length of the career list the codes index into
+    """
+    start = time.perf_counter()
+    probabilities = engine.predict_proba(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    # A fold's forest only knows the careers in its training rows; the rest count as misses
+    lookup = np.full(n_careers, -1)
+    lookup[engine.classes_.astype(np.int64)] = np.arange(len(engine.classes_))
+    y_codes = lookup[y_test]
+    hits = probabilities.argmax(axis=1) == y_codes
+
+    support = np.bincount(y_test, minlength=n_careers)
+    correct = np.bincount(y_test[hits], minlength=n_careers)
+
+    latencies = []
+    for row in X_test[np.arange(latency_rows) % len(X_test)]:
+        start = time.perf_counter()
+        engine.predict_proba(row[None, :])
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'rows': len(X_test),
+        'top1_accuracy': float(hits.mean()),
+        'top5_accuracy': top5_hit_rate(probabilities, y_codes),
+        'single_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'single_p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'batch_rows_per_s': float(len(X_test) / batch_seconds),
+        'support': support,
+        'correct': correct
+    }
+
+
+def cross_validate(X, y, careers, n_folds=5, n_estimators=200, max_depth=20, dedup=False,
+                   seed=42, workers=None, cache_dir="cv_cache", log=print):
+    """
+    Run stratified k-fold cross-validation
+
+    Args:
+        X, y: answers and career codes (dataset.load_dataset)
+        careers: career names the codes index into
+        workers: parallel fold fits (default: all cores, at most n_folds)
+        log: progress callback (print by default)
+
+    Returns:
+        JSON-serializable summary (see summarize)
+    """
+    cache_dir = os.path.join(cache_dir, dataset_fingerprint(X, y))
+    os.makedirs(cache_dir, exist_ok=True)
+    folds, folds_cached = fold_assignments(y, n_folds, seed, cache_dir)
+
+    paths = [fold_model_path(cache_dir, n_folds, seed, fold, n_estimators, max_depth, dedup)
+             for fold in range(n_folds)]
+    missing = [fold for fold in range(n_folds) if not os.path.exists(paths[fold])]
+    log(f"✓ Folds {'loaded from cache' if folds_cached else 'computed'}; "
+        f"{n_folds - len(missing)}/{n_folds} fold models cached")
+
+    fit_seconds = {}
+    if missing:
+        workers = min(workers or os.cpu_count() or 1, len(missing))
+        log(f"🔄 Fitting {len(missing)} fold models on {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=({'X': X, 'y': y, 'folds': folds},)) as pool:
+            futures = {fold: pool.submit(_fit_fold, fold, paths[fold], n_estimators, max_depth, dedup)
+                       for fold in missing}
+            for fold, future in futures.items():
+                fit_seconds[fold] = future.result()
+                log(f"✓ Fold {fold + 1}/{n_folds} fitted in {fit_seconds[fold]:.1f}s")
+
+    # Scored one fold at a time so latencies don't compete for CPU
+    results = []
+    for fold in range(n_folds):
+        arrays = load_forest(paths[fold])
+        test = folds == fold
+        result = score_fold(ForestEngine(arrays), X[test], y[test], len(careers))
+        result.update(fold=fold, cached=fold not in fit_seconds,
+                      fit_seconds=fit_seconds.get(fold, arrays['metadata'].get('fit_seconds')))
+        results.append(result)
+        log(f"  fold {fold + 1}: top-1 {result['top1_accuracy'] * 100:.2f}%, "
+            f"top-5 {result['top5_accuracy'] * 100:.2f}%, p50 {result['single_p50_ms']:.2f} ms")
+
+    return summarize(results, careers, n_folds=n_folds, seed=seed, rows=len(X),
+                     n_estimators=n_estimators, max_depth=max_depth, dedup=dedup)
+
+
+def summarize(results, careers, **settings):
+    """
+    Combine per-fold results
+
+    Returns:
+        Dictionary with the settings, mean/std of every metric, recall per
+        career (pooled over folds, like one prediction per row), and the
+        per-fold numbers
+    """
+    def mean_std(key):
+        values = [result[key] for result in results]
+        return {'mean': float(np.mean(values)), 'std': float(np.std(values))}
+
+    support = np.sum([result['support'] for result in results], axis=0)
+    correct = np.sum([result['correct'] for result in results], axis=0)
+    recall = {str(career): round(float(c / s), 4)
+              for career, c, s in zip(careers, correct, support) if s}
+
+    per_fold = [{key: value for key, value in result.items() if key not in ('support', 'correct')}
+                for result in results]
+    return dict(settings,
+                top1_accuracy=mean_std('top1_accuracy'),
+                top5_accuracy=mean_std('top5_accuracy'),
+                single_p50_ms=mean_std('single_p50_ms'),
+                single_p99_ms=mean_std('single_p99_ms'),
+                batch_rows_per_s=mean_std('batch_rows_per_s'),
+                per_career_recall=recall,
+                per_fold=per_fold)
+
+
+def print_summary(summary, worst=10):
+    print(f"\n📋 {summary['n_folds']}-fold cross-validation ({summary['rows']} rows):")
+    for key, label, scale, unit in (('top1_accuracy', 'Top-1 accuracy', 100, '%'),
+                                    ('top5_accuracy', 'Top-5 accuracy', 100, '%'),
+                                    ('single_p50_ms', 'Single-row p50', 1, ' ms'),
+                                    ('single_p99_ms', 'Single-row p99', 1, ' ms'),
+                                    ('batch_rows_per_s', 'Batch rows/s', 1, '')):
+        stats = summary[key]
+        print(f"  {label:<16}{stats['mean'] * scale:>12,.2f}{unit} ± {stats['std'] * scale:,.2f}")
+
+    recall = sorted(summary['per_career_recall'].items(), key=lambda item: item[1])
+    print(f"\n  Lowest recall ({worst} of {len(recall)} careers):")
+    for career, value in recall[:worst]:
+        print(f"    {career:<40}{value * 100:>7.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate the career forest")
+    parser.add_argument('--data', default="career_dataset.csv")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--max-depth', type=lambda text: None if text.lower() == 'none' else int(text), default=20)
+    parser.add_argument('--dedup', action='store_true',
+                        help="fit each fold on unique rows weighted by their counts")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="folds fitted in parallel (default: all cores)")
+    parser.add_argument('--cache-dir', default="cv_cache")
+    parser.add_argument('--output', default=None, help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧪 CROSS-VALIDATION")
+    print("=" * 60)
+
+    X, y, careers = load_dataset(args.data)
+    print(f"✓ Dataset loaded: {len(X)} rows, {len(careers)} careers")
+
+    start = time.perf_counter()
+    summary = cross_validate(X, y, careers, n_folds=args.folds, n_estimators=args.n_estimators,
+                             max_depth=args.max_depth, dedup=args.dedup, seed=args.seed,
+                             workers=args.workers, cache_dir=args.cache_dir)
+    print(f"✓ Done in {time.perf_counter() - start:.1f}s")
+    print_summary(summary)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📁 Summary: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+
+from model_artifact import read_artifact, write_artifact
+
+QUESTION_COLUMNS = [f"Q{i}" for i in range(1, 13)]
+N_QUESTIONS = len(QUESTION_COLUMNS)
+N_ANSWERS = 5  # answers are 1-5
+
+# Place value of each question in the base-5 answer code (Q1 first), so every
+# answer vector maps to a unique code in range(5 ** 12). Prediction cache keys,
+# lookup table rows, neighbor index keys and prediction log records all use it.
+ANSWER_PLACE_VALUES = N_ANSWERS ** np.arange(N_QUESTIONS - 1, -1, -1, dtype=np.int64)
+
+
+def encode_answers(answers):
+    """Pack 12 answers (1-5) into one base-5 integer (plain Python, for single rows)"""
+    code = 0
+    for ans in answers:
+        code = code * N_ANSWERS + (int(ans) - 1)
+    return code
+
+
+def encode_answers_batch(answers_matrix):
+    """Vectorized encode_answers for an N x 12 array"""
+    return (np.asarray(answers_matrix, dtype=np.int64) - 1) @ ANSWER_PLACE_VALUES
+
+
+def decode_answer_codes(codes):
+    """Answer vectors (N x 12, uint8) for an array of answer codes"""
+    return (np.asarray(codes, dtype=np.int64)[:, None] // ANSWER_PLACE_VALUES % N_ANSWERS + 1).astype(np.uint8)
+
+
+def columnar_cache_path(csv_path):
+    """Binary columnar cache that sits next to the CSV"""
+    return os.path.splitext(csv_path)[0] + '.columns.bin'
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_dataset_csv(csv_path):
+    """
+    Parse the survey CSV with compact dtypes
+
+    Answers are read as uint8 and careers as a categorical, so the whole
+    dataset costs about 13 bytes per row instead of ~100.
+
+    Returns:
+        (answers, career_codes, careers): N x 12 uint8 array, N integer
+        codes, and the sorted list of career names the codes index into
+    """
+    # pandas is only needed to parse CSVs, not to read the columnar cache
+    import pandas as pd
+
+    df = pd.read_csv(
+        csv_path,
+        usecols=QUESTION_COLUMNS + ['Career'],
+        dtype={**{column: np.uint8 for column in QUESTION_COLUMNS}, 'Career': 'category'}
+    )
+
+    career = df['Career'].cat.as_ordered()
+    careers = [str(name) for name in career.cat.categories]
+    answers = df[QUESTION_COLUMNS].to_numpy(dtype=np.uint8)
+    return answers, career.cat.codes.to_numpy(), careers
+
+
+def write_columnar_cache(csv_path, answers, career_codes, careers):
+    """Store the parsed dataset as one uint8 array per column"""
+    arrays = {column: answers[:, i] for i, column in enumerate(QUESTION_COLUMNS)}
+    arrays['Career'] = career_codes
+    write_artifact(columnar_cache_path(csv_path), arrays,
+                   kind='dataset',
+                   careers=careers,
+                   source=_source_stamp(csv_path))
+
+
+def read_columnar(path):
+    """
+    Load a standalone columnar dataset file (e.g. from the dataset generator)
+
+    Returns:
+        Same tuple as read_dataset_csv
+    """
+    header, arrays = read_artifact(path)
+    if header.get('kind') != 'dataset':
+        raise ValueError(f"{path} is not a columnar dataset")
+
+    answers = np.column_stack([arrays[column] for column in QUESTION_COLUMNS])
+    return answers, np.array(arrays['Career']), header['careers']
+
+
+def read_columnar_cache(csv_path):
+    """
+    Load the columnar cache if it is still in sync with the CSV
+
+    Returns:
+        Same tuple as read_dataset_csv, or None when the cache is missing
+        or was built from a different version of the CSV
+    """
+    cache_path = columnar_cache_path(csv_path)
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        header, arrays = read_artifact(cache_path)
+    except ValueError:
+        return None
+
+    if header.get('kind') != 'dataset' or header.get('source') != _source_stamp(csv_path):
+        return None
+
+    answers = np.column_stack([arrays[column] for column in QUESTION_COLUMNS])
+    return answers, np.array(arrays['Career']), header['careers']
+
+
+def load_dataset(csv_path="career_dataset.csv", use_cache=True):
+    """
+    Load the survey dataset, going through the columnar cache when possible
+
+    The cache is rebuilt automatically whenever the CSV's size or
+    modification time changes. A path ending in .bin is read as a
+    standalone columnar file.
+
+    Returns:
+        (answers, career_codes, careers) as described in read_dataset_csv
+    """
+    if csv_path.endswith('.bin'):
+        return read_columnar(csv_path)
+
+    if use_cache:
+        cached = read_columnar_cache(csv_path)
+        if cached is not None:
+            return cached
+
+    answers, career_codes, careers = read_dataset_csv(csv_path)
+
+    if use_cache:
+        write_columnar_cache(csv_path, answers, career_codes, careers)
+
+    return answers, career_codes, careers
+
+
+def collapse_duplicates(answers, career_codes):
+    """
+    Collapse exact duplicate (answers, career) rows into unique rows with counts
+
+    Each row packs into one integer (base-5 answers times the number of
+    careers plus the career code), so a single np.unique finds duplicates.
+
+    Returns:
+        (answers, career_codes, counts) for the unique rows, in key order
+    """
+    n_careers = int(career_codes.max()) + 1 if len(career_codes) else 1
+
+    keys = encode_answers_batch(answers) * n_careers + career_codes.astype(np.int64)
+    unique_keys, counts = np.unique(keys, return_counts=True)
+
+    unique_codes = unique_keys % n_careers
+    unique_answers = decode_answer_codes(unique_keys // n_careers)
+    return unique_answers, unique_codes.astype(career_codes.dtype), counts
@@ -0,0 +1,422 @@
+import numpy as np
+
+from model_artifact import read_artifact, write_artifact
+
+# Keep the (rows x trees x careers) gather used by predict_proba around this
+# many elements so large batches don't allocate gigabytes at once
+_GATHER_BUDGET = 4_000_000
+
+
+def export_forest(model):
+    """
+    Flatten a fitted RandomForestClassifier into plain NumPy arrays
+
+    Every tree is appended to one node table. Children are stored as
+    interleaved (right, left) pairs so the next node is
+    children[2 * node + go_left]. Leaves point to themselves, which lets
+    ForestEngine walk all trees for a fixed number of steps without
+    checking for leaves.
+
+    Args:
+        model: fitted sklearn RandomForestClassifier
+
+    Returns:
+        Dictionary of arrays accepted by ForestEngine
+    """
+    n_classes = len(model.classes_)
+
+    features, thresholds, children, leaf_ids, values, roots = [], [], [], [], [], []
+    node_offset = 0
+    leaf_offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(n_nodes)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        left = np.where(is_leaf, node_ids, tree.children_left) + node_offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + node_offset
+        children.append(np.stack([right, left], axis=1).ravel())
+
+        # Only leaves need a class distribution
+        tree_leaf_ids = np.full(n_nodes, -1, dtype=np.int64)
+        tree_leaf_ids[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+        leaf_ids.append(tree_leaf_ids)
+
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        leaf_values = tree.value[is_leaf, 0, :n_classes].astype(np.float64)
+        normalizer = leaf_values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(leaf_values / normalizer)
+
+        roots.append(node_offset)
+        node_offset += n_nodes
+        leaf_offset += int(is_leaf.sum())
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'children': np.concatenate(children).astype(np.int32),
+        'leaf_id': np.concatenate(leaf_ids).astype(np.int32),
+        'leaf_value': np.concatenate(values),
+        'root': np.array(roots, dtype=np.int32),
+        'max_depth': np.array(max_depth, dtype=np.int32),
+        'classes': np.asarray(model.classes_).astype(str)
+    }
+
+
+def save_forest(arrays, path, metadata=None):
+    """
+    Save exported forest arrays as a memory-mappable artifact
+
+    Classes, max depth and metadata go into the JSON header; everything
+    else is stored as raw arrays (see model_artifact.py).
+    """
+    arrays = dict(arrays)
+    classes = [str(c) for c in arrays.pop('classes')]
+    max_depth = int(arrays.pop('max_depth'))
+
+    write_artifact(path, arrays,
+                   kind='random_forest',
+                   classes=classes,
+                   max_depth=max_depth,
+                   metadata=metadata or {})
+
+
+def load_forest(path):
+    """Memory-map forest arrays saved by save_forest"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'random_forest':
+        raise ValueError(f"{path} does not contain a random forest")
+
+    arrays['classes'] = np.array(header['classes'])
+    arrays['max_depth'] = header['max_depth']
+    arrays['metadata'] = header.get('metadata', {})
+    return arrays
+
+
+class ForestEngine:
+    """
+    Vectorized random forest inference over flat arrays
+
+    Produces the same probabilities as RandomForestClassifier.predict_proba
+    without importing scikit-learn.
+
+    Usage:
+        engine = ForestEngine(load_forest("model/career_forest.bin"))
+        probabilities = engine.predict_proba([[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]])
+    """
+
+    def __init__(self, arrays):
+        """Wrap exported forest arrays"""
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children = arrays['children']
+        self.leaf_id = arrays['leaf_id']
+        self.leaf_value = arrays['leaf_value']
+        self.root = arrays['root']
+        self.max_depth = int(arrays['max_depth'])
+        self.classes_ = np.asarray(arrays['classes'], dtype=object)
+        self.metadata = arrays.get('metadata', {})
+        self.n_estimators = len(self.root)
+
+    def apply(self, X):
+        """
+        Find the leaf reached in every tree
+
+        Args:
+            X: N x n_features array
+
+        Returns:
+            N x n_estimators array of node indices
+        """
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        flat_X = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.root, (len(X), self.n_estimators))
+
+        for _ in range(self.max_depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+
+        return nodes
+
+    def predict_proba(self, X):
+        """Average the leaf class distributions of all trees"""
+        X = np.asarray(X)
+        n_classes = self.leaf_value.shape[1]
+        probabilities = np.empty((len(X), n_classes), dtype=np.float64)
+
+        chunk = max(1, _GATHER_BUDGET // (self.n_estimators * n_classes))
+        for start in range(0, len(X), chunk):
+            leaves = self.leaf_id[self.apply(X[start:start + chunk])]
+            probabilities[start:start + chunk] = self.leaf_value[leaves].sum(axis=1)
+
+        return probabilities / self.n_estimators
+
+    def predict(self, X):
+        """Predict the most likely class for every row"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def take_trees(arrays, first_tree=0):
+    """
+    The node table of trees first_tree onwards, renumbered from node 0
+
+    Returns:
+        (node_start, structure): the first kept node in the original table,
+        and feature/threshold/children/root arrays for the kept trees
+    """
+    root = np.asarray(arrays['root'], dtype=np.int64)
+    n_nodes = len(arrays['feature'])
+    node_start = int(root[first_tree]) if first_tree < len(root) else n_nodes
+
+    return node_start, {
+        'feature': np.asarray(arrays['feature'][node_start:]),
+        'threshold': np.asarray(arrays['threshold'][node_start:]),
+        'children': np.asarray(arrays['children'][2 * node_start:], dtype=np.int64) - node_start,
+        'root': root[first_tree:] - node_start
+    }
+
+
+def join_trees(structures):
+    """Concatenate take_trees structures into one node table"""
+    offsets = np.cumsum([0] + [len(structure['feature']) for structure in structures])
+    return {
+        'feature': np.concatenate([structure['feature'] for structure in structures]).astype(np.int32),
+        'threshold': np.concatenate([structure['threshold'] for structure in structures]).astype(np.float64),
+        'children': np.concatenate([structure['children'] + offset
+                                    for structure, offset in zip(structures, offsets)]).astype(np.int32),
+        'root': np.concatenate([structure['root'] + offset
+                                for structure, offset in zip(structures, offsets)]).astype(np.int32)
+    }
+
+
+def spread_classes(values, classes, all_classes):
+    """Move per-class columns into the column order of a larger sorted class list"""
+    spread = np.zeros((len(values), len(all_classes)), dtype=values.dtype)
+    spread[:, np.searchsorted(all_classes, np.asarray(classes).astype(str))] = values
+    return spread
+
+
+def merge_forests(base, extra, drop_oldest=0):
+    """
+    Append the trees of one exported forest to another
+
+    Used for incremental training: extra holds trees fitted on new data
+    only, and dropping the oldest base trees keeps a rolling window. The
+    two forests may know different careers; the result covers both, and a
+    tree gives probability 0 to careers it never saw.
+
+    Args:
+        base: arrays from export_forest or load_forest
+        extra: arrays from export_forest
+        drop_oldest: number of base trees to leave out
+
+    Returns:
+        Dictionary of arrays accepted by ForestEngine
+    """
+    classes = np.union1d(np.asarray(base['classes']).astype(str), np.asarray(extra['classes']).astype(str))
+    structures, leaf_ids, leaf_values = [], [], []
+    leaf_offset = 0
+
+    for arrays, first_tree in ((base, drop_oldest), (extra, 0)):
+        node_start, structure = take_trees(arrays, first_tree)
+        leaf_id = np.asarray(arrays['leaf_id'][node_start:], dtype=np.int64)
+        # export_forest numbers leaves in node order, so the kept ones are a suffix
+        leaf_start = int(leaf_id[leaf_id >= 0].min(initial=len(arrays['leaf_value'])))
+
+        structures.append(structure)
+        leaf_ids.append(np.where(leaf_id >= 0, leaf_id - leaf_start + leaf_offset, -1))
+        leaf_values.append(spread_classes(np.asarray(arrays['leaf_value'][leaf_start:]),
+                                          arrays['classes'], classes))
+        leaf_offset += len(leaf_values[-1])
+
+    merged = join_trees(structures)
+    merged.update({
+        'leaf_id': np.concatenate(leaf_ids).astype(np.int32),
+        'leaf_value': np.concatenate(leaf_values),
+        'max_depth': np.array(max(int(base['max_depth']), int(extra['max_depth'])), dtype=np.int32),
+        'classes': classes
+    })
+    return merged
+
+
+def compress_forest(arrays, top_k=4, value_dtype='uint8'):
+    """
+    Shrink exported forest arrays into a compact, slightly lossy form
+
+    - every leaf keeps only its top_k classes, with probabilities quantized
+      to uint8 (steps of 1/255) or float16
+    - identical leaf distributions are stored once
+    - internal nodes whose two children end up as the same leaf are
+      collapsed into that leaf, and unreachable nodes are dropped
+    - node fields use the smallest dtype that holds them
+
+    Collapsing is exact with respect to the quantized leaves, so the only
+    loss comes from truncation and quantization.
+
+    Args:
+        arrays: dictionary from export_forest or load_forest
+        top_k: classes kept per leaf
+        value_dtype: 'uint8' or 'float16'
+
+    Returns:
+        Dictionary of arrays accepted by CompactForestEngine
+    """
+    if value_dtype not in ('uint8', 'float16'):
+        raise ValueError("value_dtype must be 'uint8' or 'float16'")
+
+    leaf_value = np.asarray(arrays['leaf_value'])
+    n_leaves, n_classes = leaf_value.shape
+    top_k = min(top_k, n_classes)
+    class_dtype = np.uint8 if n_classes <= 256 else np.uint16
+
+    # Top classes per leaf; empty slots point at class 0 so equal
+    # distributions produce byte-identical rows
+    leaf_class = np.argsort(-leaf_value, axis=1, kind='stable')[:, :top_k]
+    kept = np.take_along_axis(leaf_value, leaf_class, axis=1)
+    if value_dtype == 'uint8':
+        quantized = np.round(kept * 255).astype(np.uint8)
+        value_scale = 1 / 255
+    else:
+        quantized = kept.astype(np.float16)
+        value_scale = 1.0
+    leaf_class = np.where(quantized == 0, 0, leaf_class).astype(class_dtype)
+
+    rows = np.concatenate([leaf_class.view(np.uint8).reshape(n_leaves, -1),
+                           quantized.view(np.uint8).reshape(n_leaves, -1)], axis=1)
+    unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    leaf_id = np.asarray(arrays['leaf_id'])
+    node_leaf = np.where(leaf_id >= 0, inverse[np.maximum(leaf_id, 0)], -1)
+    is_leaf = node_leaf >= 0
+    children = np.array(arrays['children'], dtype=np.int64).reshape(-1, 2)
+
+    # Collapse bottom-up until no internal node has two identical leaf children
+    while True:
+        right, left = children[:, 0], children[:, 1]
+        mergeable = ~is_leaf & is_leaf[right] & is_leaf[left] & (node_leaf[right] == node_leaf[left])
+        if not mergeable.any():
+            break
+        merged = np.flatnonzero(mergeable)
+        node_leaf[merged] = node_leaf[left[merged]]
+        is_leaf[merged] = True
+        children[merged] = merged[:, None]
+
+    # Walk down from the roots to find the surviving nodes and the new depth
+    roots = np.asarray(arrays['root'], dtype=np.int64)
+    reachable = np.zeros(len(node_leaf), dtype=bool)
+    frontier = roots
+    max_depth = 0
+    while len(frontier):
+        reachable[frontier] = True
+        frontier = frontier[~is_leaf[frontier]]
+        if len(frontier):
+            max_depth += 1
+            frontier = children[frontier].ravel()
+
+    new_index = np.cumsum(reachable) - 1
+    kept_leaves = node_leaf[reachable]
+    used_rows, leaf_index = np.unique(kept_leaves[kept_leaves >= 0], return_inverse=True)
+    new_leaf_id = np.full(len(kept_leaves), -1, dtype=np.int32)
+    new_leaf_id[kept_leaves >= 0] = leaf_index.ravel()
+
+    feature = np.asarray(arrays['feature'])[reachable]
+    threshold = np.asarray(arrays['threshold'])[reachable]
+    # Answer thresholds are midpoints like 2.5, exact in float32; keep
+    # float64 if some other feature scale would change a comparison
+    if np.array_equal(threshold.astype(np.float32), threshold):
+        threshold = threshold.astype(np.float32)
+
+    leaf_rows = unique_rows[used_rows]
+    class_bytes = top_k * np.dtype(class_dtype).itemsize
+
+    return {
+        'feature': feature.astype(np.uint8 if feature.max(initial=0) < 256 else np.int32),
+        'threshold': threshold,
+        'children': new_index[children[reachable]].ravel().astype(np.int32),
+        'leaf_id': new_leaf_id,
+        'leaf_class': np.ascontiguousarray(leaf_rows[:, :class_bytes]).view(class_dtype),
+        'leaf_value': np.ascontiguousarray(leaf_rows[:, class_bytes:]).view(np.dtype(value_dtype)),
+        'root': new_index[roots].astype(np.int32),
+        'max_depth': np.array(max_depth, dtype=np.int32),
+        'value_scale': value_scale,
+        'classes': np.asarray(arrays['classes']).astype(str)
+    }
+
+
+def save_compact_forest(arrays, path, metadata=None, **header_fields):
+    """Save compress_forest output as a memory-mappable artifact"""
+    arrays = dict(arrays)
+    classes = [str(c) for c in arrays.pop('classes')]
+    max_depth = int(arrays.pop('max_depth'))
+    value_scale = float(arrays.pop('value_scale'))
+
+    write_artifact(path, arrays,
+                   kind='compact_forest',
+                   classes=classes,
+                   max_depth=max_depth,
+                   value_scale=value_scale,
+                   metadata=metadata or {},
+                   **header_fields)
+
+
+def load_compact_forest(path):
+    """Memory-map forest arrays saved by save_compact_forest"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'compact_forest':
+        raise ValueError(f"{path} does not contain a compact forest")
+
+    arrays['classes'] = np.array(header['classes'])
+    arrays['max_depth'] = header['max_depth']
+    arrays['value_scale'] = header['value_scale']
+    arrays['metadata'] = header.get('metadata', {})
+    return arrays
+
+
+class CompactForestEngine(ForestEngine):
+    """
+    ForestEngine over compress_forest output
+
+    Trees are walked the same way; each leaf only contributes its top
+    classes, which are scattered into the output with one bincount.
+
+    Usage:
+        engine = CompactForestEngine(load_compact_forest("model/career_forest_compact.bin"))
+    """
+
+    def __init__(self, arrays):
+        """Wrap compact forest arrays"""
+        super().__init__(arrays)
+        self.leaf_class = arrays['leaf_class']
+        self.value_scale = float(arrays['value_scale'])
+
+    def predict_proba(self, X):
+        """Average the (truncated, dequantized) leaf distributions of all trees"""
+        X = np.asarray(X)
+        n_classes = len(self.classes_)
+        top_k = self.leaf_class.shape[1]
+        probabilities = np.empty((len(X), n_classes), dtype=np.float64)
+
+        chunk = max(1, _GATHER_BUDGET // (self.n_estimators * top_k))
+        for start in range(0, len(X), chunk):
+            leaves = self.leaf_id[self.apply(X[start:start + chunk])]
+            n_rows = len(leaves)
+            slots = np.arange(n_rows)[:, None, None] * n_classes + self.leaf_class[leaves]
+            probabilities[start:start + n_rows] = np.bincount(
+                slots.ravel(),
+                weights=self.leaf_value[leaves].ravel().astype(np.float64),
+                minlength=n_rows * n_classes
+            ).reshape(n_rows, n_classes)
+
+        return probabilities * (self.value_scale / self.n_estimators)
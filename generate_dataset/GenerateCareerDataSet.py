@@ -0,0 +1,292 @@
+"""
+Synthetic career survey dataset generator
+
+Draws Q1..Q12 answer vectors for every career from the per-career answer
+profiles in career_profiles.json. Generation is vectorized, split into
+fixed-size chunks seeded by (seed, chunk index) so the output does not
+depend on the number of workers, and written chunk by chunk so memory
+stays bounded:
+
+    python generate_dataset/GenerateCareerDataSet.py
+    python generate_dataset/GenerateCareerDataSet.py --rows 100000000 --workers 16 \\
+        --format bin --output big_dataset.columns.bin
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from dataset import QUESTION_COLUMNS, read_dataset_csv  # noqa: E402
+from model_artifact import allocate_artifact, open_array  # noqa: E402
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_profiles.json')
+DEFAULT_PATTERN_SPREAD = 0.5
+
+# Set in each worker process by _init_worker
+_profiles = None
+
+
+def pattern_distribution(pattern, spread=DEFAULT_PATTERN_SPREAD):
+    """
+    Turn a typical answer pattern into per-question answer probabilities
+
+    Each question gets a discretized normal centred on the typical answer.
+    """
+    values = np.arange(1, 6)
+    weights = np.exp(-((values[None, :] - np.asarray(pattern)[:, None]) ** 2) / (2 * spread ** 2))
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def load_profiles(path=PROFILES_PATH):
+    """
+    Load career profiles
+
+    Every career entry has a "weight" (relative frequency) and either a
+    "distribution" (12 lists of 5 answer probabilities) or a "pattern"
+    (12 typical answers, widened by "pattern_spread").
+
+    Returns:
+        Dictionary with careers, career weights, per-question answer
+        thresholds (K x 4 x 12 float32) and CSV-ready career name bytes
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    spread = config.get('pattern_spread', DEFAULT_PATTERN_SPREAD)
+    careers = sorted(config['careers'])
+
+    weights = np.array([config['careers'][name].get('weight', 1) for name in careers], dtype=np.float64)
+    distributions = np.empty((len(careers), 12, 5), dtype=np.float64)
+    for i, name in enumerate(careers):
+        entry = config['careers'][name]
+        if 'distribution' in entry:
+            distribution = np.asarray(entry['distribution'], dtype=np.float64)
+        else:
+            distribution = pattern_distribution(entry['pattern'], spread)
+        if distribution.shape != (12, 5):
+            raise ValueError(f"Profile for '{name}' must cover 12 questions x 5 answers")
+        distributions[i] = distribution / distribution.sum(axis=1, keepdims=True)
+
+    # An answer is 1 + the number of thresholds a uniform draw passes
+    thresholds = np.cumsum(distributions, axis=2)[:, :, :4].transpose(0, 2, 1)
+
+    return {
+        'careers': careers,
+        'weights': np.cumsum(weights / weights.sum()),
+        'thresholds': np.ascontiguousarray(thresholds, dtype=np.float32),
+        'names_csv': [_csv_field(name).encode('utf-8') + b'\n' for name in careers]
+    }
+
+
+def build_profiles(csv_path, path=PROFILES_PATH):
+    """Write career_profiles.json from the answer frequencies of an existing dataset"""
+    answers, career_codes, careers = read_dataset_csv(csv_path)
+
+    lines = []
+    for code, name in enumerate(careers):
+        rows = answers[career_codes == code]
+        distribution = [[round(float((rows[:, q] == value).mean()), 4) for value in range(1, 6)]
+                        for q in range(12)]
+        entry = json.dumps({'weight': int(len(rows)), 'distribution': distribution})
+        lines.append(f'    {json.dumps(name)}: {entry}')
+
+    with open(path, 'w') as f:
+        f.write('{\n')
+        f.write(f'  "pattern_spread": {DEFAULT_PATTERN_SPREAD},\n')
+        f.write('  "careers": {\n')
+        f.write(',\n'.join(lines))
+        f.write('\n  }\n}\n')
+
+    return len(careers)
+
+
+def _csv_field(value):
+    if any(ch in value for ch in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def generate_chunk(profiles, seed, chunk_index, n_rows):
+    """
+    Draw one chunk of rows
+
+    Returns:
+        (answers, career_codes): n_rows x 12 uint8 array and career codes
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+
+    career_codes = np.searchsorted(profiles['weights'], rng.random(n_rows), side='right')
+    career_codes = np.minimum(career_codes, len(profiles['careers']) - 1).astype(np.uint16)
+
+    draws = rng.random((n_rows, 12), dtype=np.float32)
+    answers = np.ones((n_rows, 12), dtype=np.uint8)
+    thresholds = profiles['thresholds']
+    for k in range(4):
+        answers += draws >= thresholds[career_codes, k]
+
+    return answers, career_codes
+
+
+def format_csv(profiles, answers, career_codes):
+    """
+    Format rows as CSV bytes without a Python loop per row
+
+    Answers are single digits, so every row starts with the same 24-byte
+    "d,d,...,d," layout followed by the career name.
+    """
+    n_rows = len(answers)
+    names = profiles['names_csv']
+    name_lengths = np.array([len(name) for name in names], dtype=np.int64)
+    name_offsets = np.concatenate([[0], np.cumsum(name_lengths)[:-1]])
+    name_bytes = np.frombuffer(b''.join(names), dtype=np.uint8)
+
+    row_name_lengths = name_lengths[career_codes]
+    row_lengths = 24 + row_name_lengths
+    row_starts = np.cumsum(row_lengths) - row_lengths
+    out = np.empty(int(row_lengths.sum()), dtype=np.uint8)
+
+    prefix = np.empty((n_rows, 24), dtype=np.uint8)
+    prefix[:, 0::2] = answers + ord('0')
+    prefix[:, 1::2] = ord(',')
+    out[row_starts[:, None] + np.arange(24)] = prefix
+
+    # Position of every name byte within its row's name
+    within = np.arange(int(row_name_lengths.sum())) - np.repeat(np.cumsum(row_name_lengths) - row_name_lengths,
+                                                                row_name_lengths)
+    out[np.repeat(row_starts + 24, row_name_lengths) + within] = \
+        name_bytes[np.repeat(name_offsets[career_codes], row_name_lengths) + within]
+
+    return out.tobytes()
+
+
+def _init_worker(profiles_path):
+    global _profiles
+    _profiles = load_profiles(profiles_path)
+
+
+def _csv_chunk(seed, chunk_index, n_rows):
+    answers, career_codes = generate_chunk(_profiles, seed, chunk_index, n_rows)
+    return format_csv(_profiles, answers, career_codes)
+
+
+def _bin_chunk(path, layout, seed, chunk_index, first_row, n_rows):
+    answers, career_codes = generate_chunk(_profiles, seed, chunk_index, n_rows)
+    for i, column in enumerate(QUESTION_COLUMNS + ['Career']):
+        target = open_array(path, layout[column])
+        target[first_row:first_row + n_rows] = career_codes if column == 'Career' else answers[:, i]
+        target.flush()
+        del target
+    return n_rows
+
+
+def generate_dataset(output, rows, seed=42, workers=None, chunk_rows=1_000_000,
+                     output_format='csv', profiles_path=PROFILES_PATH):
+    """
+    Generate `rows` survey rows into `output`
+
+    Returns:
+        Number of rows written
+    """
+    workers = workers or os.cpu_count() or 1
+    careers = load_profiles(profiles_path)['careers']
+    chunks = [(i, start, min(chunk_rows, rows - start)) for i, start in enumerate(range(0, rows, chunk_rows))]
+
+    tmp_path = f"{output}.tmp-{os.getpid()}"
+    started = time.perf_counter()
+    written = 0
+
+    def report():
+        elapsed = time.perf_counter() - started
+        print(f"\r⚙️  {written:,}/{rows:,} rows ({written / max(elapsed, 1e-9):,.0f} rows/s)",
+              end='', flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(profiles_path,)) as pool:
+            if output_format == 'bin':
+                specs = {column: (np.uint8, (rows,)) for column in QUESTION_COLUMNS}
+                specs['Career'] = (np.uint16, (rows,))
+                layout = allocate_artifact(tmp_path, specs, kind='dataset', careers=careers,
+                                           generator={'seed': seed, 'chunk_rows': chunk_rows})
+                futures = [pool.submit(_bin_chunk, tmp_path, layout, seed, i, start, n)
+                           for i, start, n in chunks]
+                for future in futures:
+                    written += future.result()
+                    report()
+            else:
+                # Write chunks in order with a bounded number in flight
+                with open(tmp_path, 'wb') as f:
+                    f.write((','.join(QUESTION_COLUMNS + ['Career']) + '\n').encode())
+                    pending = deque()
+                    for i, start, n in chunks:
+                        pending.append((n, pool.submit(_csv_chunk, seed, i, n)))
+                        if len(pending) >= workers * 2:
+                            n_done, future = pending.popleft()
+                            f.write(future.result())
+                            written += n_done
+                            report()
+                    while pending:
+                        n_done, future = pending.popleft()
+                        f.write(future.result())
+                        written += n_done
+                        report()
+
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    print()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic career survey dataset")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="rows to generate (default: 50 per career)")
+    parser.add_argument('--output', default=os.path.join(ROOT_DIR, 'career_dataset.csv'))
+    parser.add_argument('--format', choices=('csv', 'bin'), default='csv',
+                        help="csv, or the columnar binary format read by dataset.load_dataset")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000,
+                        help="rows per chunk; the output depends on --seed and --chunk-rows only")
+    parser.add_argument('--profiles', default=PROFILES_PATH, help="career profiles JSON")
+    parser.add_argument('--build-profiles', metavar='CSV', default=None,
+                        help="rebuild the profiles JSON from an existing dataset and exit")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CAREER DATASET GENERATOR")
+    print("=" * 60)
+
+    if args.build_profiles:
+        n_careers = build_profiles(args.build_profiles, args.profiles)
+        print(f"✓ Profiles for {n_careers} careers saved to: {args.profiles}")
+        return
+
+    n_careers = len(load_profiles(args.profiles)['careers'])
+    rows = args.rows or n_careers * 50
+    print(f"\n📋 {n_careers} careers, {rows:,} rows, seed {args.seed}")
+
+    started = time.perf_counter()
+    written = generate_dataset(args.output, rows, seed=args.seed, workers=args.workers,
+                               chunk_rows=args.chunk_rows, output_format=args.format,
+                               profiles_path=args.profiles)
+    elapsed = time.perf_counter() - started
+
+    print(f"✓ Generated {written:,} rows in {elapsed:.1f}s")
+    print(f"📁 Output file: {args.output}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import numpy as np
+
+from career_predictor import SCORE_SCALE
+from dataset import N_ANSWERS, N_QUESTIONS, encode_answers_batch
+from model_artifact import read_artifact
+
+# One row per answer vector, indexed by its base-5 answer code; percentages
+# are stored as uint16 hundredths of a percent (100.00% = 10000)
+N_ANSWER_VECTORS = N_ANSWERS ** N_QUESTIONS
+
+
+def load_lookup_table(path):
+    """Memory-map a table written by build_lookup_table.py"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'lookup_table':
+        raise ValueError(f"{path} does not contain a lookup table")
+
+    return LookupTable(arrays['top5_index'], arrays['top5_score'], header['classes'],
+                       header.get('metadata', {}))
+
+
+class LookupTable:
+    """
+    Precomputed top 5 careers for every possible answer vector
+
+    Row i holds the prediction for the answers whose base-5 code is i, so
+    a lookup is one index computation and two small reads from the
+    memory-mapped file; no model is loaded.
+
+    Usage:
+        table = load_lookup_table("model/career_lookup.bin")
+        indices, percentages = table.top5([[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]])
+    """
+
+    def __init__(self, top5_index, top5_score, classes, metadata=None):
+        """Wrap the table arrays"""
+        self.top5_index = top5_index
+        self.top5_score = top5_score
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.metadata = metadata or {}
+
+    def top5(self, X):
+        """
+        Top 5 class indices and percentages for an N x 12 array
+
+        Returns:
+            (indices, percentages): N x 5 arrays, highest first
+        """
+        rows = encode_answers_batch(X)
+        return (self.top5_index[rows].astype(np.int64),
+                self.top5_score[rows] / SCORE_SCALE)
+
+    def predict(self, X):
+        """Predict the most likely class for every row"""
+        return self.classes_[self.top5_index[encode_answers_batch(X), 0]]
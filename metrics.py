@@ -0,0 +1,171 @@
+import bisect
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds, from tens of microseconds
+# (cache hits, argsort) up to seconds (cold batch requests)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Latency histogram, rendered with cumulative Prometheus buckets"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class _StageTimer:
+    """Context manager that records its elapsed time into a histogram"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process request and stage metrics
+
+    Stage timings cost two perf_counter calls and one short lock, so they
+    can stay on in production.
+
+    Usage:
+        with REGISTRY.stage('predict_proba'):
+            probabilities = model.predict_proba(X)
+
+        REGISTRY.observe_request('/api/predict', 'POST', 200, elapsed)
+        text = REGISTRY.render()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._request_latency = {}
+        self._requests = {}
+        self._errors = {}
+
+    def _stage_histogram(self, name):
+        histogram = self._stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(name, Histogram())
+        return histogram
+
+    def stage(self, name):
+        """Time a block of code as one pipeline stage"""
+        return _StageTimer(self._stage_histogram(name))
+
+    def observe_stage(self, name, seconds):
+        """Record an already measured stage duration"""
+        self._stage_histogram(name).observe(seconds)
+
+    def observe_request(self, route, method, status, seconds):
+        """Record one finished HTTP request"""
+        key = (route, method)
+        histogram = self._request_latency.get(key)
+        with self._lock:
+            if histogram is None:
+                histogram = self._request_latency.setdefault(key, Histogram())
+            count_key = (route, method, status)
+            self._requests[count_key] = self._requests.get(count_key, 0) + 1
+            if status >= 400:
+                self._errors[key] = self._errors.get(key, 0) + 1
+        histogram.observe(seconds)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            request_latency = sorted(self._request_latency.items())
+            requests = sorted(self._requests.items())
+            errors = sorted(self._errors.items())
+
+        lines = []
+
+        lines.append('# HELP career_stage_seconds Time spent in each prediction stage')
+        lines.append('# TYPE career_stage_seconds histogram')
+        for name, histogram in stages:
+            lines.extend(_histogram_lines('career_stage_seconds', {'stage': name}, histogram))
+
+        lines.append('# HELP career_request_seconds HTTP request latency by route')
+        lines.append('# TYPE career_request_seconds histogram')
+        for (route, method), histogram in request_latency:
+            lines.extend(_histogram_lines('career_request_seconds',
+                                          {'route': route, 'method': method}, histogram))
+
+        lines.append('# HELP career_requests_total HTTP requests by route and status')
+        lines.append('# TYPE career_requests_total counter')
+        for (route, method, status), count in requests:
+            labels = _labels({'route': route, 'method': method, 'status': status})
+            lines.append(f'career_requests_total{labels} {count}')
+
+        lines.append('# HELP career_request_errors_total HTTP responses with status >= 400')
+        lines.append('# TYPE career_request_errors_total counter')
+        for (route, method), count in errors:
+            labels = _labels({'route': route, 'method': method})
+            lines.append(f'career_request_errors_total{labels} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def render_gauges(prefix, values, help_text):
+    """Render the numeric entries of a stats dictionary as gauges"""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f'{prefix}_{key}'
+        lines.append(f'# HELP {name} {help_text} ({key})')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _histogram_lines(name, labels, histogram):
+    counts, total, count = histogram.snapshot()
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.buckets, counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{_labels(dict(labels, le=repr(bound)))} {cumulative}')
+    lines.append(f'{name}_bucket{_labels(dict(labels, le="+Inf"))} {count}')
+    lines.append(f'{name}_sum{_labels(labels)} {total}')
+    lines.append(f'{name}_count{_labels(labels)} {count}')
+    return lines
+
+
+# Process-wide registry used by app.py and career_predictor.py
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,165 @@
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+# File layout (all integers little-endian):
+#   8 bytes   magic  b"CAREERFM"
+#   4 bytes   format version (uint32)
+#   4 bytes   header length in bytes (uint32)
+#   N bytes   UTF-8 JSON header, padded with spaces to ALIGNMENT
+#   ...       raw C-ordered arrays, each starting on an ALIGNMENT boundary
+#
+# The header records every array's dtype, shape and absolute offset, plus
+# free-form fields such as "kind", "classes" and "metadata".
+MAGIC = b"CAREERFM"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _build_header(specs, header_fields):
+    """
+    Lay out arrays after the header
+
+    Args:
+        specs: dictionary of name -> (dtype, shape)
+
+    Returns:
+        (padded header bytes, layout dictionary, total file size)
+    """
+    # Header size depends on the offsets it contains, so lay out the data
+    # section after a header estimate and grow until it fits
+    header_size = ALIGNMENT
+    while True:
+        offset = _align(_PREAMBLE.size + header_size)
+        layout = {}
+        for name, (dtype, shape) in specs.items():
+            dtype = np.dtype(dtype)
+            layout[name] = {
+                'dtype': dtype.str,
+                'shape': [int(dim) for dim in shape],
+                'offset': offset
+            }
+            offset = _align(offset + dtype.itemsize * int(np.prod(shape, dtype=np.int64)))
+
+        header = dict(header_fields, format_version=FORMAT_VERSION, arrays=layout)
+        header_bytes = json.dumps(header).encode('utf-8')
+        if len(header_bytes) <= header_size:
+            break
+        header_size = _align(len(header_bytes))
+
+    data_start = _align(_PREAMBLE.size + header_size)
+    return header_bytes.ljust(data_start - _PREAMBLE.size, b' '), layout, offset
+
+
+def write_artifact(path, arrays, **header_fields):
+    """
+    Write arrays and a JSON header to a memory-mappable file
+
+    The file is written next to its destination and renamed into place,
+    so readers never see a half-written artifact.
+
+    Args:
+        path: destination file
+        arrays: dictionary of name -> numpy array
+        **header_fields: JSON-serializable values stored in the header
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    specs = {name: (array.dtype, array.shape) for name, array in arrays.items()}
+    header_bytes, layout, size = _build_header(specs, header_fields)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, array in arrays.items():
+                f.seek(layout[name]['offset'])
+                f.write(array.tobytes())
+            f.truncate(size)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def allocate_artifact(path, specs, **header_fields):
+    """
+    Create an artifact with zero-filled arrays to be written in place
+
+    Used for outputs too large to hold in memory: the caller (or several
+    worker processes) fills slices through open_array and renames the file
+    into place when done.
+
+    Args:
+        path: file to create
+        specs: dictionary of name -> (dtype, shape)
+        **header_fields: JSON-serializable values stored in the header
+
+    Returns:
+        Layout dictionary (name -> dtype/shape/offset) for open_array
+    """
+    header_bytes, layout, size = _build_header(specs, header_fields)
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.truncate(size)
+    return layout
+
+
+def open_array(path, spec, mode='r+'):
+    """Memory-map one array of an artifact using its layout entry"""
+    return np.memmap(path, dtype=np.dtype(spec['dtype']), mode=mode,
+                     offset=spec['offset'], shape=tuple(spec['shape']))
+
+
+def read_header(path):
+    """Read only the JSON header of an artifact"""
+    with open(path, 'rb') as f:
+        magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        _check_preamble(path, magic, version)
+        return json.loads(f.read(header_length))
+
+
+def read_artifact(path):
+    """
+    Memory-map an artifact read-only
+
+    Arrays are views over one shared mapping, so every process that opens
+    the same file shares the same page-cache pages.
+
+    Returns:
+        (header, arrays) where arrays is a dictionary of read-only numpy arrays
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+    _check_preamble(path, magic, version)
+    header = json.loads(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length])
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=spec['offset']).reshape(shape)
+
+    return header, arrays
+
+
+def _check_preamble(path, magic, version):
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a career model artifact")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"{path} uses format version {version}, "
+                         f"this code only reads up to {FORMAT_VERSION}")
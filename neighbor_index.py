@@ -0,0 +1,204 @@
+import numpy as np
+
+from dataset import ANSWER_PLACE_VALUES, N_QUESTIONS, decode_answer_codes, encode_answers, encode_answers_batch
+from model_artifact import read_artifact, write_artifact
+
+# The fallback scan splits a code into two halves of 6 answers
+_HALF = 5 ** 6
+
+# Largest squared distance searched by shell enumeration before falling
+# back to a scan (offsets up to here: ~10k)
+MAX_SHELL = 4
+
+
+def build_neighbor_index(answers, career_codes, counts):
+    """
+    Group unique (answers, career) rows by answer vector
+
+    Args:
+        answers: N x 12 answers of the unique rows
+        career_codes: N career codes
+        counts: N respondent counts (see dataset.collapse_duplicates)
+
+    Returns:
+        Dictionary of arrays for save_neighbor_index
+    """
+    codes = encode_answers_batch(answers)
+    order = np.lexsort((-np.asarray(counts), codes))
+    codes = codes[order]
+
+    vector_codes, vector_start = np.unique(codes, return_index=True)
+    return {
+        'vector_code': vector_codes,
+        'pair_start': np.append(vector_start, len(codes)).astype(np.int64),
+        'career': np.asarray(career_codes)[order].astype(np.uint16),
+        'count': np.asarray(counts)[order].astype(np.uint32)
+    }
+
+
+def save_neighbor_index(arrays, path, careers, metadata=None):
+    """Save a neighbor index as a memory-mappable artifact"""
+    write_artifact(path, arrays,
+                   kind='neighbor_index',
+                   classes=[str(c) for c in careers],
+                   metadata=metadata or {})
+
+
+def load_neighbor_index(path):
+    """Load a NeighborIndex saved by save_neighbor_index"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'neighbor_index':
+        raise ValueError(f"{path} does not contain a neighbor index")
+
+    return NeighborIndex(arrays, header['classes'], header.get('metadata', {}))
+
+
+def _shell_offsets(max_squared):
+    """
+    Every integer offset vector with squared length <= max_squared
+
+    Returns:
+        (offsets, shell_start): offsets sorted by squared length, and the
+        index where each squared length starts (shell_start[s]:shell_start[s+1])
+    """
+    offsets = np.zeros((1, 0), dtype=np.int8)
+    squared = np.zeros(1, dtype=np.int64)
+    reach = int(np.sqrt(max_squared))
+
+    for _ in range(N_QUESTIONS):
+        steps = np.arange(-reach, reach + 1, dtype=np.int8)
+        grown = squared[:, None] + steps.astype(np.int64) ** 2
+        rows, columns = np.nonzero(grown <= max_squared)
+        offsets = np.column_stack([offsets[rows], steps[columns]])
+        squared = grown[rows, columns]
+
+    order = np.argsort(squared, kind='stable')
+    shell_start = np.searchsorted(squared[order], np.arange(max_squared + 2))
+    return offsets[order], shell_start
+
+
+def _half_table(query_half):
+    """Squared distance from 6 query answers to every possible half vector (uint8, by half code)"""
+    table = np.zeros(1, dtype=np.uint8)
+    for answer in query_half:
+        table = np.add.outer(table, ((np.arange(1, 6) - answer) ** 2).astype(np.uint8)).ravel()
+    return table
+
+
+class NeighborIndex:
+    """
+    k-nearest respondent search over the training answers
+
+    Respondents are grouped by answer vector, and answer vectors are kept
+    as sorted base-5 codes. Answers are integers, so the vectors at squared
+    distance s from a query are the query plus a fixed set of offsets. A
+    search enumerates s = 0, 1, 2, ... and binary-searches those codes,
+    which touches a few hundred codes when the query resembles the training
+    data, however many rows there are. Queries with no close match fall
+    back to a linear scan over two 15,625-entry distance tables.
+
+    Usage:
+        index = load_neighbor_index("model/career_neighbors.bin")
+        distances, careers, counts = index.kneighbors([5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3], k=10)
+    """
+
+    def __init__(self, arrays, classes, metadata=None):
+        """Wrap index arrays"""
+        self.vector_code = arrays['vector_code']
+        self.pair_start = arrays['pair_start']
+        self.career = arrays['career']
+        self.count = arrays['count']
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.metadata = metadata or {}
+
+        # Built on the first query, so loading stays a memory map
+        self._shells = None
+        self._scan_state = None
+
+    def _shell_state(self):
+        if self._shells is None:
+            offsets, shell_start = _shell_offsets(MAX_SHELL)
+            # Shell enumeration only pays off while it looks at fewer codes than a scan
+            searched = np.cumsum(np.diff(shell_start))
+            n_shells = max(1, int(np.searchsorted(searched, len(self.vector_code) // 8, side='right')))
+            self._shells = (offsets, offsets.astype(np.int64) @ ANSWER_PLACE_VALUES, shell_start, n_shells)
+        return self._shells
+
+    def kneighbors(self, answers, k=10):
+        """
+        The k (answer vector, career) groups closest to one answer vector
+
+        Ties are broken by respondent count, most first.
+
+        Returns:
+            (distances, career_indices, counts): arrays of length <= k,
+            closest first. Career names are classes_[career_indices].
+        """
+        query = np.asarray(answers, dtype=np.int64)
+        query_code = encode_answers(query)
+        n_vectors = len(self.vector_code)
+        offsets, offset_codes, shell_start, n_shells = self._shell_state()
+
+        found_vectors, found_distances = [], []
+        n_found = 0
+        for shell in range(n_shells):
+            lo, hi = shell_start[shell], shell_start[shell + 1]
+            candidates = query + offsets[lo:hi]
+            valid = ((candidates >= 1) & (candidates <= 5)).all(axis=1)
+            codes = query_code + offset_codes[lo:hi][valid]
+
+            positions = np.searchsorted(self.vector_code, codes)
+            inside = positions < n_vectors
+            positions, codes = positions[inside], codes[inside]
+            hits = positions[self.vector_code[positions] == codes]
+            found_vectors.append(hits)
+            found_distances.append(np.full(len(hits), shell))
+            n_found += int((self.pair_start[hits + 1] - self.pair_start[hits]).sum())
+
+            # Shells are complete, so everything closer has been seen
+            if n_found >= k:
+                return self._nearest_pairs(np.concatenate(found_vectors),
+                                           np.concatenate(found_distances), k)
+
+        return self._scan(query, k)
+
+    def _scan(self, query, k):
+        """Exact search over every answer vector"""
+        n_vectors = len(self.vector_code)
+        if self._scan_state is None:
+            # Small indexes are scanned directly; large ones through two
+            # per-query tables of every possible half vector's distance
+            if n_vectors <= 2 * _HALF:
+                self._scan_state = decode_answer_codes(self.vector_code).astype(np.int16)
+            else:
+                self._scan_state = ((self.vector_code // _HALF).astype(np.uint16),
+                                    (self.vector_code % _HALF).astype(np.uint16))
+
+        if n_vectors <= 2 * _HALF:
+            diff = self._scan_state - query.astype(np.int16)
+            distances = np.einsum('ij,ij->i', diff, diff)
+        else:
+            first, second = self._scan_state
+            distances = np.take(_half_table(query[:6]), first) + np.take(_half_table(query[6:]), second)
+
+        # Each vector holds at least one pair, so the k-th closest pair is no
+        # farther than the k-th closest vector. Squared distances are small
+        # integers, so a histogram finds that limit faster than a partition.
+        if len(distances) > k:
+            limit = int(np.searchsorted(np.cumsum(np.bincount(distances)), k))
+            vectors = np.flatnonzero(distances <= limit)
+        else:
+            vectors = np.arange(len(distances))
+        return self._nearest_pairs(vectors, distances[vectors], k)
+
+    def _nearest_pairs(self, vectors, squared, k):
+        """Expand answer vectors into their (career, count) pairs and keep the k closest"""
+        starts, ends = self.pair_start[vectors], self.pair_start[vectors + 1]
+        lengths = ends - starts
+        pairs = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        squared = np.repeat(squared.astype(np.int64), lengths)
+
+        counts = self.count[pairs].astype(np.int64)
+        order = np.lexsort((pairs, -counts, squared))[:k]
+        return np.sqrt(squared[order]), self.career[pairs[order]].astype(np.int64), counts[order]
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded in-memory cache for top 5 predictions
+
+    Keys are the compact answer codes from dataset.encode_answers,
+    so each entry costs one small int plus the cached result list.
+
+    Usage:
+        cache = PredictionCache(max_size=10000, policy='lru')
+        cache.put(key, results)
+        results = cache.get(key)  # None on a miss
+    """
+
+    POLICIES = ('lru', 'fifo')
+
+    def __init__(self, max_size=10000, policy='lru'):
+        """Create an empty cache (max_size=0 disables caching)"""
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown cache policy '{policy}' (expected one of {self.POLICIES})")
+
+        self.max_size = max(0, int(max_size))
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if self.policy == 'lru':
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the oldest entry when full"""
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = value
+                if self.policy == 'lru':
+                    self._entries.move_to_end(key)
+                return
+
+            while len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            self._entries[key] = value
+
+    def clear(self):
+        """Drop every entry (called when the model is reloaded)"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Get hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.max_size > 0,
+                'policy': self.policy,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,276 @@
+"""
+Append-only log of served predictions
+
+Request threads hand their rows to PredictionLogger.log, which only packs
+them into fixed-size records and queues them; a background thread appends
+the queue to the current segment file in one write every flush interval.
+When the disk falls behind, rows beyond max_pending_rows are dropped (and
+counted) instead of growing memory.
+
+Segment file (little-endian):
+    10-byte preamble: b'CPLG', version (uint16), header length (uint32)
+    JSON header: model version, careers (record indices point into it),
+                 record layout, creation time
+    36-byte records until the end of the file:
+        time (float64, Unix seconds), answers (uint32 base-5 code, Q1
+        first), model (uint32, first 8 hex digits of the model version),
+        top 5 career indices (5 x uint16), top 5 scores (5 x uint16,
+        hundredths of a percent)
+
+Segments are written as *.seg.open and renamed to *.seg once complete
+(size, age or model change). A crash can leave a partial record at the end
+of an open segment; readers ignore it. compact_prediction_logs.py turns
+segments into a dataset train_model.py can read.
+"""
+import glob
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from career_predictor import SCORE_SCALE
+from dataset import encode_answers_batch
+
+MAGIC = b'CPLG'
+VERSION = 1
+_PREAMBLE = struct.Struct('<4sHI')
+
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('answers', '<u4'),
+    ('model', '<u4'),
+    ('careers', '<u2', (5,)),
+    ('scores', '<u2', (5,))
+])
+
+def pack_records(model_version, answers_matrix, indices, percentages, timestamp=None):
+    """
+    Pack predictions into log records
+
+    Args:
+        model_version: hex model version (CareerPredictor.model_version)
+        answers_matrix: N x 12 answers (1-5)
+        indices, percentages: N x 5 top 5 careers, as returned by
+            CareerPredictor.predict_top5_indices
+        timestamp: Unix time of the predictions (default: now)
+    """
+    records = np.empty(len(answers_matrix), dtype=RECORD_DTYPE)
+    records['time'] = time.time() if timestamp is None else timestamp
+    records['answers'] = encode_answers_batch(answers_matrix)
+    records['model'] = int(model_version[:8], 16)
+    records['careers'] = indices
+    records['scores'] = np.round(np.asarray(percentages) * SCORE_SCALE)
+    return records
+
+
+def read_segment(path):
+    """
+    Read one segment file
+
+    Returns:
+        (header, records): the JSON header and every complete record
+    """
+    with open(path, 'rb') as f:
+        magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a prediction log segment")
+        header = json.loads(f.read(header_length))
+        body = f.read()
+
+    n_records = len(body) // RECORD_DTYPE.itemsize
+    return header, np.frombuffer(body, dtype=RECORD_DTYPE, count=n_records)
+
+
+def list_segments(directory, include_open=False):
+    """Segment files in a log directory, oldest first"""
+    paths = glob.glob(os.path.join(directory, '*.seg'))
+    if include_open:
+        paths += glob.glob(os.path.join(directory, '*.seg.open'))
+    return sorted(paths, key=os.path.basename)
+
+
+class PredictionLogger:
+    """
+    Buffered, append-only prediction log (see the module docstring)
+
+    Usage:
+        logger = PredictionLogger('prediction_logs')
+        logger.log(predictor.model_version, predictor.model.classes_, answers_matrix, indices, percentages)
+        ...
+        logger.close()
+    """
+
+    def __init__(self, directory, flush_interval=1.0, flush_rows=4096,
+                 max_pending_rows=100_000, segment_bytes=64 * 1024 * 1024, segment_seconds=3600):
+        """
+        Args:
+            directory: where segment files are written (created if missing)
+            flush_interval: seconds between background writes
+            flush_rows: write early once this many rows are waiting
+            max_pending_rows: rows kept in memory while the disk is behind;
+                further rows are dropped
+            segment_bytes: start a new segment after this many bytes
+            segment_seconds: start a new segment after this many seconds
+        """
+        self.directory = directory
+        self.flush_interval = float(flush_interval)
+        self.flush_rows = max(1, int(flush_rows))
+        self.max_pending_rows = max(1, int(max_pending_rows))
+        self.segment_bytes = int(segment_bytes)
+        self.segment_seconds = float(segment_seconds)
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = []  # (model_version, classes, records)
+        self._pending_rows = 0
+        self._logged_rows = 0
+        self._dropped_rows = 0
+        self._written_rows = 0
+        self._write_seconds = 0.0
+        self._segments = 0
+        self._errors = 0
+
+        self._file = None
+        self._path = None
+        self._segment_version = None
+        self._segment_opened = 0.0
+        self._segment_size = 0
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='prediction-logger', daemon=True)
+        self._thread.start()
+
+    def log(self, model_version, classes, answers_matrix, indices, percentages):
+        """
+        Queue predictions for the log without touching the disk
+
+        Returns:
+            False when the rows were dropped because the queue is full
+        """
+        records = pack_records(model_version, answers_matrix, indices, percentages)
+
+        with self._lock:
+            if self._pending_rows + len(records) > self.max_pending_rows:
+                self._dropped_rows += len(records)
+                return False
+            self._pending.append((model_version, classes, records))
+            self._pending_rows += len(records)
+            self._logged_rows += len(records)
+            wake = self._pending_rows >= self.flush_rows
+
+        if wake:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        """Write everything queued so far (normally done by the background thread)"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+
+        start = time.perf_counter()
+        written = 0
+        try:
+            # Consecutive rows of the same model go out in one write
+            while batch:
+                model_version, classes = batch[0][0], batch[0][1]
+                n_same = next((i for i, item in enumerate(batch) if item[0] != model_version), len(batch))
+                records = np.concatenate([item[2] for item in batch[:n_same]])
+                self._write(model_version, classes, records)
+                written += len(records)
+                batch = batch[n_same:]
+        except OSError as e:
+            # The rest of this batch is lost; the next write starts a new segment
+            print(f"⚠️  Prediction log write failed: {e}")
+            self._abandon_segment()
+
+        failed = sum(len(item[2]) for item in batch)
+        with self._lock:
+            self._pending_rows -= written + failed
+            self._dropped_rows += failed
+            self._errors += int(failed > 0)
+            self._written_rows += written
+            self._write_seconds += time.perf_counter() - start
+
+    def close(self):
+        """Flush, stop the background thread and complete the current segment"""
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self._finish_segment()
+
+    def stats(self):
+        """Counters for /metrics and /api/stats"""
+        with self._lock:
+            return {
+                'logged_rows': self._logged_rows,
+                'written_rows': self._written_rows,
+                'dropped_rows': self._dropped_rows,
+                'pending_rows': self._pending_rows,
+                'segments': self._segments,
+                'write_errors': self._errors,
+                'write_seconds': round(self._write_seconds, 6)
+            }
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+            # Idle segments still complete on time
+            if self._file and time.time() - self._segment_opened >= self.segment_seconds:
+                self._finish_segment()
+
+    def _write(self, model_version, classes, records):
+        """Append records to the current segment, starting a new one when needed"""
+        if self._file and (model_version != self._segment_version or
+                           self._segment_size >= self.segment_bytes or
+                           time.time() - self._segment_opened >= self.segment_seconds):
+            self._finish_segment()
+
+        if self._file is None:
+            self._start_segment(model_version, classes)
+
+        data = records.tobytes()
+        self._file.write(data)
+        self._file.flush()
+        self._segment_size += len(data)
+
+    def _start_segment(self, model_version, classes):
+        self._segment_opened = time.time()
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(self._segment_opened))
+        self._segments += 1
+        self._path = os.path.join(self.directory, f"predictions-{stamp}-{os.getpid()}-{self._segments:04d}.seg.open")
+
+        header = json.dumps({
+            'model_version': model_version,
+            'classes': [str(c) for c in classes],
+            'record_dtype': RECORD_DTYPE.descr,
+            'score_scale': SCORE_SCALE,
+            'created': self._segment_opened
+        }).encode('utf-8')
+
+        self._file = open(self._path, 'wb')
+        self._file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)) + header)
+        self._segment_version = model_version
+        self._segment_size = self._file.tell()
+
+    def _finish_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path, self._path[:-len('.open')])
+        self._file = None
+
+    def _abandon_segment(self):
+        # Left as .seg.open; compact_prediction_logs.py --include-open still reads it
+        try:
+            self._file.close()
+        except (AttributeError, OSError):
+            pass
+        self._file = None
@@ -0,0 +1,63 @@
+# Survey questions, shared by the Flask app (app.py) and the ASGI app (asgi_app.py)
+QUESTIONS = [
+    {
+        "id": 1,
+        "question": "Gaano ka kahilig sa Math at Problem Solving?",
+        "description": "Problem-solving skills and mathematical aptitude"
+    },
+    {
+        "id": 2,
+        "question": "Gaano ka ka-tech savvy?",
+        "description": "Comfort with technology and digital tools"
+    },
+    {
+        "id": 3,
+        "question": "Gusto mo ba magtrabaho sa computer kaysa physical work?",
+        "description": "Preference for computer-based vs hands-on work"
+    },
+    {
+        "id": 4,
+        "question": "Gaano ka ka-creative (design, art, content creation)?",
+        "description": "Creative and artistic abilities"
+    },
+    {
+        "id": 5,
+        "question": "Gaano mo gusto ang pakikipag-socialize / pag-handle ng tao?",
+        "description": "Social and people management skills"
+    },
+    {
+        "id": 6,
+        "question": "Gaano ka ka-detail-oriented?",
+        "description": "Attention to detail and precision"
+    },
+    {
+        "id": 7,
+        "question": "Gusto mo ba research, analysis, or investigation type work?",
+        "description": "Interest in research and analytical work"
+    },
+    {
+        "id": 8,
+        "question": "Gaano ka ka-comfortable sa fast-paced environments?",
+        "description": "Ability to thrive in dynamic settings"
+    },
+    {
+        "id": 9,
+        "question": "Mahilig ka ba magturo, magpaliwanag, or mag-guide ng ibang tao?",
+        "description": "Teaching and mentoring abilities"
+    },
+    {
+        "id": 10,
+        "question": "Gusto mo ba outdoor or field work kaysa office work?",
+        "description": "Preference for outdoor vs indoor work"
+    },
+    {
+        "id": 11,
+        "question": "Interested ka ba sa technical/hands-on tasks?",
+        "description": "Technical and practical skills"
+    },
+    {
+        "id": 12,
+        "question": "Gaano ka ka-interesado sa business, finance, or entrepreneurship?",
+        "description": "Business and financial interests"
+    }
+]
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Upper bounds of the histogram buckets for batch sizes and queue depths
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+_BUCKET_LABELS = [f"<={bound}" for bound in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}"]
+
+
+def _bucket_index(value):
+    for i, bound in enumerate(HISTOGRAM_BUCKETS):
+        if value <= bound:
+            return i
+    return len(HISTOGRAM_BUCKETS)
+
+
+class PredictionCoalescer:
+    """
+    Micro-batching layer between /api/predict and CareerPredictor
+
+    Request threads call submit() with one answer list. A background thread
+    waits up to window_ms after the first queued request (or until
+    max_batch_size rows are waiting), scores the whole group with one
+    predict_top5_batch call and hands each caller its own result, along with
+    the predictor that scored it.
+
+    Usage:
+        coalescer = PredictionCoalescer(lambda: predictor, window_ms=2, max_batch_size=64)
+        scored_by, results = coalescer.submit([5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3])
+    """
+
+    def __init__(self, get_predictor, window_ms=2.0, max_batch_size=64):
+        """
+        Args:
+            get_predictor: callable returning the CareerPredictor to use; called
+                once per batch so hot-reloaded models are picked up
+            window_ms: how long to wait for more requests after the first one
+            max_batch_size: flush as soon as this many rows are waiting
+        """
+        self.get_predictor = get_predictor
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_queue_depth = 0
+        self._batch_sizes = [0] * len(_BUCKET_LABELS)
+        self._queue_depths = [0] * len(_BUCKET_LABELS)
+
+        self._thread = threading.Thread(target=self._run, name='prediction-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, answers, timeout=30):
+        """
+        Queue one answer list and wait for its top 5 predictions
+
+        Returns:
+            (predictor, results): the CareerPredictor the batch used (after a
+            reload it may not be the current one) and the top 5 list
+
+        Raises whatever the batched prediction raised, or
+        concurrent.futures.TimeoutError after timeout seconds.
+        """
+        future = Future()
+        self._queue.put((answers, future))
+        return future.result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._record(len(batch), self._queue.qsize())
+            self._score(batch)
+
+    def _score(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            predictor = self.get_predictor()
+            if predictor is None:
+                raise RuntimeError("Model not loaded")
+
+            results = predictor.predict_top5_batch([answers for answers, _ in batch], use_cache=True)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, row_results in zip(futures, results):
+            future.set_result((predictor, row_results))
+
+    def _record(self, batch_size, queue_depth):
+        with self._lock:
+            self._batches += 1
+            self._rows += batch_size
+            self._max_queue_depth = max(self._max_queue_depth, queue_depth)
+
+            self._batch_sizes[_bucket_index(batch_size)] += 1
+            # Depth left behind after taking a batch; 0 lands in the first bucket
+            self._queue_depths[_bucket_index(queue_depth)] += 1
+
+    def stats(self):
+        """Get queue depth and batch size counters"""
+        with self._lock:
+            return {
+                'enabled': True,
+                'window_ms': self.window * 1000.0,
+                'max_batch_size': self.max_batch_size,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'batches': self._batches,
+                'rows': self._rows,
+                'mean_batch_size': round(self._rows / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': dict(zip(_BUCKET_LABELS, self._batch_sizes)),
+                'queue_depth_histogram': dict(zip(_BUCKET_LABELS, self._queue_depths))
+            }
@@ -0,0 +1,121 @@
+"""
+Startup time report for the Flask app
+
+Starts fresh interpreters that import app.py with `python -X importtime`
+and wait for the background model load, then reports where the time goes:
+the slowest imports, the time until the model is ready, and which heavy
+modules (scikit-learn, pandas, scipy) were pulled in on the way.
+
+    python startup_report.py
+    python startup_report.py --engine sklearn --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Modules that should stay out of a worker that serves an exported model
+HEAVY_MODULES = ('sklearn', 'pandas', 'scipy')
+
+_PROBE_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.model_ready.wait(60)
+ready = time.perf_counter()
+print('STARTUP ' + json.dumps({
+    'import_seconds': imported - t0,
+    'ready_seconds': ready - t0,
+    'model_load_seconds': app.model_load_seconds,
+    'model_status': app.model_status,
+    'engine': app.predictor.engine if app.predictor else None,
+    'modules': sorted(name for name in sys.modules if '.' not in name)
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output
+
+    Returns:
+        Dictionary of top-level package -> seconds spent executing its
+        modules (self time, so numpy is charged to numpy and not to
+        whichever module happened to import it first)
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1e6
+    return totals
+
+
+def measure_startup(engine=None):
+    """Start the app once in a fresh interpreter and time it"""
+    env = dict(os.environ)
+    if engine:
+        env['PREDICTION_ENGINE'] = engine
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _PROBE_SCRIPT],
+                            capture_output=True, text=True, env=env, check=True)
+    wall_seconds = time.perf_counter() - start
+
+    # The app's own banners also go to stdout (from the loading thread too)
+    line = next(line for line in result.stdout.splitlines() if line.startswith('STARTUP '))
+    report = json.loads(line[len('STARTUP '):])
+    report['process_seconds'] = wall_seconds
+    report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report app startup time")
+    parser.add_argument('--engine', default=None,
+                        help="PREDICTION_ENGINE for the app (default: the app's own default)")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="fresh starts to time (the median is reported)")
+    parser.add_argument('--top', type=int, default=12,
+                        help="number of imports to list")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⏱️  STARTUP REPORT")
+    print("=" * 60)
+
+    runs = [measure_startup(args.engine) for _ in range(args.runs)]
+    last = runs[-1]
+    if last['model_status'] != 'ready':
+        print(f"❌ Model did not become ready ({last['model_status']})")
+        sys.exit(1)
+
+    def median(key):
+        return float(np.median([run[key] for run in runs]))
+
+    print(f"\nEngine: {last['engine']}  ({args.runs} runs, medians)")
+    print(f"  Process start -> model ready: {median('process_seconds') * 1000:8.1f} ms")
+    print(f"  import app:                   {median('import_seconds') * 1000:8.1f} ms")
+    print(f"  import app -> model ready:    {(median('ready_seconds') - median('import_seconds')) * 1000:8.1f} ms")
+    print(f"  Model load:                   {median('model_load_seconds') * 1000:8.1f} ms")
+
+    packages = set().union(*(run['imports'] for run in runs))
+    import_ms = {name: float(np.median([run['imports'].get(name, 0) for run in runs])) * 1000
+                 for name in packages}
+    print("\nSlowest imports by package (ms):")
+    for name, ms in sorted(import_ms.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {ms:8.1f}")
+
+    loaded = [name for name in HEAVY_MODULES if name in last['modules']]
+    print(f"\nHeavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+
+def dump_json(payload):
+    """Serialize a payload to compact UTF-8 JSON bytes"""
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_object(fields):
+    """
+    Serialize a flat dict to JSON bytes
+
+    bytes values are inserted verbatim as already-encoded JSON, so a fragment
+    serialized once (like the model info) can be embedded in every response
+    without being rebuilt.
+    """
+    parts = [dump_json(key) + b':' + (value if isinstance(value, bytes) else dump_json(value))
+             for key, value in fields.items()]
+    return b'{' + b','.join(parts) + b'}'
+
+
+class StaticResponse:
+    """
+    JSON response body serialized once, with validators for conditional GETs
+
+    The ETag is a hash of the body, so every worker process that builds the
+    same payload hands out the same tag.
+
+    Usage:
+        questions = StaticResponse({'success': True, 'questions': QUESTIONS})
+        if questions.is_not_modified(request.headers.get('If-None-Match'),
+                                     request.headers.get('If-Modified-Since')):
+            ...  # 304 with questions.headers
+        ...  # 200 with questions.body and questions.headers
+    """
+
+    def __init__(self, payload, last_modified=None):
+        """
+        Args:
+            payload: JSON-serializable response body
+            last_modified: Unix time the content last changed (default: now)
+        """
+        self.body = dump_json(payload)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.last_modified = int(last_modified if last_modified is not None else time.time())
+        self.headers = {
+            'ETag': self.etag,
+            'Last-Modified': formatdate(self.last_modified, usegmt=True),
+            # Clients may keep the body but must revalidate (cheap 304) before reuse
+            'Cache-Control': 'no-cache'
+        }
+
+    def is_not_modified(self, if_none_match=None, if_modified_since=None):
+        """
+        Whether a conditional GET can be answered with 304 Not Modified
+
+        If-None-Match wins when present, as RFC 9110 requires.
+        """
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            # Weak comparison: W/"x" matches "x"
+            return '*' in tags or any((tag[2:] if tag.startswith('W/') else tag) == self.etag
+                                      for tag in tags)
+
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified <= since
+
+        return False
@@ -0,0 +1,120 @@
+import numpy as np
+
+from dataset import N_ANSWERS, N_QUESTIONS
+from model_artifact import read_artifact, write_artifact
+
+
+def one_hot_index(X):
+    """Row of the weight matrix used by each answer (question * 5 + answer - 1)"""
+    return np.arange(N_QUESTIONS) * N_ANSWERS + (np.asarray(X, dtype=np.int64) - 1)
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    return logits / logits.sum(axis=1, keepdims=True)
+
+
+def fit_softmax_student(X, soft_targets, epochs=30, batch_size=512, learning_rate=0.05,
+                        l2=1e-5, seed=42):
+    """
+    Distill soft class probabilities into a softmax model over one-hot answers
+
+    Minimizes cross-entropy against the teacher's probabilities with
+    mini-batch Adam. Each answer has its own weight row, so the model is a
+    table of 60 x n_classes weights plus a bias.
+
+    Args:
+        X: N x 12 answers (1-5)
+        soft_targets: N x n_classes teacher probabilities
+
+    Returns:
+        (weights, bias) as float32 arrays
+    """
+    rng = np.random.default_rng(seed)
+    index = one_hot_index(X)
+    soft_targets = np.asarray(soft_targets, dtype=np.float32)
+    n_rows, n_classes = soft_targets.shape
+
+    params = [np.zeros((N_QUESTIONS * N_ANSWERS, n_classes), dtype=np.float32),
+              np.log(soft_targets.mean(axis=0) + 1e-6).astype(np.float32)]
+    moments = [[np.zeros_like(p), np.zeros_like(p)] for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+
+    for _ in range(epochs):
+        order = rng.permutation(n_rows)
+        for start in range(0, n_rows, batch_size):
+            rows = order[start:start + batch_size]
+            batch_index = index[rows]
+            weights, bias = params
+
+            # Gradient of the soft cross-entropy w.r.t. the logits
+            delta = _softmax(weights[batch_index].sum(axis=1) + bias) - soft_targets[rows]
+            delta /= len(rows)
+
+            one_hot = np.zeros((len(rows), N_QUESTIONS * N_ANSWERS), dtype=np.float32)
+            np.put_along_axis(one_hot, batch_index, 1.0, axis=1)
+            weight_grad = one_hot.T @ delta + l2 * weights
+            grads = [weight_grad, delta.sum(axis=0)]
+
+            step += 1
+            for param, grad, (m, v) in zip(params, grads, moments):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad * grad
+                m_hat = m / (1 - beta1 ** step)
+                v_hat = v / (1 - beta2 ** step)
+                param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    return params[0], params[1]
+
+
+def save_student(path, weights, bias, classes, metadata=None):
+    """Save student weights as a memory-mappable artifact"""
+    write_artifact(path, {'weights': np.asarray(weights, dtype=np.float32),
+                          'bias': np.asarray(bias, dtype=np.float32)},
+                   kind='softmax_student',
+                   classes=[str(c) for c in classes],
+                   metadata=metadata or {})
+
+
+def load_student(path):
+    """Load a SoftmaxStudent saved by save_student"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'softmax_student':
+        raise ValueError(f"{path} does not contain a softmax student model")
+
+    return SoftmaxStudent(arrays['weights'], arrays['bias'], header['classes'],
+                          header.get('metadata', {}))
+
+
+class SoftmaxStudent:
+    """
+    Softmax model over one-hot answers, distilled from the forest
+
+    Scoring a row is 12 table lookups and a softmax over the careers, so
+    it is far cheaper than walking 200 trees.
+
+    Usage:
+        student = load_student("model/career_student.bin")
+        probabilities = student.predict_proba([[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]])
+    """
+
+    def __init__(self, weights, bias, classes, metadata=None):
+        """Wrap student weights"""
+        self.weights = weights
+        self.bias = bias
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.metadata = metadata or {}
+
+    def predict_proba(self, X):
+        """Class probabilities for an N x 12 array"""
+        logits = self.weights[one_hot_index(X)].sum(axis=1, dtype=np.float64) + self.bias
+        return _softmax(logits)
+
+    def predict(self, X):
+        """Predict the most likely class for every row"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,57 @@
+"""
+Shared fixtures: a small forest trained once per test session
+
+The model files are written to <tmp>/model/, the layout the app loads
+relative to its working directory.
+"""
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+SAMPLE_ANSWERS = [5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]
+
+
+@pytest.fixture(scope='session')
+def training_data():
+    from train_model import prepare_data
+    return prepare_data(os.path.join(REPO_DIR, "career_dataset.csv"))
+
+
+@pytest.fixture(scope='session')
+def sklearn_model(training_data):
+    from train_model import train
+    model, metadata, _ = train(training_data, n_estimators=10, max_depth=8)
+    return model, metadata
+
+
+@pytest.fixture(scope='session')
+def model_dir(tmp_path_factory, training_data, sklearn_model):
+    from train_model import save_explanations, save_model, save_neighbors
+
+    model, metadata = sklearn_model
+    model_dir = tmp_path_factory.mktemp("workdir") / "model"
+    save_model(model, metadata, str(model_dir))
+    save_neighbors(training_data, str(model_dir))
+    save_explanations(model, str(model_dir))
+    return model_dir
+
+
+@pytest.fixture(scope='session')
+def predictor(model_dir):
+    from career_predictor import CareerPredictor
+    return CareerPredictor(model_path=str(model_dir / "career_model.pkl"), cache_size=0)
+
+
+@pytest.fixture(scope='session')
+def client(model_dir):
+    """Flask test client serving the small forest"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # app starts loading model/ from the working directory when imported
+        monkeypatch.chdir(model_dir.parent)
+        import app
+        assert app.model_ready.wait(60), app.model_status
+        yield app.app.test_client()
@@ -0,0 +1,129 @@
+"""Artifacts read back exactly what was written"""
+import numpy as np
+import pytest
+
+from dataset import collapse_duplicates, decode_answer_codes, encode_answers, encode_answers_batch
+from forest_engine import ForestEngine, export_forest, load_compact_forest, load_forest, save_forest
+from model_artifact import allocate_artifact, open_array, read_artifact, read_header, write_artifact
+from neighbor_index import build_neighbor_index, load_neighbor_index, save_neighbor_index
+from student_model import load_student, save_student
+from tree_explainer import TreeExplainer, export_explainer, load_explainer, save_explainer
+
+
+def test_artifact_round_trip(tmp_path):
+    path = tmp_path / "arrays.bin"
+    arrays = {
+        'answers': np.arange(36, dtype=np.uint8).reshape(3, 12),
+        'scores': np.linspace(0, 1, 7),
+        'codes': np.array([2 ** 40, -1], dtype=np.int64),
+        'empty': np.zeros((0, 5), dtype=np.uint16),
+    }
+    write_artifact(path, arrays, kind='test', classes=['a', 'b'], metadata={'rows': 3})
+
+    header, loaded = read_artifact(path)
+    assert header['kind'] == 'test'
+    assert header['classes'] == ['a', 'b']
+    assert header['metadata'] == {'rows': 3}
+    assert read_header(path) == header
+    assert loaded.keys() == arrays.keys()
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        np.testing.assert_array_equal(loaded[name], array)
+        assert not loaded[name].flags.writeable
+
+
+def test_allocated_artifact_is_written_in_place(tmp_path):
+    path = tmp_path / "table.bin"
+    layout = allocate_artifact(path, {'table': (np.dtype(np.uint16), (4, 5))}, kind='test')
+    table = open_array(path, layout['table'])
+    table[2] = np.arange(5)
+    table.flush()
+    del table
+
+    _, arrays = read_artifact(path)
+    expected = np.zeros((4, 5), dtype=np.uint16)
+    expected[2] = np.arange(5)
+    np.testing.assert_array_equal(arrays['table'], expected)
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"\x80\x04not an artifact at all")
+    with pytest.raises(ValueError, match="not a career model artifact"):
+        read_artifact(path)
+
+
+def test_forest_round_trip(tmp_path, sklearn_model):
+    model, metadata = sklearn_model
+    path = tmp_path / "career_forest.bin"
+    save_forest(export_forest(model), path, metadata=metadata)
+
+    arrays = load_forest(path)
+    assert arrays['metadata'] == metadata
+    X = np.random.default_rng(1).integers(1, 6, size=(200, 12))
+    np.testing.assert_array_equal(ForestEngine(arrays).predict_proba(X),
+                                  ForestEngine(export_forest(model)).predict_proba(X))
+
+    # Each loader checks the kind of artifact it was given
+    with pytest.raises(ValueError, match="compact forest"):
+        load_compact_forest(path)
+
+
+def test_explainer_round_trip(tmp_path, sklearn_model):
+    model, _ = sklearn_model
+    path = tmp_path / "career_explainer.bin"
+    arrays = export_explainer(model)
+    save_explainer(arrays, path)
+
+    loaded = load_explainer(path)
+    assert list(loaded.classes_) == list(model.classes_)
+    X = np.random.default_rng(2).integers(1, 6, size=(20, 12))
+    class_indices = np.argsort(-model.predict_proba(X), axis=1)[:, :5]
+    bias, contributions = loaded.explain(X, class_indices)
+    expected_bias, expected_contributions = TreeExplainer(arrays).explain(X, class_indices)
+    np.testing.assert_array_equal(bias, expected_bias)
+    np.testing.assert_array_equal(contributions, expected_contributions)
+
+    # Root probability plus the path contributions is the forest's probability
+    np.testing.assert_allclose(bias + contributions.sum(axis=2),
+                               np.take_along_axis(model.predict_proba(X), class_indices, axis=1), atol=1e-9)
+
+
+def test_neighbor_index_round_trip(tmp_path, training_data):
+    answers, codes, counts = collapse_duplicates(training_data['X'], training_data['y'])
+    path = tmp_path / "career_neighbors.bin"
+    arrays = build_neighbor_index(answers, codes, counts)
+    save_neighbor_index(arrays, path, training_data['careers'], metadata={'rows': len(training_data['X'])})
+
+    index = load_neighbor_index(path)
+    assert list(index.classes_) == [str(c) for c in training_data['careers']]
+    assert int(index.count.sum()) == len(training_data['X'])
+
+    # A training row is its own nearest neighbour
+    row = training_data['X'][0]
+    distances, careers, _ = index.kneighbors(row, k=3)
+    assert distances[0] == 0
+    same_answers = (training_data['X'] == row).all(axis=1)
+    assert careers[0] in training_data['y'][same_answers]
+
+
+def test_student_round_trip(tmp_path):
+    rng = np.random.default_rng(3)
+    weights = rng.normal(size=(60, 4)).astype(np.float32)
+    bias = rng.normal(size=4).astype(np.float32)
+    path = tmp_path / "career_student.bin"
+    save_student(path, weights, bias, ['A', 'B', 'C', 'D'], metadata={'epochs': 1})
+
+    student = load_student(path)
+    assert list(student.classes_) == ['A', 'B', 'C', 'D']
+    assert student.metadata == {'epochs': 1}
+    np.testing.assert_array_equal(student.weights, weights)
+    np.testing.assert_array_equal(student.bias, bias)
+
+
+def test_answer_codes_round_trip():
+    answers = np.random.default_rng(4).integers(1, 6, size=(100, 12))
+    codes = encode_answers_batch(answers)
+    assert codes.min() >= 0 and codes.max() < 5 ** 12
+    assert [encode_answers(row) for row in answers.tolist()] == codes.tolist()
+    np.testing.assert_array_equal(decode_answer_codes(codes), answers)
@@ -0,0 +1,82 @@
+"""The native, compact and sklearn engines agree, and so do the predictor's entry points"""
+import numpy as np
+import pytest
+
+from career_predictor import CareerPredictor
+from conftest import SAMPLE_ANSWERS
+from forest_engine import CompactForestEngine, ForestEngine, compress_forest, export_forest
+
+
+@pytest.fixture(scope='module')
+def answers():
+    """Random answer vectors plus the sample answers"""
+    rows = np.random.default_rng(0).integers(1, 6, size=(500, 12))
+    return np.vstack([SAMPLE_ANSWERS, rows])
+
+
+def test_native_engine_matches_sklearn(sklearn_model, answers):
+    model, _ = sklearn_model
+    engine = ForestEngine(export_forest(model))
+
+    assert list(engine.classes_) == list(model.classes_)
+    np.testing.assert_allclose(engine.predict_proba(answers), model.predict_proba(answers), atol=1e-12)
+    assert (engine.predict(answers) == model.predict(answers)).all()
+
+
+def test_native_engine_matches_sklearn_leaves(sklearn_model, answers):
+    model, _ = sklearn_model
+    engine = ForestEngine(export_forest(model))
+    leaves = engine.leaf_id[engine.apply(answers)]
+    expected = np.stack([tree.tree_.value[tree.apply(answers.astype(np.float32))]
+                         for tree in model.estimators_], axis=1)
+    np.testing.assert_allclose(engine.leaf_value[leaves], expected.reshape(leaves.shape + (-1,)))
+
+
+def test_compact_engine_is_close_to_native(sklearn_model, answers):
+    model, _ = sklearn_model
+    arrays = export_forest(model)
+    native = ForestEngine(arrays).predict_proba(answers)
+
+    # Keeping every class in float16 only loses rounding
+    lossless = CompactForestEngine(compress_forest(arrays, top_k=len(model.classes_), value_dtype='float16'))
+    np.testing.assert_allclose(lossless.predict_proba(answers), native, atol=1e-3)
+
+    # The default (top 4 classes, uint8) mostly keeps the top career
+    compact = CompactForestEngine(compress_forest(arrays))
+    assert (compact.predict_proba(answers).argmax(axis=1) == native.argmax(axis=1)).mean() > 0.9
+
+
+def test_predictor_engines_agree(model_dir, predictor, answers):
+    sklearn_predictor = CareerPredictor(model_path=str(model_dir / "career_model.pkl"),
+                                        engine='sklearn', cache_size=0)
+    assert predictor.engine == 'native'
+    for row in answers[:50].tolist():
+        native, reference = predictor.predict_top5(row), sklearn_predictor.predict_top5(row)
+        assert [p['percentage'] for p in native] == [p['percentage'] for p in reference]
+        # Tied careers may come in either order (the sums differ in the last bit)
+        reference_by_career = {p['career']: p['percentage'] for p in reference}
+        for p in native:
+            assert reference_by_career.get(p['career'], p['percentage']) == p['percentage']
+
+
+def test_batch_matches_single_rows(predictor, answers):
+    batch = predictor.predict_top5_batch(answers)
+    assert len(batch) == len(answers)
+    for row, predictions in zip(answers.tolist(), batch):
+        assert predictions == predictor.predict_top5(row)
+
+
+def test_indices_match_batch(predictor, answers):
+    indices, percentages = predictor.predict_top5_indices(answers)
+    batch = predictor.predict_top5_batch(answers)
+    classes = predictor.model.classes_
+    for row_indices, row_percentages, predictions in zip(indices, percentages, batch):
+        assert [classes[i] for i in row_indices] == [p['career'] for p in predictions]
+        np.testing.assert_allclose(row_percentages, [p['percentage'] for p in predictions], atol=0.005)
+
+
+def test_explanations_add_up(predictor):
+    for prediction in predictor.explain_top5(SAMPLE_ANSWERS):
+        total = prediction['baseline'] + sum(prediction['contributions'].values())
+        # Every term is rounded to 2 decimals
+        assert total == pytest.approx(prediction['percentage'], abs=0.01 * 14)
@@ -0,0 +1,89 @@
+"""Answer validation in career_predictor and at the Flask routes"""
+import re
+
+import pytest
+
+from career_predictor import validate_answers_matrix
+from conftest import SAMPLE_ANSWERS
+
+
+def test_matrix_accepts_valid_rows():
+    matrix = validate_answers_matrix([SAMPLE_ANSWERS, [1] * 12])
+    assert matrix.shape == (2, 12)
+    assert matrix.dtype.kind in 'iu'
+
+
+def test_empty_batch_is_an_empty_matrix():
+    assert validate_answers_matrix([]).shape == (0, 12)
+
+
+@pytest.mark.parametrize('rows, message', [
+    ([SAMPLE_ANSWERS[:11]], "exactly 12 answers"),
+    ([[]], "exactly 12 answers"),
+    ([SAMPLE_ANSWERS, SAMPLE_ANSWERS[:11]], "exactly 12 answers"),
+    ([[3.0] * 12], "integers"),
+    ([["3"] * 12], "integers"),
+    ([SAMPLE_ANSWERS, [0] * 12], "(row 1)"),
+    ([[6] * 12], "(row 0)"),
+])
+def test_matrix_rejects_invalid_rows(rows, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        validate_answers_matrix(rows)
+
+
+def test_predict_accepts_valid_answers(client):
+    response = client.post('/api/predict', json={'answers': SAMPLE_ANSWERS})
+    assert response.status_code == 200
+    assert len(response.get_json()['predictions']) == 5
+
+
+@pytest.mark.parametrize('answers', [
+    [True] + SAMPLE_ANSWERS[1:],
+    [3.0] + SAMPLE_ANSWERS[1:],
+    [0] + SAMPLE_ANSWERS[1:],
+    SAMPLE_ANSWERS[:11],
+    "5,5,5,3,2,4,4,4,2,1,4,3",
+])
+def test_predict_rejects_invalid_answers(client, answers):
+    response = client.post('/api/predict', json={'answers': answers})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_predict_rejects_non_boolean_explain(client):
+    response = client.post('/api/predict', json={'answers': SAMPLE_ANSWERS, 'explain': 1})
+    assert response.status_code == 400
+
+
+def test_batch_matches_single_predictions(client):
+    rows = [SAMPLE_ANSWERS, [2] * 12, [1, 2, 3, 4, 5, 1, 2, 3, 4, 5, 1, 2]]
+    response = client.post('/api/predict/batch', json={'answers': rows})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == len(rows)
+    for row, predictions in zip(rows, body['predictions']):
+        single = client.post('/api/predict', json={'answers': row}).get_json()
+        assert predictions == single['predictions']
+
+
+# JSON true/false must be rejected before numpy, which reads a row mixing
+# them with numbers as integers
+@pytest.mark.parametrize('rows', [
+    [[True] + SAMPLE_ANSWERS[1:]],
+    [SAMPLE_ANSWERS, [False] * 12],
+    [[3.0] * 12],
+    [SAMPLE_ANSWERS, "5,5,5,3,2,4,4,4,2,1,4,3"],
+    [SAMPLE_ANSWERS[:11]],
+    [[0] * 12],
+    [],
+])
+def test_batch_rejects_invalid_rows(client, rows):
+    response = client.post('/api/predict/batch', json={'answers': rows})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_similar_rejects_boolean_k(client):
+    response = client.post('/api/similar', json={'answers': SAMPLE_ANSWERS, 'k': True})
+    assert response.status_code == 400
+
@@ -1,106 +1,900 @@
-import pandas as pd
+import argparse
+import contextlib
+import datetime
+import io
+import json
 import pickle
 import os
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
-
-print("=" * 60)
-print("CAREER PREDICTION MODEL TRAINER")
-print("=" * 60)
-
-# Load dataset
-print("\n📂 Loading dataset...")
-try:
-    df = pd.read_csv("career_dataset.csv")
-    print(f"✓ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-    print(f"✓ Unique careers: {df['Career'].nunique()}")
-except Exception as e:
-    print(f"✗ Error loading dataset: {e}")
-    exit(1)
-
-# Prepare features and labels
-X = df[[f"Q{i}" for i in range(1, 13)]]
-y = df["Career"]
-
-print(f"\n✓ Features shape: {X.shape}")
-print(f"✓ Labels shape: {y.shape}")
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"\n✓ Training set: {len(X_train)} samples")
-print(f"✓ Test set: {len(X_test)} samples")
-
-# Train Random Forest Model
-print("\n🔄 Training Random Forest model...")
-model = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=20,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    n_jobs=-1
-)
-
-model.fit(X_train, y_train)
-print("✓ Model trained successfully!")
-
-# Evaluate model
-print("\n📊 Evaluating model...")
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-
-print(f"\n🎯 Model Accuracy: {accuracy * 100:.2f}%")
-
-# Detailed report (optional, comment out if too long)
-# print("\n📋 Classification Report:")
-# print(classification_report(y_test, y_pred, zero_division=0))
-
-# Save the trained model
-print("\n💾 Saving model...")
-model_dir = "model"
-os.makedirs(model_dir, exist_ok=True)
-
-model_path = os.path.join(model_dir, "career_model.pkl")
-
-with open(model_path, 'wb') as f:
-    pickle.dump(model, f)
-
-print(f"✓ Model saved to: {model_path}")
-
-# Save model metadata
-metadata = {
-    'accuracy': accuracy,
-    'n_careers': df['Career'].nunique(),
-    'n_features': 12,
-    'model_type': 'RandomForestClassifier',
-    'n_estimators': 200
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from career_predictor import model_version
+from dataset import collapse_duplicates, load_dataset
+from forest_engine import export_forest, merge_forests, save_forest, load_forest, ForestEngine
+from neighbor_index import build_neighbor_index, save_neighbor_index
+from student_model import SoftmaxStudent, fit_softmax_student, save_student
+from tree_explainer import export_explainer, load_explainer, load_explainer_arrays, merge_explainers, save_explainer
+
+MODEL_FILES = ("career_model.pkl", "career_forest.bin", "model_metadata.pkl")
+
+# Served files an incremental update replaces (it has no sklearn pickle)
+VERSION_FILES = ("career_explainer.bin", "model_metadata.pkl", "career_forest.bin")
+
+# Optional files built from a specific forest that an incremental update does not rebuild
+DERIVED_FILES = ("career_forest_compact.bin", "career_lookup.bin", "career_student.bin")
+
+# How to rebuild each derived file
+DERIVED_FILE_COMMANDS = {
+    "career_forest_compact.bin": "python compress_model.py",
+    "career_lookup.bin": "python build_lookup_table.py",
+    "career_student.bin": "python train_model.py --distill"
 }
 
-metadata_path = os.path.join(model_dir, "model_metadata.pkl")
-with open(metadata_path, 'wb') as f:
-    pickle.dump(metadata, f)
-
-print(f"✓ Metadata saved to: {metadata_path}")
-
-# Test the saved model
-print("\n🧪 Testing saved model...")
-with open(model_path, 'rb') as f:
-    loaded_model = pickle.load(f)
-
-# Test prediction
-test_input = [[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]]
-test_pred = loaded_model.predict(test_input)
-print(f"✓ Test prediction successful: {test_pred[0]}")
-
-print("\n" + "=" * 60)
-print("✨ MODEL TRAINING COMPLETE!")
-print("=" * 60)
-print(f"\n📁 Model file: {model_path}")
-print(f"📁 Metadata file: {metadata_path}")
-print(f"🎯 Accuracy: {accuracy * 100:.2f}%")
-print("\n💡 You can now use this model in your Flask app!")
-print("=" * 60)
\ No newline at end of file
+# Set in each sweep worker process by _init_sweep_worker
+_sweep_data = None
+
+
+def fit_forest(X, y, sample_weight=None, n_estimators=200, max_depth=20, n_jobs=-1):
+    """
+    Fit the Random Forest used by the app
+
+    Returns:
+        (model, training seconds)
+    """
+    # Imported here so the rest of this module can be used without sklearn
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=42,
+        n_jobs=n_jobs
+    )
+
+    start = time.perf_counter()
+    model.fit(X, y, sample_weight=sample_weight)
+    return model, time.perf_counter() - start
+
+
+def top5_hit_rate(probabilities, y_codes):
+    """Fraction of rows whose true career is among the 5 most likely"""
+    top5 = np.argsort(probabilities, axis=1)[:, -5:]
+    return float((top5 == np.asarray(y_codes)[:, None]).any(axis=1).mean())
+
+
+def save_model(model, metadata, model_dir):
+    """
+    Save the pickled model, its native forest export and its metadata
+
+    Returns:
+        Dictionary of file name -> path
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    paths = {name: os.path.join(model_dir, name) for name in MODEL_FILES}
+
+    with open(paths["career_model.pkl"], 'wb') as f:
+        pickle.dump(model, f)
+
+    # Export the forest as a memory-mapped artifact for the native engine
+    # (pickle-free, shared by all workers, no sklearn at serve time)
+    save_forest(export_forest(model), paths["career_forest.bin"], metadata=metadata)
+
+    with open(paths["model_metadata.pkl"], 'wb') as f:
+        pickle.dump(metadata, f)
+
+    return paths
+
+
+def distill_student(teacher, X_train, careers, random_rows=20000, seed=42):
+    """
+    Fit a softmax student to the forest's probabilities
+
+    The teacher labels the training rows plus uniformly random answer
+    vectors, so the student also learns the forest's behaviour away from
+    the training data.
+
+    Returns:
+        (SoftmaxStudent, seconds)
+    """
+    random_answers = np.random.default_rng(seed).integers(1, 6, size=(random_rows, 12), dtype=np.uint8)
+    X_distill = np.concatenate([X_train, random_answers])
+
+    start = time.perf_counter()
+    weights, bias = fit_softmax_student(X_distill, teacher.predict_proba(X_distill), seed=seed)
+    return SoftmaxStudent(weights, bias, careers), time.perf_counter() - start
+
+
+def _median_latency(predict_proba, rows):
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        predict_proba(row[None, :])
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies))
+
+
+def distillation_report(teacher, student, X_test, y_test_codes, thresholds=(0.0, 0.3, 0.5, 0.7, 0.9)):
+    """
+    Compare the fast tier with the forest on the test set at several
+    fallback thresholds, and measure the speedup
+
+    Returns:
+        List of per-threshold result dictionaries
+    """
+    teacher_proba = teacher.predict_proba(X_test)
+    student_proba = student.predict_proba(X_test)
+    teacher_top5 = np.sort(np.argsort(teacher_proba, axis=1)[:, -5:], axis=1)
+    teacher_top1 = teacher_proba.argmax(axis=1)
+    student_confidence = student_proba.max(axis=1)
+
+    rows = X_test[:200]
+    forest_latency = _median_latency(teacher.predict_proba, rows)
+    student_latency = _median_latency(student.predict_proba, rows)
+
+    results = []
+    for threshold in thresholds:
+        unsure = student_confidence < threshold
+        tier_proba = np.where(unsure[:, None], teacher_proba, student_proba)
+        tier_top5 = np.sort(np.argsort(tier_proba, axis=1)[:, -5:], axis=1)
+        fallback_rate = float(unsure.mean())
+        results.append({
+            'threshold': threshold,
+            'fallback_rate': fallback_rate,
+            'top1_agreement': float((tier_proba.argmax(axis=1) == teacher_top1).mean()),
+            'top5_agreement': float((tier_top5 == teacher_top5).all(axis=1).mean()),
+            'top5_overlap': float(np.mean([len(np.intersect1d(a, b)) / 5
+                                           for a, b in zip(tier_top5, teacher_top5)])),
+            'accuracy': float((tier_proba.argmax(axis=1) == y_test_codes).mean()),
+            # Every row pays for the student; unsure rows also pay for the forest
+            'speedup': forest_latency / (student_latency + fallback_rate * forest_latency)
+        })
+
+    print(f"\n📋 Fast tier vs forest ({len(X_test)} test rows, single row: "
+          f"forest {forest_latency * 1000:.3f} ms, student {student_latency * 1000:.3f} ms):")
+    print(f"  {'Threshold':>9}{'Fallback':>10}{'Top-1 agree':>13}{'Top-5 same':>12}"
+          f"{'Top-5 overlap':>15}{'Accuracy':>10}{'Speedup':>9}")
+    for result in results:
+        print(f"  {result['threshold']:>9.2f}{result['fallback_rate'] * 100:>9.1f}%"
+              f"{result['top1_agreement'] * 100:>12.2f}%{result['top5_agreement'] * 100:>11.2f}%"
+              f"{result['top5_overlap'] * 100:>14.2f}%"
+              f"{result['accuracy'] * 100:>9.2f}%{result['speedup']:>8.1f}x")
+
+    return results
+
+
+def parse_depth(text):
+    """Parse a tree depth, where 'None' means unlimited"""
+    return None if text.strip().lower() == 'none' else int(text)
+
+
+def parse_grid(text):
+    """Parse a comma-separated grid such as '10,20,None'"""
+    return [parse_depth(value) for value in text.split(',')]
+
+
+def config_name(n_estimators, max_depth):
+    return f"n{n_estimators}_d{max_depth if max_depth is not None else 'none'}"
+
+
+def _init_sweep_worker(data):
+    global _sweep_data
+    _sweep_data = data
+
+
+def _train_sweep_config(n_estimators, max_depth, sweep_dir):
+    """Train and evaluate one grid point in a worker process"""
+    data = _sweep_data
+    model, train_seconds = fit_forest(data['X_fit'], data['y_fit'], sample_weight=data['sample_weight'],
+                                      n_estimators=n_estimators, max_depth=max_depth, n_jobs=1)
+
+    probabilities = model.predict_proba(data['X_test'])
+    y_test = data['y_test']
+    accuracy = float((model.classes_[probabilities.argmax(axis=1)] == y_test).mean())
+    top5 = top5_hit_rate(probabilities, np.searchsorted(model.classes_, y_test))
+
+    model.classes_ = data['career_names'][model.classes_]
+    metadata = dict(data['metadata'], accuracy=accuracy, top5_accuracy=top5,
+                    n_estimators=n_estimators, max_depth=max_depth)
+
+    name = config_name(n_estimators, max_depth)
+    paths = save_model(model, metadata, os.path.join(sweep_dir, name))
+
+    return {
+        'name': name,
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        'accuracy': accuracy,
+        'top5_accuracy': top5,
+        'train_seconds': train_seconds,
+        'forest_bytes': os.path.getsize(paths["career_forest.bin"]),
+        'pickle_bytes': os.path.getsize(paths["career_model.pkl"])
+    }
+
+
+def measure_serving(config_dir, X_test, iterations=200):
+    """
+    Load time and inference latency of a saved model through CareerPredictor
+
+    Measured one model at a time so the numbers don't compete for CPU.
+    """
+    from career_predictor import CareerPredictor
+
+    model_path = os.path.join(config_dir, "career_model.pkl")
+    load_times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = CareerPredictor(model_path=model_path, engine='native', cache_size=0)
+        load_times.append(time.perf_counter() - start)
+
+    rows = X_test[np.arange(iterations) % len(X_test)].tolist()
+    latencies = []
+    for answers in rows:
+        start = time.perf_counter()
+        predictor.predict_top5(answers)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    predictor.predict_top5_indices(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'load_ms': float(np.median(load_times) * 1000),
+        'single_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'single_p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'batch_rows_per_s': float(len(X_test) / batch_seconds)
+    }
+
+
+def pareto_front(results):
+    """
+    Mark configurations no other one beats on top-1 and top-5 accuracy,
+    single-row latency, batch throughput, load time and artifact size at once
+    """
+    def objectives(result):
+        # Lower is better in every position
+        return (-result['accuracy'], -result['top5_accuracy'], result['single_p50_ms'],
+                -result['batch_rows_per_s'], result['load_ms'], result['forest_bytes'])
+
+    for result in results:
+        mine = objectives(result)
+        result['pareto'] = not any(
+            all(a <= b for a, b in zip(objectives(other), mine)) and objectives(other) != mine
+            for other in results
+        )
+    return results
+
+
+def run_sweep(args, data):
+    """Train the configuration grid in parallel, then measure and report each model"""
+    grid = [(n_estimators, max_depth)
+            for n_estimators in parse_grid(args.n_estimators_grid)
+            for max_depth in parse_grid(args.max_depth_grid)]
+    workers = args.sweep_workers or os.cpu_count() or 1
+
+    print(f"\n🔬 Sweeping {len(grid)} configurations on {workers} workers...")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                             initargs=(data,)) as pool:
+        futures = [pool.submit(_train_sweep_config, n_estimators, max_depth, args.sweep_dir)
+                   for n_estimators, max_depth in grid]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            print(f"✓ {result['name']}: {result['accuracy'] * 100:.2f}% accuracy, "
+                  f"trained in {result['train_seconds']:.1f}s")
+
+    print("\n⏱️  Measuring load time and latency...")
+    for result in results:
+        result.update(measure_serving(os.path.join(args.sweep_dir, result['name']), data['X_test']))
+
+    pareto_front(results)
+
+    report_path = os.path.join(args.sweep_dir, "report.json")
+    with open(report_path, 'w') as f:
+        json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+
+    print("\n📋 Sweep results (★ = Pareto optimal on accuracy / top-5 / latency / throughput / load / size):")
+    print(f"  {'Config':<12}{'Acc':>8}{'Top-5':>8}{'Forest':>10}{'Pickle':>10}"
+          f"{'Load':>9}{'p50':>9}{'p95':>9}{'Batch':>12}")
+    for result in sorted(results, key=lambda r: -r['accuracy']):
+        marker = '★' if result['pareto'] else ' '
+        print(f"{marker} {result['name']:<12}"
+              f"{result['accuracy'] * 100:>7.2f}%{result['top5_accuracy'] * 100:>7.2f}%"
+              f"{result['forest_bytes'] / 1024 / 1024:>8.1f}MB{result['pickle_bytes'] / 1024 / 1024:>8.1f}MB"
+              f"{result['load_ms']:>7.1f}ms{result['single_p50_ms']:>7.2f}ms{result['single_p95_ms']:>7.2f}ms"
+              f"{result['batch_rows_per_s']:>8,.0f} r/s")
+
+    print(f"\n📁 Report: {report_path}")
+    print("💡 Promote a configuration with: python train_model.py --promote <config>")
+
+
+def remove_derived_files(model_dir="model"):
+    """
+    Delete the optional files built from the forest being replaced, so the
+    compact and lookup engines or the fast tier can't keep serving it
+
+    Returns:
+        Names of the removed files
+    """
+    removed = []
+    for name in DERIVED_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(name)
+    return removed
+
+
+def print_removed_derived_files(removed):
+    for name in removed:
+        print(f"⚠️  Removed {name} (built from the previous forest); rebuild it with: "
+              f"{DERIVED_FILE_COMMANDS[name]}")
+
+
+def promote(sweep_dir, name, model_dir="model"):
+    """
+    Copy a swept configuration over the production model files
+
+    Returns:
+        Names of the derived files removed (see remove_derived_files)
+    """
+    source_dir = os.path.join(sweep_dir, name)
+    missing = [f for f in MODEL_FILES if not os.path.exists(os.path.join(source_dir, f))]
+    if missing:
+        raise FileNotFoundError(f"{source_dir} is missing {', '.join(missing)}")
+
+    os.makedirs(model_dir, exist_ok=True)
+    # Explanations of the replaced forest would no longer add up, so they are
+    # rebuilt for the promoted one first; the other derived files are too
+    # slow to rebuild here and are removed
+    with open(os.path.join(source_dir, "career_model.pkl"), 'rb') as f:
+        save_explanations(pickle.load(f), model_dir)
+    removed = remove_derived_files(model_dir)
+
+    # Each file is copied next to its destination and renamed into place;
+    # the forest goes last because a running app loads it first
+    for file_name in ("career_model.pkl", "model_metadata.pkl", "career_forest.bin"):
+        destination = os.path.join(model_dir, file_name)
+        tmp_path = f"{destination}.tmp-{os.getpid()}"
+        shutil.copyfile(os.path.join(source_dir, file_name), tmp_path)
+        os.replace(tmp_path, destination)
+
+    return removed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the career prediction model")
+    parser.add_argument('--data', default="career_dataset.csv",
+                        help="training data (CSV, or a columnar .bin file from the dataset generator)")
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--max-depth', type=parse_depth, default=20,
+                        help="maximum tree depth (or None)")
+    parser.add_argument('--dedup', action='store_true',
+                        help="train on unique (answers, career) rows weighted by their counts")
+    parser.add_argument('--compare-full', action='store_true',
+                        help="with --dedup, also train on every row and compare time and accuracy")
+    parser.add_argument('--distill', action='store_true',
+                        help="also distill a fast softmax student model for the 'fast' serving tier")
+    parser.add_argument('--distill-random-rows', type=int, default=20000,
+                        help="random answer vectors labelled by the forest for distillation")
+    parser.add_argument('--sweep', action='store_true',
+                        help="train a grid of forest sizes/depths and write a tradeoff report")
+    parser.add_argument('--n-estimators-grid', default="50,100,200")
+    parser.add_argument('--max-depth-grid', default="10,15,20")
+    parser.add_argument('--sweep-workers', type=int, default=None,
+                        help="configurations trained in parallel (default: all cores)")
+    parser.add_argument('--sweep-dir', default="sweep_results")
+    parser.add_argument('--promote', metavar='CONFIG', default=None,
+                        help="install a swept configuration (e.g. n100_d15) as the production model")
+    parser.add_argument('--cv-folds', type=int, default=0,
+                        help="also run stratified k-fold cross-validation and store the summary in the metadata")
+    parser.add_argument('--cv-workers', type=int, default=None,
+                        help="folds fitted in parallel (default: all cores)")
+    parser.add_argument('--cv-cache-dir', default="cv_cache",
+                        help="where fold assignments and fold models are cached between runs")
+    parser.add_argument('--incremental', action='store_true',
+                        help="add trees fitted on --data (new rows only) to the current model")
+    parser.add_argument('--add-trees', type=int, default=50,
+                        help="with --incremental, trees fitted on the new data")
+    parser.add_argument('--max-trees', type=int, default=None,
+                        help="with --incremental, drop the oldest trees beyond this many (rolling window)")
+    parser.add_argument('--holdout-data', default=None,
+                        help="with --incremental, a fixed dataset both models are also evaluated on")
+    parser.add_argument('--max-accuracy-drop', type=float, default=1.0,
+                        help="with --incremental, accuracy points the new version may lose before it is not installed")
+    parser.add_argument('--no-install', action='store_true',
+                        help="with --incremental, only write model/versions/<version>/")
+    return parser.parse_args()
+
+
+def prepare_data(data_path="career_dataset.csv", dedup=False):
+    """
+    Load the dataset, split it, and pick the rows the forest is fitted on
+
+    Returns:
+        Dictionary with the full dataset (X, y, careers, career_names), the
+        stratified 80/20 split as career codes (X_train, y_train, X_test,
+        y_test), the fitting rows (X_fit, y_fit, sample_weight; unique rows
+        with counts when dedup is set) and load_seconds / dedup_seconds
+    """
+    from sklearn.model_selection import train_test_split
+
+    start = time.perf_counter()
+    X, y, careers = load_dataset(data_path)
+    load_seconds = time.perf_counter() - start
+
+    # Small datasets (typically an --incremental batch) can have careers with
+    # a single row, or more careers than test rows, which a stratified split
+    # can't place; split them plainly
+    counts = np.bincount(y)
+    n_careers, n_test = int((counts > 0).sum()), int(np.ceil(0.2 * len(y)))
+    stratifiable = counts[counts > 0].min() >= 2 and n_careers <= n_test <= len(y) - n_careers
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y if stratifiable else None
+    )
+
+    # Only the training split is collapsed, so the test set is unchanged
+    start = time.perf_counter()
+    if dedup:
+        X_fit, y_fit, sample_weight = collapse_duplicates(X_train, y_train)
+    else:
+        X_fit, y_fit, sample_weight = X_train, y_train, None
+
+    return {
+        'X': X, 'y': y, 'careers': careers, 'career_names': np.array(careers, dtype=object),
+        'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test,
+        'X_fit': X_fit, 'y_fit': y_fit, 'sample_weight': sample_weight,
+        'dedup': dedup, 'load_seconds': load_seconds,
+        'dedup_seconds': time.perf_counter() - start if dedup else None
+    }
+
+
+def base_metadata(data):
+    """Metadata shared by every model trained on prepared data"""
+    return {
+        'n_careers': len(data['careers']),
+        'n_features': 12,
+        'model_type': 'RandomForestClassifier',
+        'training_rows': len(data['X_train']),
+        'unique_training_rows': len(data['X_fit']) if data['dedup'] else None
+    }
+
+
+def train(data, n_estimators=200, max_depth=20):
+    """
+    Fit the forest on prepared data and evaluate it on the test split
+
+    Returns:
+        (model, metadata, training seconds); the model predicts career names
+    """
+    model, train_seconds = fit_forest(data['X_fit'], data['y_fit'], sample_weight=data['sample_weight'],
+                                      n_estimators=n_estimators, max_depth=max_depth)
+
+    # The forest was fitted on integer codes; give it the career names back so
+    # the saved model predicts names like before
+    model.classes_ = data['career_names'][model.classes_]
+
+    accuracy = float((model.predict(data['X_test']) == data['career_names'][data['y_test']]).mean())
+    metadata = dict(base_metadata(data),
+                    accuracy=accuracy,
+                    n_estimators=n_estimators,
+                    max_depth=max_depth)
+    return model, metadata, train_seconds
+
+
+def verify_saved_model(paths, X_test):
+    """
+    Reload the saved files and check the native export against sklearn
+
+    Returns:
+        (ForestEngine, prediction for the sample answers, max probability difference)
+
+    Raises:
+        ValueError: if the native engine disagrees with the pickled model
+    """
+    with open(paths["career_model.pkl"], 'rb') as f:
+        loaded_model = pickle.load(f)
+
+    test_prediction = loaded_model.predict([[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]])[0]
+
+    engine = ForestEngine(load_forest(paths["career_forest.bin"]))
+    native_proba = engine.predict_proba(X_test)
+    sklearn_proba = loaded_model.predict_proba(X_test)
+    max_diff = float(np.abs(native_proba - sklearn_proba).max())
+    if not np.allclose(native_proba, sklearn_proba):
+        raise ValueError(f"Native engine mismatch (max diff {max_diff:.2e})")
+
+    return engine, test_prediction, max_diff
+
+
+def save_neighbors(data, model_dir="model"):
+    """
+    Index every dataset row (not just the training split) for find_similar
+
+    Returns:
+        (path, number of unique rows)
+    """
+    unique_answers, unique_codes, counts = collapse_duplicates(data['X'], data['y'])
+    path = os.path.join(model_dir, "career_neighbors.bin")
+    save_neighbor_index(build_neighbor_index(unique_answers, unique_codes, counts), path,
+                        data['careers'], metadata={'rows': len(data['X']), 'unique_rows': len(unique_answers)})
+    return path, len(unique_answers)
+
+
+def save_explanations(model, model_dir="model", X_check=None):
+    """
+    Precompute the node contributions behind CareerPredictor.explain_top5
+
+    When X_check is given, the explanations of its top 5 careers must add
+    up to the model's probabilities.
+
+    Returns:
+        (path, largest difference on X_check)
+    """
+    arrays = export_explainer(model)
+    path = os.path.join(model_dir, "career_explainer.bin")
+    save_explainer(arrays, path, metadata={'n_estimators': len(model.estimators_)})
+
+    max_diff = 0.0
+    if X_check is not None and len(X_check):
+        explainer = load_explainer(path)
+        probabilities = model.predict_proba(X_check)
+        top5 = np.argsort(probabilities, axis=1)[:, -5:]
+        bias, contributions = explainer.explain(X_check, top5)
+        explained = bias + contributions.sum(axis=2)
+        max_diff = float(np.abs(explained - np.take_along_axis(probabilities, top5, axis=1)).max())
+        if max_diff > 1e-6:
+            raise ValueError(f"Explanations do not add up to the predictions (max diff {max_diff:.2e})")
+
+    return path, max_diff
+
+
+def evaluate(engine, X, career_names):
+    """
+    Accuracy and top-5 hit rate of a ForestEngine on rows labelled with career names
+
+    Careers the model doesn't know count as misses.
+    """
+    probabilities = engine.predict_proba(X)
+    known = {career: i for i, career in enumerate(engine.classes_)}
+    y_codes = np.array([known.get(career, -1) for career in career_names])
+    return {
+        'rows': len(X),
+        'accuracy': float((probabilities.argmax(axis=1) == y_codes).mean()),
+        'top5_accuracy': top5_hit_rate(probabilities, y_codes)
+    }
+
+
+def incremental_update(data, model_dir="model", add_trees=50, max_depth=20, max_trees=None):
+    """
+    Fit trees on new data only and append them to the current model's forest
+
+    Training time depends on the new rows, not on everything the current
+    forest was trained on. With max_trees, the oldest trees are dropped so
+    the forest keeps a rolling window. Explanations are merged the same
+    way when the current ones can be (see tree_explainer.merge_explainers).
+
+    Returns:
+        (forest arrays, explainer arrays or None, parent forest arrays, info)
+    """
+    parent = load_forest(os.path.join(model_dir, "career_forest.bin"))
+
+    model, fit_seconds = fit_forest(data['X_fit'], data['y_fit'], sample_weight=data['sample_weight'],
+                                    n_estimators=add_trees, max_depth=max_depth)
+    model.classes_ = data['career_names'][model.classes_]
+
+    start = time.perf_counter()
+    n_parent = len(parent['root'])
+    drop_oldest = max(0, n_parent + add_trees - max_trees) if max_trees else 0
+    drop_oldest = min(drop_oldest, n_parent)
+    forest = merge_forests(parent, export_forest(model), drop_oldest)
+
+    explainer = None
+    explainer_path = os.path.join(model_dir, "career_explainer.bin")
+    if os.path.exists(explainer_path):
+        parent_explainer = load_explainer_arrays(explainer_path)
+        if len(parent_explainer['root']) == n_parent:
+            explainer = merge_explainers(parent_explainer, export_explainer(model), drop_oldest)
+
+    return forest, explainer, parent, {
+        'fit_seconds': fit_seconds,
+        'merge_seconds': time.perf_counter() - start,
+        'added_trees': add_trees,
+        'dropped_trees': drop_oldest,
+        'n_estimators': len(forest['root'])
+    }
+
+
+def save_version(forest, explainer, metadata, model_dir="model"):
+    """
+    Write a model version to model_dir/versions/<version>/
+
+    Returns:
+        (version, directory)
+    """
+    version = model_version(forest['classes'], metadata)
+    version_dir = os.path.join(model_dir, "versions", version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    save_forest(forest, os.path.join(version_dir, "career_forest.bin"), metadata=metadata)
+    if explainer is not None:
+        save_explainer(explainer, os.path.join(version_dir, "career_explainer.bin"),
+                       metadata={'n_estimators': len(explainer['root'])})
+    with open(os.path.join(version_dir, "model_metadata.pkl"), 'wb') as f:
+        pickle.dump(metadata, f)
+
+    return version, version_dir
+
+
+def install_version(version_dir, parent_version, model_dir="model"):
+    """
+    Make a saved version the served model
+
+    The files being replaced are kept as versions/<parent_version>/ first
+    (including the sklearn pickle, which no longer matches the forest), so
+    the previous model can be restored by copying them back.
+
+    Returns:
+        Names of the derived files removed (see remove_derived_files)
+    """
+    parent_dir = os.path.join(model_dir, "versions", parent_version)
+    if not os.path.exists(os.path.join(parent_dir, "career_forest.bin")):
+        os.makedirs(parent_dir, exist_ok=True)
+        for file_name in VERSION_FILES:
+            source = os.path.join(model_dir, file_name)
+            if os.path.exists(source):
+                shutil.copyfile(source, os.path.join(parent_dir, file_name))
+    pickle_path = os.path.join(model_dir, "career_model.pkl")
+    if os.path.exists(pickle_path):
+        os.replace(pickle_path, os.path.join(parent_dir, "career_model.pkl"))
+    removed = remove_derived_files(model_dir)
+
+    # Same order as promote: the forest goes last because a running app loads it first
+    for file_name in VERSION_FILES:
+        source = os.path.join(version_dir, file_name)
+        destination = os.path.join(model_dir, file_name)
+        if not os.path.exists(source):
+            # Explanations of the parent forest would no longer add up
+            if os.path.exists(destination):
+                os.remove(destination)
+            continue
+        tmp_path = f"{destination}.tmp-{os.getpid()}"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+
+    return removed
+
+
+def run_incremental(args, data):
+    """--incremental: update the current model with the rows in --data"""
+    print(f"\n🌱 Fitting {args.add_trees} trees on {len(data['X_fit'])} new rows...")
+    try:
+        forest, explainer, parent, info = incremental_update(data, "model", args.add_trees,
+                                                            args.max_depth, args.max_trees)
+    except FileNotFoundError as e:
+        print(f"✗ No current model to update ({e}). Run a full training first.")
+        exit(1)
+    print(f"✓ Trees fitted in {info['fit_seconds']:.1f}s, merged in {info['merge_seconds'] * 1000:.0f} ms "
+          f"({info['dropped_trees']} oldest dropped, {info['n_estimators']} trees)")
+    if explainer is None:
+        print("⚠️  Explanations not updated (no mergeable career_explainer.bin); run a full training to rebuild them")
+
+    # Both models are scored on the new data's held-out split, and on a fixed
+    # holdout dataset when one is given
+    holdouts = {'new_data_test': (data['X_test'], data['career_names'][data['y_test']])}
+    if args.holdout_data:
+        holdout_X, holdout_y, holdout_careers = load_dataset(args.holdout_data)
+        holdouts['holdout'] = (holdout_X, np.array(holdout_careers, dtype=object)[holdout_y])
+
+    parent_engine, engine = ForestEngine(parent), ForestEngine(forest)
+    evaluation = {}
+    print("\n📋 Evaluation:")
+    print(f"  {'Set':<16}{'Rows':>9}{'Before':>10}{'After':>10}{'Top-5 after':>13}")
+    for name, (X_eval, y_eval) in holdouts.items():
+        before, after = evaluate(parent_engine, X_eval, y_eval), evaluate(engine, X_eval, y_eval)
+        evaluation[name] = {'before': before, 'after': after}
+        print(f"  {name:<16}{after['rows']:>9}{before['accuracy'] * 100:>9.2f}%{after['accuracy'] * 100:>9.2f}%"
+              f"{after['top5_accuracy'] * 100:>12.2f}%")
+
+    parent_metadata = parent['metadata']
+    parent_version = model_version(parent['classes'], parent_metadata)
+    primary = evaluation['holdout' if args.holdout_data else 'new_data_test']
+    increment = {
+        'data': args.data,
+        'rows': len(data['X_train']),
+        'added_trees': info['added_trees'],
+        'dropped_trees': info['dropped_trees'],
+        'fit_seconds': round(info['fit_seconds'], 3),
+        'trained_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    }
+    metadata = dict(parent_metadata,
+                    accuracy=primary['after']['accuracy'],
+                    top5_accuracy=primary['after']['top5_accuracy'],
+                    n_careers=len(forest['classes']),
+                    training_rows=parent_metadata.get('training_rows', 0) + len(data['X_train']),
+                    n_estimators=info['n_estimators'],
+                    version=parent_metadata.get('version', 1) + 1,
+                    parent_version=parent_version,
+                    increments=parent_metadata.get('increments', []) + [increment],
+                    evaluation=evaluation)
+
+    version, version_dir = save_version(forest, explainer, metadata)
+    print(f"\n💾 Version {metadata['version']} saved to: {version_dir}")
+
+    drop = (primary['before']['accuracy'] - primary['after']['accuracy']) * 100
+    if args.no_install:
+        return
+    if drop > args.max_accuracy_drop:
+        print(f"✗ Not installed: accuracy fell {drop:.2f} points (limit --max-accuracy-drop {args.max_accuracy_drop})")
+        exit(1)
+
+    removed = install_version(version_dir, parent_version)
+    print(f"✓ Installed {version} in model/ (previous model kept in model/versions/{parent_version}/)")
+    print_removed_derived_files(removed)
+    print("💡 Running servers pick it up on their next reload (SIGUSR2 or /api/admin/reload)")
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("CAREER PREDICTION MODEL TRAINER")
+    print("=" * 60)
+
+    if args.promote:
+        try:
+            removed = promote(args.sweep_dir, args.promote)
+        except FileNotFoundError as e:
+            print(f"✗ {e}")
+            exit(1)
+        print(f"\n✓ Promoted {args.promote} to model/")
+        print_removed_derived_files(removed)
+        print("💡 Running servers pick it up on their next reload (SIGUSR2 or /api/admin/reload)")
+        return
+
+    # Load dataset (uint8 answers + integer career codes, via the columnar cache)
+    print("\n📂 Loading dataset...")
+    try:
+        data = prepare_data(args.data, dedup=args.dedup)
+    except Exception as e:
+        print(f"✗ Error loading dataset: {e}")
+        exit(1)
+
+    X, y = data['X'], data['y']
+    print(f"✓ Dataset loaded: {len(X)} rows in {data['load_seconds'] * 1000:.0f} ms "
+          f"({(X.nbytes + y.nbytes) / 1024 / 1024:.1f} MB)")
+    print(f"✓ Unique careers: {len(data['careers'])}")
+    print(f"\n✓ Features shape: {X.shape}")
+    print(f"✓ Labels shape: {y.shape}")
+    print(f"\n✓ Training set: {len(data['X_train'])} samples")
+    print(f"✓ Test set: {len(data['X_test'])} samples")
+
+    if args.dedup:
+        print(f"\n🗜️  Collapsed duplicate rows: {len(data['X_train'])} rows -> {len(data['X_fit'])} unique rows "
+              f"({len(data['X_train']) / len(data['X_fit']):.2f}x smaller) in {data['dedup_seconds'] * 1000:.0f} ms")
+
+    n_estimators, max_depth = args.n_estimators, args.max_depth
+
+    if args.incremental:
+        run_incremental(args, data)
+        return
+
+    if args.sweep:
+        # Only what the workers need is shipped to them
+        run_sweep(args, {key: data[key] for key in ('X_fit', 'y_fit', 'sample_weight', 'X_test',
+                                                    'y_test', 'career_names')}
+                  | {'metadata': base_metadata(data)})
+        return
+
+    # Train the comparison model first and drop it before the real one, so
+    # only one forest is ever held in memory
+    if args.dedup and args.compare_full:
+        print("\n⚖️  Training on every row for comparison...")
+        full_model, full_seconds = fit_forest(data['X_train'], data['y_train'],
+                                              n_estimators=n_estimators, max_depth=max_depth)
+        full_accuracy = float((full_model.predict(data['X_test']) == data['y_test']).mean())
+        del full_model
+        print(f"✓ Full model trained in {full_seconds:.1f}s ({full_accuracy * 100:.2f}% accuracy)")
+
+    # Train Random Forest Model
+    print("\n🔄 Training Random Forest model...")
+    model, metadata, train_seconds = train(data, n_estimators=n_estimators, max_depth=max_depth)
+    accuracy = metadata['accuracy']
+    print(f"✓ Model trained successfully in {train_seconds:.1f}s!")
+
+    print(f"\n🎯 Model Accuracy: {accuracy * 100:.2f}%")
+
+    if args.dedup and args.compare_full:
+        print("\n📋 Dedup vs full training:")
+        print(f"{'':<12}{'Rows':>12}{'Train time':>14}{'Accuracy':>12}")
+        print(f"{'Full':<12}{len(data['X_train']):>12}{full_seconds:>13.1f}s{full_accuracy * 100:>11.2f}%")
+        print(f"{'Dedup':<12}{len(data['X_fit']):>12}{train_seconds:>13.1f}s{accuracy * 100:>11.2f}%")
+        print(f"✓ Dedup training {full_seconds / train_seconds:.2f}x faster "
+              f"({(accuracy - full_accuracy) * 100:+.2f} accuracy points)")
+
+    if args.cv_folds:
+        # Imported here: cross_validation imports this module
+        from cross_validation import cross_validate
+
+        print(f"\n🧪 Running {args.cv_folds}-fold cross-validation...")
+        summary = cross_validate(X, y, data['careers'], n_folds=args.cv_folds, n_estimators=n_estimators,
+                                 max_depth=max_depth, dedup=args.dedup, workers=args.cv_workers,
+                                 cache_dir=args.cv_cache_dir)
+        metadata['cross_validation'] = summary
+        print(f"✓ Cross-validated top-1 {summary['top1_accuracy']['mean'] * 100:.2f}% "
+              f"± {summary['top1_accuracy']['std'] * 100:.2f}, "
+              f"top-5 {summary['top5_accuracy']['mean'] * 100:.2f}% "
+              f"± {summary['top5_accuracy']['std'] * 100:.2f}")
+
+    # Save the trained model, its native export and metadata; the explainer
+    # and neighbor index are rebuilt below, the other derived files are removed
+    print("\n💾 Saving model...")
+    removed = remove_derived_files("model")
+    paths = save_model(model, metadata, "model")
+    model_path = paths["career_model.pkl"]
+    forest_path = paths["career_forest.bin"]
+    metadata_path = paths["model_metadata.pkl"]
+
+    print(f"✓ Model saved to: {model_path}")
+    print(f"✓ Native forest saved to: {forest_path}")
+    print(f"✓ Metadata saved to: {metadata_path}")
+    # --distill writes a new student below
+    print_removed_derived_files([name for name in removed
+                                 if not (args.distill and name == "career_student.bin")])
+
+    # Test the saved model; the native engine must agree with sklearn
+    print("\n🧪 Testing saved model...")
+    try:
+        engine, test_prediction, max_diff = verify_saved_model(paths, data['X_test'])
+    except ValueError as e:
+        print(f"✗ {e}")
+        exit(1)
+    print(f"✓ Test prediction successful: {test_prediction}")
+    print(f"✓ Native engine matches sklearn (max diff {max_diff:.2e})")
+
+    print("\n🧭 Building similar-respondent index...")
+    start = time.perf_counter()
+    neighbors_path, n_unique = save_neighbors(data, "model")
+    print(f"✓ {n_unique} unique respondents indexed in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms: {neighbors_path}")
+
+    print("\n🔍 Precomputing prediction explanations...")
+    try:
+        explainer_path, explain_diff = save_explanations(model, "model", data['X_test'][:1000])
+    except ValueError as e:
+        print(f"✗ {e}")
+        exit(1)
+    print(f"✓ Explanations saved to: {explainer_path} (max diff {explain_diff:.2e})")
+
+    if args.distill:
+        print("\n🎓 Distilling fast tier student model...")
+        student, distill_seconds = distill_student(engine, data['X_fit'], data['careers'],
+                                                   args.distill_random_rows)
+        print(f"✓ Student trained in {distill_seconds:.1f}s")
+
+        report = distillation_report(engine, student, data['X_test'], data['y_test'])
+        student_path = os.path.join("model", "career_student.bin")
+        save_student(student_path, student.weights, student.bias, data['careers'],
+                     metadata={'teacher_accuracy': float(accuracy), 'report': report})
+        print(f"✓ Student saved to: {student_path}")
+        print("💡 Serve it with PREDICTION_TIER=fast (PREDICTION_FALLBACK_THRESHOLD sets the threshold)")
+
+    print("\n" + "=" * 60)
+    print("✨ MODEL TRAINING COMPLETE!")
+    print("=" * 60)
+    print(f"\n📁 Model file: {model_path}")
+    print(f"📁 Native forest file: {forest_path}")
+    print(f"📁 Metadata file: {metadata_path}")
+    print(f"📁 Similar-respondent index: {neighbors_path}")
+    print(f"📁 Explanations: {explainer_path}")
+    print(f"🎯 Accuracy: {accuracy * 100:.2f}%")
+    print("\n💡 You can now use this model in your Flask app!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import numpy as np
+
+from forest_engine import export_forest, join_trees, spread_classes, take_trees
+from model_artifact import read_artifact, write_artifact
+
+# Same budget as ForestEngine.predict_proba: rows x trees x depth x explained careers
+_GATHER_BUDGET = 4_000_000
+
+
+def export_explainer(model):
+    """
+    Precompute per-node contributions of a fitted RandomForestClassifier
+
+    Every split moves a prediction from the parent's class distribution to
+    the child's, so a tree's leaf distribution is its root distribution plus
+    one change per split on the path, and each change can be credited to
+    the question the parent split on (Saabas' decomposition). The change
+    into every node and every tree's root distribution are stored with the
+    tree structure, so explaining a row is one more walk down the trees.
+
+    Args:
+        model: fitted sklearn RandomForestClassifier
+
+    Returns:
+        Dictionary of arrays accepted by TreeExplainer
+    """
+    n_classes = len(model.classes_)
+
+    # The same node table as the native forest; only leaf values differ
+    arrays = export_forest(model)
+    deltas, roots = [], []
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        # Same normalisation as export_forest, for every node
+        values = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values /= normalizer
+
+        parents = np.arange(tree.node_count)
+        is_split = tree.children_left != -1
+        parents[tree.children_left[is_split]] = np.flatnonzero(is_split)
+        parents[tree.children_right[is_split]] = np.flatnonzero(is_split)
+
+        # Roots are their own parents, so their change is zero
+        deltas.append(values - values[parents])
+        roots.append(values[0])
+
+    return {
+        'feature': arrays['feature'],
+        'threshold': arrays['threshold'],
+        'children': arrays['children'],
+        'root': arrays['root'],
+        'delta': np.concatenate(deltas).astype(np.float32),
+        'root_value': np.array(roots),
+        'max_depth': arrays['max_depth'],
+        'classes': arrays['classes']
+    }
+
+
+def save_explainer(arrays, path, metadata=None):
+    """Save exported explainer arrays as a memory-mappable artifact"""
+    arrays = dict(arrays)
+    classes = [str(c) for c in arrays.pop('classes')]
+    max_depth = int(arrays.pop('max_depth'))
+
+    write_artifact(path, arrays,
+                   kind='path_contributions',
+                   classes=classes,
+                   max_depth=max_depth,
+                   metadata=metadata or {})
+
+
+def merge_explainers(base, extra, drop_oldest=0):
+    """
+    Explainer arrays for forest_engine.merge_forests(base, extra, drop_oldest)
+
+    Args:
+        base: arrays from export_explainer or an explainer's arrays
+        extra: arrays from export_explainer
+        drop_oldest: number of base trees to leave out
+
+    Returns:
+        Dictionary of arrays accepted by TreeExplainer
+    """
+    classes = np.union1d(np.asarray(base['classes']).astype(str), np.asarray(extra['classes']).astype(str))
+    structures, deltas, root_values = [], [], []
+
+    for arrays, first_tree in ((base, drop_oldest), (extra, 0)):
+        node_start, structure = take_trees(arrays, first_tree)
+        structures.append(structure)
+        deltas.append(spread_classes(np.asarray(arrays['delta'][node_start:]), arrays['classes'], classes))
+        root_values.append(spread_classes(np.asarray(arrays['root_value'][first_tree:]),
+                                          arrays['classes'], classes))
+
+    merged = join_trees(structures)
+    merged.update({
+        'delta': np.concatenate(deltas),
+        'root_value': np.concatenate(root_values),
+        'max_depth': np.array(max(int(base['max_depth']), int(extra['max_depth'])), dtype=np.int32),
+        'classes': classes
+    })
+    return merged
+
+
+def load_explainer_arrays(path):
+    """Memory-map explainer arrays saved by save_explainer"""
+    header, arrays = read_artifact(path)
+
+    if header.get('kind') != 'path_contributions':
+        raise ValueError(f"{path} does not contain tree path contributions")
+
+    arrays['classes'] = np.array(header['classes'])
+    arrays['max_depth'] = header['max_depth']
+    arrays['metadata'] = header.get('metadata', {})
+    return arrays
+
+
+def load_explainer(path):
+    """Load a TreeExplainer saved by save_explainer"""
+    return TreeExplainer(load_explainer_arrays(path))
+
+
+class TreeExplainer:
+    """
+    Per-question contributions to random forest probabilities
+
+    For every row and explained career, bias + contributions.sum() equals
+    the forest's predicted probability.
+
+    Usage:
+        explainer = load_explainer("model/career_explainer.bin")
+        bias, contributions = explainer.explain([[5, 5, 5, 3, 2, 4, 4, 4, 2, 1, 4, 3]], [[17, 3]])
+    """
+
+    def __init__(self, arrays):
+        """Wrap exported explainer arrays"""
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children = arrays['children']
+        self.root = arrays['root']
+        self.delta = arrays['delta']
+        self.max_depth = int(arrays['max_depth'])
+        self.classes_ = np.asarray(arrays['classes'], dtype=object)
+        self.root_value = arrays['root_value']
+        self.metadata = arrays.get('metadata', {})
+        self.n_estimators = len(self.root)
+        self.bias = np.mean(self.root_value, axis=0)
+
+    def explain(self, X, class_indices):
+        """
+        Split the probabilities of some careers into per-question parts
+
+        Args:
+            X: N x n_features array
+            class_indices: N x K career indices to explain for each row
+
+        Returns:
+            (bias, contributions): N x K average root probabilities, and
+            N x K x n_features contributions of each question
+        """
+        X = np.asarray(X, dtype=np.float32)
+        class_indices = np.asarray(class_indices, dtype=np.int64)
+        n_rows, n_features = X.shape
+        n_explained = class_indices.shape[1]
+        contributions = np.zeros((n_rows, n_features, n_explained), dtype=np.float64)
+
+        # Each row visits up to max_depth nodes per tree
+        chunk = max(1, _GATHER_BUDGET // (self.n_estimators * self.max_depth * n_explained))
+        for start in range(0, n_rows, chunk):
+            stop = min(start + chunk, n_rows)
+            contributions[start:stop] = self._walk(X[start:stop], class_indices[start:stop])
+
+        # Deltas are stored per tree; the forest averages its trees
+        return self.bias[class_indices], contributions.transpose(0, 2, 1) / self.n_estimators
+
+    def _walk(self, X, class_indices):
+        """Walk all trees like ForestEngine.apply, then credit each split's change to its question"""
+        n_rows, n_features = X.shape
+        n_explained = class_indices.shape[1]
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(self.root, (n_rows, self.n_estimators))
+
+        # Record the path first so the contribution lookups happen in one pass
+        path_nodes, path_features = [], []
+        for _ in range(self.max_depth):
+            split_feature = self.feature[nodes]
+            go_left = flat_X[row_offsets + split_feature] <= self.threshold[nodes]
+            children = self.children[2 * nodes + go_left]
+            path_nodes.append(children)
+            path_features.append(split_feature + row_offsets)
+            nodes = children
+
+        # Leaves point to themselves, so repeated nodes add nothing
+        path_nodes = np.stack(path_nodes)
+        moved = np.ones(path_nodes.shape, dtype=bool)
+        moved[0] = path_nodes[0] != self.root
+        moved[1:] = path_nodes[1:] != path_nodes[:-1]
+        _, rows, _ = np.nonzero(moved)
+
+        changes = self.delta[path_nodes[moved][:, None], class_indices[rows]]
+        bins = np.stack(path_features)[moved][:, None] * n_explained + np.arange(n_explained)
+        totals = np.bincount(bins.ravel(), weights=changes.ravel(), minlength=n_rows * n_features * n_explained)
+        return totals.reshape(n_rows, n_features, n_explained)